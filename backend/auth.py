@@ -1,25 +1,86 @@
 import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from dotenv import load_dotenv
 
 from backend.models import TokenData
+from shared.env import load_env
 
 # Load environment variables
-load_dotenv()
+load_env(os.path.dirname(os.path.abspath(__file__)))
 
 # Get JWT settings from environment variables
 SECRET_KEY = os.getenv("SECRET_KEY", "your_secret_key_for_jwt_here")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "60"))
 
+# Maximum number of verified tokens kept in memory
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "1024"))
+
 # Set up OAuth2 password bearer
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 
+class VerifiedTokenCache:
+    """Bounded LRU cache of tokens whose signature has already been verified
+    
+    Entries are keyed by the SHA-256 digest of the token (so raw tokens are
+    never kept in memory) and expire at the token's ``exp`` claim.
+    """
+    
+    def __init__(self, maxsize: int = TOKEN_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+    
+    def get(self, token: str) -> Optional[dict]:
+        """Get the cached payload for a token, or None if missing or expired"""
+        key = self._key(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            payload, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return payload
+    
+    def put(self, token: str, payload: dict):
+        """Cache the payload of a verified token"""
+        if self.maxsize <= 0:
+            return
+        
+        expires_at = payload.get("exp")
+        key = self._key(token)
+        with self._lock:
+            self._entries[key] = (payload, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+    
+    def clear(self):
+        """Drop all cached tokens"""
+        with self._lock:
+            self._entries.clear()
+
+
+token_cache = VerifiedTokenCache()
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     """Create a new JWT access token
     
@@ -62,8 +123,12 @@ async def get_current_user(token: str = Depends(oauth2_scheme)):
     )
     
     try:
-        # Decode the JWT token
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        # Decode the JWT token, skipping signature verification for tokens seen recently
+        payload = token_cache.get(token)
+        if payload is None:
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+            token_cache.put(token, payload)
+        
         username: str = payload.get("sub")
         
         if username is None:
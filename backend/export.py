@@ -0,0 +1,102 @@
+import json
+import zlib
+import logging
+import itertools
+from typing import Any, Dict, Iterable, Iterator
+
+from backend.responses import orjson, json_default, shape_deadline
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - msgpack is optional
+    msgpack = None
+
+logger = logging.getLogger('deadline-bot.export')
+
+# Flush encoded documents to the client once this many bytes are buffered
+EXPORT_CHUNK_SIZE = 64 * 1024
+
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "msgpack": ("application/x-msgpack", "msgpack"),
+}
+
+
+def _encode_ndjson(doc: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(doc, default=json_default, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(doc, default=json_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8") + b"\n"
+
+
+def _encode_msgpack(doc: Dict[str, Any]) -> bytes:
+    return msgpack.packb(doc, default=json_default, use_bin_type=True)
+
+
+def format_available(fmt: str) -> bool:
+    """Check whether an export format can be produced in this environment"""
+    if fmt == "msgpack":
+        return msgpack is not None
+    return fmt in EXPORT_FORMATS
+
+
+def prefetch(cursor: Iterable[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Run the query behind a cursor now by reading its first document
+
+    Query errors then surface before the response status is sent instead
+    of in the middle of the stream.
+
+    Args:
+        cursor: Iterable of MongoDB deadline documents
+
+    Returns:
+        Iterator over the same documents
+    """
+    iterator = iter(cursor)
+    first = list(itertools.islice(iterator, 1))
+    return itertools.chain(first, iterator)
+
+
+def stream_deadlines(cursor: Iterable[Dict[str, Any]], fmt: str = "ndjson", compress: bool = False) -> Iterator[bytes]:
+    """Encode deadline documents from a cursor into a byte stream
+
+    Documents are encoded one at a time and flushed in ~64 KB chunks, so
+    only a single cursor batch and one chunk are ever held in memory. If
+    reading the cursor fails part way, the stream ends with an
+    ``{"error": ...}`` record in the same format, so clients can tell a
+    truncated export from a complete one.
+
+    Args:
+        cursor: Iterable of MongoDB deadline documents
+        fmt: "ndjson" (one JSON document per line) or "msgpack" (concatenated objects)
+        compress: Whether to gzip the stream
+
+    Yields:
+        bytes: Encoded (and optionally compressed) chunks
+    """
+    encode = _encode_msgpack if fmt == "msgpack" else _encode_ndjson
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+    buffer = []
+    buffered = 0
+    try:
+        for doc in cursor:
+            data = encode(shape_deadline(doc))
+            buffer.append(data)
+            buffered += len(data)
+
+            if buffered >= EXPORT_CHUNK_SIZE:
+                chunk = b"".join(buffer)
+                buffer, buffered = [], 0
+                if compressor:
+                    chunk = compressor.compress(chunk)
+                if chunk:
+                    yield chunk
+    except Exception as e:
+        logger.error(f"Export failed after it started streaming: {e}")
+        buffer.append(encode({"error": f"Export incomplete: {e}"}))
+
+    chunk = b"".join(buffer)
+    if compressor:
+        chunk = compressor.compress(chunk) + compressor.flush()
+    if chunk:
+        yield chunk
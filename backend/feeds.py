@@ -0,0 +1,60 @@
+import os
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+# Maximum number of cached feed pages and how long one may be served
+FEED_CACHE_SIZE = int(os.getenv("FEED_CACHE_SIZE", "2048"))
+FEED_CACHE_TTL = float(os.getenv("FEED_CACHE_TTL", "60"))
+
+
+class FeedCache:
+    """Bounded LRU cache of rendered per-user feed pages
+
+    Each entry is tagged with the subscription's ``feed_version``. The bot
+    bumps that version whenever a deadline matching the user's subscriptions
+    is saved, so a version mismatch means the page is stale. Entries also
+    expire after ``ttl`` seconds so events drop off the feed once they pass.
+    """
+
+    def __init__(self, maxsize: int = FEED_CACHE_SIZE, ttl: float = FEED_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, version: int) -> Optional[Any]:
+        """Get a cached page, or None if missing, expired or from an older feed version"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            cached_version, value, expires_at = entry
+            if cached_version != version or expires_at <= time.monotonic():
+                del self._entries[key]
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Hashable, version: int, value: Any):
+        """Cache a page for a feed version"""
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._entries[key] = (version, value, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, username: str):
+        """Drop every cached page for a user"""
+        with self._lock:
+            for key in [k for k in self._entries if k[0] == username]:
+                del self._entries[key]
+
+
+feed_cache = FeedCache()
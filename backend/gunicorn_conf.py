@@ -0,0 +1,22 @@
+"""Gunicorn config for running the API in production
+
+Usage:
+    gunicorn -c backend/gunicorn_conf.py backend.main:app
+"""
+import os
+
+bind = f"{os.getenv('API_HOST', '0.0.0.0')}:{os.getenv('API_PORT', '8000')}"
+workers = int(os.getenv('API_WORKERS', str(os.cpu_count() or 1)))
+worker_class = "uvicorn.workers.UvicornWorker"
+
+# Each worker imports the app after forking and opens its own MongoDB pool on startup
+preload_app = False
+
+keepalive = int(os.getenv('API_KEEPALIVE', '5'))
+graceful_timeout = int(os.getenv('API_GRACEFUL_TIMEOUT', '30'))
+timeout = int(os.getenv('API_WORKER_TIMEOUT', '60'))
+max_requests = int(os.getenv('API_MAX_REQUESTS', '10000'))
+max_requests_jitter = int(os.getenv('API_MAX_REQUESTS_JITTER', '500'))
+
+loglevel = os.getenv('API_LOG_LEVEL', 'info')
+accesslog = "-"
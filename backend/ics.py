@@ -0,0 +1,228 @@
+import os
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, Tuple
+
+# Maximum number of calendar feeds kept in memory
+CALENDAR_CACHE_SIZE = int(os.getenv("CALENDAR_CACHE_SIZE", "256"))
+
+# Seconds a feed is served without checking its version in MongoDB
+CALENDAR_CHECK_INTERVAL = float(os.getenv("CALENDAR_CHECK_INTERVAL", "30"))
+
+# How far back past events stay in a feed
+CALENDAR_PAST_DAYS = int(os.getenv("CALENDAR_PAST_DAYS", "90"))
+
+# Overlap when asking for changes since the last build, covers clock skew between writers
+CALENDAR_CLOCK_SKEW_SECONDS = float(os.getenv("CALENDAR_CLOCK_SKEW_SECONDS", "5"))
+
+PRODID = "-//Deadline Tracker//Calendar Feed//EN"
+
+
+def _escape(value: Any) -> str:
+    """Escape a TEXT value (RFC 5545 section 3.3.11)"""
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Fold a content line at 75 octets without splitting UTF-8 characters"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+
+    parts = []
+    current = ""
+    size = 0
+    limit = 75
+    for char in line:
+        width = len(char.encode("utf-8"))
+        if size + width > limit:
+            parts.append(current)
+            # Continuation lines start with a space, which counts towards the limit
+            current = ""
+            size = 0
+            limit = 74
+        current += char
+        size += width
+    parts.append(current)
+    return "\r\n ".join(parts)
+
+
+def _utc_stamp(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def render_event(doc: Dict[str, Any]) -> str:
+    """Render a deadline document as a VEVENT block
+
+    Args:
+        doc: Deadline document with a ``due_at``
+
+    Returns:
+        The VEVENT with CRLF line endings (including the last line)
+    """
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{doc['_id']}@deadline-tracker",
+        f"DTSTAMP:{_utc_stamp(doc.get('updated_at') or doc.get('timestamp') or datetime.now(timezone.utc))}",
+    ]
+
+    if doc.get("all_day") and doc.get("date_str"):
+        day = date.fromisoformat(doc["date_str"])
+        lines.append(f"DTSTART;VALUE=DATE:{day.strftime('%Y%m%d')}")
+        lines.append(f"DTEND;VALUE=DATE:{(day + timedelta(days=1)).strftime('%Y%m%d')}")
+    else:
+        lines.append(f"DTSTART:{_utc_stamp(doc['due_at'])}")
+
+    lines.append(f"SUMMARY:{_escape(doc.get('title') or 'Untitled Event')}")
+
+    description = [doc.get("description") or ""]
+    if doc.get("club"):
+        description.append(f"Club: {doc['club']}")
+    if doc.get("link"):
+        description.append(doc["link"])
+    description = "\n\n".join(part for part in description if part)
+    if description:
+        lines.append(f"DESCRIPTION:{_escape(description)}")
+
+    if doc.get("location"):
+        lines.append(f"LOCATION:{_escape(doc['location'])}")
+    if doc.get("link"):
+        lines.append(f"URL:{doc['link']}")
+    if doc.get("category"):
+        lines.append(f"CATEGORIES:{_escape(doc['category'])}")
+    lines.append("END:VEVENT")
+
+    return "".join(_fold(line) + "\r\n" for line in lines)
+
+
+class _Feed:
+    """A rendered feed plus the per-event blocks it was assembled from"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.events = {}    # deadline ID -> (due_at, VEVENT block)
+        self.version = None
+        self.since = None   # when the events were last loaded (UTC)
+        self.checked_at = 0.0
+        self.body = None
+        self.etag = None
+
+
+class CalendarFeedCache:
+    """In-memory iCalendar feeds per guild and club, maintained incrementally
+
+    Every deadline write bumps a version counter for its guild and club in
+    MongoDB. A feed is served straight from memory for ``check_interval``
+    seconds, then its version is read (one lookup by ``_id``). Only when
+    the version moved are the deadlines updated since the last load
+    fetched, their VEVENT blocks re-rendered (or dropped for deleted and
+    duplicate events and events moved to another guild or club) and the
+    calendar reassembled from the cached blocks.
+    The whole feed is only loaded on first use or after being evicted from
+    the bounded LRU.
+    """
+
+    def __init__(self, maxsize: int = CALENDAR_CACHE_SIZE, check_interval: float = CALENDAR_CHECK_INTERVAL,
+                 past_days: int = CALENDAR_PAST_DAYS, clock_skew: float = CALENDAR_CLOCK_SKEW_SECONDS):
+        self.maxsize = max(maxsize, 1)
+        self.check_interval = check_interval
+        self.past_days = past_days
+        self.clock_skew = timedelta(seconds=clock_skew)
+        self._feeds = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _feed(self, key: Tuple[str, str]) -> _Feed:
+        with self._lock:
+            feed = self._feeds.get(key)
+            if feed is None:
+                feed = self._feeds[key] = _Feed()
+                while len(self._feeds) > self.maxsize:
+                    self._feeds.popitem(last=False)
+            self._feeds.move_to_end(key)
+            return feed
+
+    def get(self, db_client, field: str, value: str) -> Tuple[bytes, str]:
+        """Get a rendered feed, refreshing it if its guild or club changed
+
+        Args:
+            db_client: MongoDBClient to load versions and events from
+            field: "guild_id" or "club"
+            value: The guild ID or club name
+
+        Returns:
+            Tuple with (iCalendar body, ETag)
+        """
+        feed = self._feed((field, value))
+        with feed.lock:
+            if feed.body is not None and time.monotonic() - feed.checked_at < self.check_interval:
+                return feed.body, feed.etag
+
+            version = db_client.get_calendar_version(field, value)
+            now = datetime.now(timezone.utc)
+            horizon = now - timedelta(days=self.past_days)
+
+            changed = False
+            docs = []
+            if feed.body is None:
+                docs = db_client.get_calendar_events(field, value, horizon=horizon)
+                feed.events = {}
+                feed.since = now
+                changed = True
+            elif version != feed.version:
+                docs = db_client.get_calendar_events(
+                    field, value, since=feed.since - self.clock_skew, cached_ids=list(feed.events)
+                )
+                feed.since = now
+
+            for doc in docs:
+                deadline_id = str(doc["_id"])
+                due_at = doc.get("due_at")
+                moved = str(doc.get(field)) != value
+                if moved or doc.get("deleted") or doc.get("is_duplicate") or due_at is None or due_at < horizon:
+                    changed = feed.events.pop(deadline_id, None) is not None or changed
+                else:
+                    feed.events[deadline_id] = (due_at, render_event(doc))
+                    changed = True
+
+            # Events age out of the feed as they pass the horizon
+            expired = [key for key, (due_at, _) in feed.events.items() if due_at < horizon]
+            for key in expired:
+                del feed.events[key]
+
+            if changed or expired:
+                feed.body = self._assemble(field, value, feed.events)
+                feed.etag = '"' + hashlib.sha1(feed.body).hexdigest()[:20] + '"'
+            feed.version = version
+            feed.checked_at = time.monotonic()
+            return feed.body, feed.etag
+
+    @staticmethod
+    def _assemble(field: str, value: str, events: Dict[str, Tuple[datetime, str]]) -> bytes:
+        name = f"{value} deadlines" if field == "club" else "Discord deadlines"
+        header = [
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODID}",
+            "CALSCALE:GREGORIAN",
+            "METHOD:PUBLISH",
+            _fold(f"X-WR-CALNAME:{_escape(name)}"),
+            "REFRESH-INTERVAL;VALUE=DURATION:PT15M",
+            "X-PUBLISHED-TTL:PT15M",
+        ]
+        blocks = [block for _, block in sorted(events.values(), key=lambda item: item[0])]
+        return ("\r\n".join(header) + "\r\n" + "".join(blocks) + "END:VCALENDAR\r\n").encode("utf-8")
+
+
+calendar_cache = CalendarFeedCache()
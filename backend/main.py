@@ -1,19 +1,30 @@
 import os
 import sys
 import uvicorn
-from fastapi import FastAPI, Depends, HTTPException, status, Body
+from datetime import datetime
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Request, status, Body, Query
 from fastapi.middleware.cors import CORSMiddleware
-from dotenv import load_dotenv
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 
 # Add parent directory to path to import database module
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.mongodb_client import MongoDBClient
-from backend.models import DeadlineResponse, DeadlineList, UserLogin, Token, DeadlineCreate
-from backend.auth import create_access_token, get_current_user
+# Load environment variables before importing modules that read their config at import
+from shared.env import load_env
+load_env(os.path.dirname(os.path.abspath(__file__)))
 
-# Load environment variables
-load_dotenv()
+from database.mongodb_client import MongoDBClient, DatabaseUnavailableError
+from backend.models import (
+    DeadlineResponse, DeadlineList, UserLogin, Token, DeadlineCreate, SubscriptionUpdate, SubscriptionResponse
+)
+from backend.auth import create_access_token, get_current_user
+from backend.responses import FastJSONResponse, deadline_list_response
+from backend.feeds import feed_cache
+from backend.ics import calendar_cache, CALENDAR_CHECK_INTERVAL
+from backend.export import EXPORT_FORMATS, format_available, prefetch, stream_deadlines
+from backend.middleware import CompressionMiddleware, DEFAULT_COMPRESSIBLE_TYPES
 
 # Get API configuration from environment variables
 API_HOST = os.getenv('API_HOST', '0.0.0.0')
@@ -21,11 +32,32 @@ API_PORT = int(os.getenv('API_PORT', '8000'))
 CORS_ORIGINS = os.getenv('CORS_ORIGINS', 'http://localhost:3000').split(',')
 BOT_API_KEY = os.getenv('BOT_API_KEY', 'your_bot_api_key_here')
 
+# Server mode settings ("development" runs a single auto-reloading process)
+API_ENV = os.getenv('API_ENV', 'development').lower()
+API_WORKERS = int(os.getenv('API_WORKERS', str(os.cpu_count() or 1)))
+API_KEEPALIVE = int(os.getenv('API_KEEPALIVE', '5'))
+API_LOG_LEVEL = os.getenv('API_LOG_LEVEL', 'info')
+
+# Retry-After sent with 503s while the database is unavailable
+DB_RETRY_AFTER_SECONDS = int(os.getenv('DB_RETRY_AFTER_SECONDS', '5'))
+
+# Response compression settings
+COMPRESSION_ENABLED = os.getenv('COMPRESSION_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '1024'))
+COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', '6'))
+COMPRESSION_BROTLI = os.getenv('COMPRESSION_BROTLI', 'true').lower() in ('1', 'true', 'yes')
+COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', '4'))
+COMPRESSION_CONTENT_TYPES = os.getenv(
+    'COMPRESSION_CONTENT_TYPES',
+    ','.join(DEFAULT_COMPRESSIBLE_TYPES)
+).split(',')
+
 # Create FastAPI app
 app = FastAPI(
     title="Eventory API",
     description="API for accessing and managing events from Discord",
-    version="0.1.0"
+    version="0.1.0",
+    default_response_class=FastJSONResponse
 )
 
 # Add CORS middleware
@@ -37,8 +69,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize MongoDB client
-db_client = MongoDBClient()
+# Compress large JSON/text responses (added last so it wraps everything else)
+if COMPRESSION_ENABLED:
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=COMPRESSION_MIN_SIZE,
+        gzip_level=COMPRESSION_GZIP_LEVEL,
+        brotli_quality=COMPRESSION_BROTLI_QUALITY,
+        enable_brotli=COMPRESSION_BROTLI,
+        content_types=COMPRESSION_CONTENT_TYPES,
+    )
+
+# MongoDB client, created per worker process on startup (MongoClient is not fork-safe)
+db_client = None
+
+
+@app.on_event("startup")
+def startup():
+    """Create this worker's MongoDB client"""
+    global db_client
+    db_client = MongoDBClient()
+
+
+@app.on_event("shutdown")
+def shutdown():
+    """Close this worker's MongoDB connection pool"""
+    if db_client:
+        db_client.close()
 
 
 @app.get("/")
@@ -47,42 +104,89 @@ async def root():
     return {"message": "Eventory API is running"}
 
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness probe - the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/health/ready")
+def readiness():
+    """Readiness probe - the worker can reach MongoDB"""
+    if db_client is None or not db_client.ping():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is not reachable"
+        )
+    
+    return {"status": "ready"}
+
+
+@app.get("/health/db")
+async def database_health():
+    """Connection health and pool statistics from the background monitor (no extra round trip)"""
+    if db_client is None:
+        return {"healthy": None}
+    return db_client.get_pool_stats()
+
+
+@app.exception_handler(DatabaseUnavailableError)
+async def database_unavailable_handler(request: Request, exc: DatabaseUnavailableError):
+    """Fail fast with 503 while MongoDB is down instead of hanging on timeouts"""
+    return FastJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "Database is temporarily unavailable"},
+        headers={"Retry-After": str(DB_RETRY_AFTER_SECONDS)}
+    )
+
+
 # Add a public endpoint for deadlines that doesn't require authentication
 @app.get("/public/deadlines", response_model=DeadlineList)
 async def get_public_deadlines(
     skip: int = 0,
     limit: int = 10,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    guild_id: Optional[str] = None,
+    sort: str = Query("timestamp", pattern="^(timestamp|due_at)$"),
+    include_duplicates: bool = False,
+    include_archived: bool = False,
 ):
     """Get a list of deadlines without authentication
     
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
+        start: Only include deadlines due at or after this time (UTC if no offset)
+        end: Only include deadlines due before this time (UTC if no offset)
+        guild_id: Only include deadlines from this Discord guild
+        sort: Sort by scrape "timestamp" (newest first) or "due_at" (soonest first)
+        include_duplicates: Also return copies of events announced in several places
+        include_archived: Also search deadlines moved to the archive (slower)
     
     Returns:
         List of deadlines
     """
-    deadlines = db_client.get_deadlines(limit=limit, skip=skip)
-    
-    # Convert MongoDB documents to API models
-    deadline_list = []
-    for d in deadlines:
-        # Convert MongoDB _id to string
-        d["id"] = str(d.pop("_id"))
-        deadline_list.append(d)
+    filters = {"guild_id": guild_id} if guild_id else None
+    deadlines = db_client.get_deadlines(
+        limit=limit, skip=skip, filters=filters, start=start, end=end, sort_by=sort,
+        include_duplicates=include_duplicates, include_archived=include_archived
+    )
     
-    return {
-        "deadlines": deadline_list,
-        "total": len(deadline_list),
-        "skip": skip,
-        "limit": limit
-    }
+    # Serialize the trusted DB documents directly (skips response-model validation)
+    return deadline_list_response(deadlines, skip, limit)
 
 
 @app.get("/deadlines", response_model=DeadlineList)
 async def get_deadlines(
     skip: int = 0,
     limit: int = 10,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    guild_id: Optional[str] = None,
+    sort: str = Query("timestamp", pattern="^(timestamp|due_at)$"),
+    include_duplicates: bool = False,
+    include_archived: bool = False,
     current_user: dict = Depends(get_current_user)
 ):
     """Get a list of deadlines
@@ -90,28 +194,262 @@ async def get_deadlines(
     Args:
         skip: Number of records to skip
         limit: Maximum number of records to return
+        start: Only include deadlines due at or after this time (UTC if no offset)
+        end: Only include deadlines due before this time (UTC if no offset)
+        guild_id: Only include deadlines from this Discord guild
+        sort: Sort by scrape "timestamp" (newest first) or "due_at" (soonest first)
+        include_duplicates: Also return copies of events announced in several places
+        include_archived: Also search deadlines moved to the archive (slower)
         current_user: Current authenticated user
     
     Returns:
         List of deadlines
     """
-    deadlines = db_client.get_deadlines(limit=limit, skip=skip)
+    filters = {"guild_id": guild_id} if guild_id else None
+    deadlines = db_client.get_deadlines(
+        limit=limit, skip=skip, filters=filters, start=start, end=end, sort_by=sort,
+        include_duplicates=include_duplicates, include_archived=include_archived
+    )
+    
+    # Serialize the trusted DB documents directly (skips response-model validation)
+    return deadline_list_response(deadlines, skip, limit)
+
+
+@app.get("/deadlines/export")
+async def export_deadlines(
+    format: str = Query("ndjson", pattern="^(ndjson|msgpack)$"),
+    gzip: bool = False,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    guild_id: Optional[str] = None,
+    include_archived: bool = False,
+    current_user: dict = Depends(get_current_user)
+):
+    """Stream every matching deadline as NDJSON or MessagePack
+    
+    Documents are streamed straight from a MongoDB cursor, so memory use
+    stays flat no matter how many deadlines match. A failure after the
+    stream started ends it with an ``{"error": ...}`` record.
+    
+    Args:
+        format: "ndjson" (one JSON document per line) or "msgpack" (concatenated objects)
+        gzip: Whether to gzip-compress the stream
+        start: Only include deadlines due at or after this time (UTC if no offset)
+        end: Only include deadlines due before this time (UTC if no offset)
+        guild_id: Only include deadlines from this Discord guild
+        include_archived: Also export deadlines moved to the archive
+        current_user: Current authenticated user
+    
+    Returns:
+        Streaming response with the encoded deadlines
+    """
+    if not format_available(format):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Export format '{format}' is not available on this server"
+        )
+    
+    filters = {"guild_id": guild_id} if guild_id else None
+    try:
+        cursor = db_client.iter_deadlines(
+            filters=filters, start=start, end=end, include_archived=include_archived
+        )
+        # Run the query before the 200 goes out, so failures still get a 503
+        cursor = await run_in_threadpool(prefetch, cursor)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Failed to query deadlines: {e}"
+        )
     
-    # Convert MongoDB documents to API models
-    deadline_list = []
-    for d in deadlines:
-        # Convert MongoDB _id to string
-        d["id"] = str(d.pop("_id"))
-        deadline_list.append(d)
+    media_type, extension = EXPORT_FORMATS[format]
+    headers = {"Content-Disposition": f'attachment; filename="deadlines.{extension}"'}
+    if gzip:
+        headers["Content-Encoding"] = "gzip"
     
+    return StreamingResponse(
+        stream_deadlines(cursor, format, gzip),
+        media_type=media_type,
+        headers=headers
+    )
+
+
+@app.get("/public/deadlines/upcoming", response_model=DeadlineList)
+async def get_public_upcoming_deadlines(
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    guild_id: Optional[str] = None,
+):
+    """Get the next deadlines that are still due without authentication
+    
+    Args:
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        guild_id: Only include deadlines from this Discord guild
+    
+    Returns:
+        List of upcoming deadlines, soonest first
+    """
+    deadlines = db_client.get_upcoming(guild_id=guild_id, limit=limit, skip=skip)
+    return deadline_list_response(deadlines, skip, limit)
+
+
+@app.get("/deadlines/upcoming", response_model=DeadlineList)
+async def get_upcoming_deadlines(
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    guild_id: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Get the next deadlines that are still due
+    
+    Args:
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        guild_id: Only include deadlines from this Discord guild
+        current_user: Current authenticated user
+    
+    Returns:
+        List of upcoming deadlines, soonest first
+    """
+    deadlines = db_client.get_upcoming(guild_id=guild_id, limit=limit, skip=skip)
+    return deadline_list_response(deadlines, skip, limit)
+
+
+def _subscription_response(subscription):
     return {
-        "deadlines": deadline_list,
-        "total": len(deadline_list),
-        "skip": skip,
-        "limit": limit
+        "username": subscription["_id"],
+        "clubs": subscription.get("clubs", []),
+        "guild_ids": subscription.get("guild_ids", []),
+        "categories": subscription.get("categories", []),
+        "feed_version": subscription.get("feed_version", 0),
     }
 
 
+@app.get("/me/subscriptions", response_model=SubscriptionResponse)
+def get_my_subscriptions(current_user: dict = Depends(get_current_user)):
+    """Get the clubs, guilds and categories the current user follows"""
+    return _subscription_response(db_client.get_subscription(current_user["username"]))
+
+
+@app.put("/me/subscriptions", response_model=SubscriptionResponse)
+def update_my_subscriptions(
+    subscriptions: SubscriptionUpdate,
+    current_user: dict = Depends(get_current_user)
+):
+    """Replace the clubs, guilds and categories the current user follows"""
+    subscription = db_client.set_subscription(
+        current_user["username"],
+        clubs=subscriptions.clubs,
+        guild_ids=subscriptions.guild_ids,
+        categories=subscriptions.categories,
+    )
+    if subscription is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to save subscriptions"
+        )
+    
+    feed_cache.invalidate(current_user["username"])
+    return _subscription_response(subscription)
+
+
+@app.get("/me/deadlines", response_model=DeadlineList)
+def get_my_deadlines(
+    skip: int = 0,
+    limit: int = Query(10, ge=1, le=100),
+    current_user: dict = Depends(get_current_user)
+):
+    """Get upcoming deadlines from the clubs, guilds and categories the user follows
+    
+    Pages are cached per user and reused until a matching deadline is
+    saved (which bumps the subscription's feed version) or the cache TTL
+    runs out, so a repeated read costs one indexed lookup.
+    
+    Args:
+        skip: Number of records to skip
+        limit: Maximum number of records to return
+        current_user: Current authenticated user
+    
+    Returns:
+        List of upcoming deadlines, soonest first
+    """
+    username = current_user["username"]
+    subscription = db_client.get_subscription(username)
+    version = subscription.get("feed_version", 0)
+    key = (username, skip, limit)
+    
+    body = feed_cache.get(key, version)
+    if body is None:
+        deadlines = db_client.get_feed(subscription, limit=limit, skip=skip)
+        body = deadline_list_response(deadlines, skip, limit).body
+        feed_cache.put(key, version, body)
+    
+    return Response(content=body, media_type="application/json")
+
+
+def _strip_weak(tag: str) -> str:
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header with an ETag (RFC 9110 section 13.1.2)
+    
+    Compressed responses carry the ETag weakened to ``W/"..."`` and clients
+    send it back that way, so the ``W/`` prefix is ignored on both sides.
+    """
+    if if_none_match.strip() == "*":
+        return True
+    return _strip_weak(etag) in {_strip_weak(tag) for tag in if_none_match.split(",")}
+
+
+def _calendar_response(request: Request, field: str, value: str) -> Response:
+    """Serve a cached calendar feed, or 304 if the client's copy is current"""
+    body, etag = calendar_cache.get(db_client, field, value)
+    headers = {"ETag": etag, "Cache-Control": f"public, max-age={int(CALENDAR_CHECK_INTERVAL)}"}
+    
+    if_none_match = request.headers.get("if-none-match", "")
+    if _etag_matches(if_none_match, etag):
+        # Answer with the tag the client holds, compressed copies were sent with a weak one
+        if "W/" in if_none_match:
+            headers["ETag"] = f"W/{etag}"
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    
+    return Response(content=body, media_type="text/calendar; charset=utf-8", headers=headers)
+
+
+@app.get("/calendar/guild/{guild_id}.ics")
+def get_guild_calendar(guild_id: str, request: Request):
+    """iCalendar feed of a Discord guild's events, for calendar app subscriptions
+    
+    Feeds are kept rendered in memory and only the events that changed are
+    re-rendered, so polling clients mostly get a cached body or a 304.
+    
+    Args:
+        guild_id: Discord guild ID
+        request: Incoming request (for If-None-Match)
+    
+    Returns:
+        text/calendar response
+    """
+    return _calendar_response(request, "guild_id", guild_id)
+
+
+@app.get("/calendar/club/{club}.ics")
+def get_club_calendar(club: str, request: Request):
+    """iCalendar feed of a club's events, for calendar app subscriptions
+    
+    Args:
+        club: Club name as stored on the events
+        request: Incoming request (for If-None-Match)
+    
+    Returns:
+        text/calendar response
+    """
+    return _calendar_response(request, "club", club)
+
+
 # Add a public endpoint for a single deadline that doesn't require authentication
 @app.get("/public/deadlines/{deadline_id}", response_model=DeadlineResponse)
 async def get_public_deadline(
@@ -240,13 +578,29 @@ async def get_guest_token():
 
 
 def main():
-    """Run the FastAPI application with Uvicorn"""
-    uvicorn.run(
-        "backend.main:app",
-        host=API_HOST,
-        port=API_PORT,
-        reload=True
-    )
+    """Run the FastAPI application with Uvicorn
+    
+    Set API_ENV=production to run API_WORKERS worker processes without the
+    file watcher. For gunicorn, use ``gunicorn -c backend/gunicorn_conf.py backend.main:app``.
+    """
+    if API_ENV == "production":
+        uvicorn.run(
+            "backend.main:app",
+            host=API_HOST,
+            port=API_PORT,
+            workers=API_WORKERS,
+            reload=False,
+            timeout_keep_alive=API_KEEPALIVE,
+            proxy_headers=True,
+            log_level=API_LOG_LEVEL
+        )
+    else:
+        uvicorn.run(
+            "backend.main:app",
+            host=API_HOST,
+            port=API_PORT,
+            reload=True
+        )
 
 
 if __name__ == "__main__":
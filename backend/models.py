@@ -44,6 +44,25 @@ class DeadlineResponse(BaseModel):
     author_name: str
     timestamp: datetime
     source_link: str
+    due_at: Optional[datetime] = None
+    all_day: Optional[bool] = None
+    timezone: Optional[str] = None
+    is_duplicate: Optional[bool] = None
+    canonical_id: Optional[str] = None
+    updated_at: Optional[datetime] = None
+
+
+class SubscriptionUpdate(BaseModel):
+    """Feed subscriptions set by a user"""
+    clubs: List[str] = []
+    guild_ids: List[str] = []
+    categories: List[str] = []
+
+
+class SubscriptionResponse(SubscriptionUpdate):
+    """Feed subscriptions of a user"""
+    username: str
+    feed_version: int = 0
 
 
 class DeadlineList(BaseModel):
@@ -0,0 +1,62 @@
+import json
+from datetime import datetime, date
+from typing import Any, Dict, List
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional
+    orjson = None
+
+
+def json_default(obj):
+    """Serialize types the JSON encoder doesn't handle natively (e.g. ObjectId)"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered with orjson when it's installed
+
+    Falls back to the stdlib encoder otherwise. Returning this response
+    directly from an endpoint skips FastAPI's response-model validation
+    and ``jsonable_encoder``, so it should only be used for data we already
+    trust, such as documents read from our own database.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            return orjson.dumps(content, default=json_default, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(
+            content, default=json_default, ensure_ascii=False, separators=(",", ":")
+        ).encode("utf-8")
+
+
+def shape_deadline(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Shape a MongoDB deadline document for the API (``_id`` -> ``id``)"""
+    doc["id"] = str(doc.pop("_id"))
+    return doc
+
+
+def deadline_list_response(deadlines: List[Dict[str, Any]], skip: int, limit: int) -> FastJSONResponse:
+    """Build a ``DeadlineList`` response straight from database documents
+
+    Args:
+        deadlines: Deadline documents from MongoDB
+        skip: Number of records skipped
+        limit: Maximum number of records requested
+
+    Returns:
+        FastJSONResponse with the serialized page
+    """
+    deadline_list = [shape_deadline(d) for d in deadlines]
+    return FastJSONResponse({
+        "deadlines": deadline_list,
+        "total": len(deadline_list),
+        "skip": skip,
+        "limit": limit
+    })
@@ -0,0 +1,79 @@
+"""Micro-benchmark for date normalization in the extraction hot path
+
+Usage:
+    python benchmarks/bench_dates.py
+"""
+import os
+import re
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from shared.dates import normalize_date, _parse_cached
+
+SAMPLES = [
+    "2025-04-15",
+    "April 15th, 2025",
+    "Friday, April 18th at 6pm",
+    "4/15",
+    "tomorrow",
+    "next Friday",
+    "in 2 days",
+]
+NUMBER = 20000
+
+
+def legacy_normalize(date_str):
+    """The previous inline implementation from format_deadline_data"""
+    from dateutil import parser
+    today = datetime.now()
+    if re.search(r'\btoday\b', date_str.lower()):
+        due_date = today
+    elif re.search(r'\btomorrow\b', date_str.lower()):
+        from datetime import timedelta
+        due_date = today + timedelta(days=1)
+    elif not re.search(r'\b\d{4}\b', date_str):
+        try:
+            due_date = parser.parse(f"{date_str}, {today.year}")
+        except Exception:
+            due_date = parser.parse(date_str)
+    else:
+        due_date = parser.parse(date_str)
+    return due_date, due_date.strftime("%Y-%m-%d")
+
+
+def per_call_us(func, number=NUMBER):
+    return timeit.timeit(func, number=number) / number * 1e6
+
+
+def main():
+    try:
+        import dateutil  # noqa: F401
+        has_dateutil = True
+    except ImportError:
+        has_dateutil = False
+        print("dateutil not installed - skipping legacy comparison\n")
+
+    print(f"{'input':<30} {'cold (us)':>10} {'warm (us)':>10} {'legacy (us)':>12}")
+    for sample in SAMPLES:
+        def cold():
+            _parse_cached.cache_clear()
+            normalize_date(sample)
+
+        cold_us = per_call_us(cold)
+        warm_us = per_call_us(lambda: normalize_date(sample))
+
+        legacy = "n/a"
+        if has_dateutil:
+            try:
+                legacy = f"{per_call_us(lambda: legacy_normalize(sample), NUMBER // 10):.2f}"
+            except Exception:
+                legacy = "error"
+
+        print(f"{sample!r:<30} {cold_us:>10.2f} {warm_us:>10.2f} {legacy:>12}")
+
+
+if __name__ == "__main__":
+    main()
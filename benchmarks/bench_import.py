@@ -0,0 +1,65 @@
+"""Measure cold import time of the API and bot entry points
+
+Each import runs in a fresh interpreter so nothing is cached between runs.
+
+Usage:
+    python benchmarks/bench_import.py [--runs 5]
+"""
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+ENTRY_POINTS = {
+    "backend.main": "import backend.main",
+    "bot.main": "import bot.main",
+}
+
+
+def time_import(statement):
+    """Time a single import in a fresh interpreter
+
+    Returns:
+        float: Wall-clock seconds, or None if the import failed
+    """
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c", statement],
+        cwd=ROOT,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE,
+        text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if result.returncode != 0:
+        print(result.stderr.strip().splitlines()[-1])
+        return None
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark entry point import time")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    baseline = [time_import("pass") for _ in range(args.runs)]
+    interpreter = statistics.median(baseline)
+    print(f"interpreter startup: {interpreter * 1000:8.1f} ms")
+
+    for name, statement in ENTRY_POINTS.items():
+        samples = [time_import(statement) for _ in range(args.runs)]
+        if any(sample is None for sample in samples):
+            print(f"{name:<20} import failed")
+            continue
+        median = statistics.median(samples)
+        print(f"{name:<20} {median * 1000:8.1f} ms  (+{(median - interpreter) * 1000:.1f} ms over startup)")
+
+    print("\nFor a per-module breakdown run: python -X importtime -c 'import bot.main'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Benchmark serialization of deadline list pages
+
+Compares FastAPI's default path (response-model validation +
+jsonable_encoder + stdlib json) with FastJSONResponse on pre-shaped dicts.
+
+Usage:
+    python benchmarks/bench_serialization.py
+"""
+import os
+import sys
+import json
+import timeit
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.encoders import jsonable_encoder
+
+from backend.models import DeadlineList
+from backend.responses import deadline_list_response
+
+NUMBER = 50
+
+
+def make_docs(count):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "_id": f"{i:024x}",
+            "title": f"ACM General Body Meeting #{i}",
+            "course": "ACM",
+            "club": "ACM",
+            "description": "Join us for our weekly general body meeting with free pizza! " * 4,
+            "due_date": now.replace(tzinfo=None),
+            "due_at": now + timedelta(days=i % 30),
+            "date_str": (now + timedelta(days=i % 30)).strftime("%Y-%m-%d"),
+            "raw_content": "@everyone Our next GBM is this Friday at 6pm in CSE 1202. " * 8,
+            "channel_name": "announcements",
+            "guild_name": "ACM UCSD",
+            "guild_id": "1234567890",
+            "message_id": str(10 ** 17 + i),
+            "author_id": "987654321",
+            "author_name": "acm-bot",
+            "timestamp": now,
+            "link": "https://discord.com/channels/1/2/3",
+            "category": "meeting",
+            "location": "CSE 1202",
+            "time": "6pm",
+        }
+        for i in range(count)
+    ]
+
+
+def default_path(docs):
+    deadline_list = []
+    for d in docs:
+        d = dict(d)
+        d["id"] = str(d.pop("_id"))
+        deadline_list.append(d)
+    content = {"deadlines": deadline_list, "total": len(deadline_list), "skip": 0, "limit": len(docs)}
+    validated = DeadlineList(**content)
+    return json.dumps(jsonable_encoder(validated)).encode("utf-8")
+
+
+def fast_path(docs):
+    return deadline_list_response([dict(d) for d in docs], 0, len(docs)).body
+
+
+def main():
+    for size in (100, 1000):
+        docs = make_docs(size)
+        before = timeit.timeit(lambda: default_path(docs), number=NUMBER) / NUMBER * 1e3
+        after = timeit.timeit(lambda: fast_path(docs), number=NUMBER) / NUMBER * 1e3
+        print(f"{size:>5} items: default {before:8.2f} ms  fast {after:8.2f} ms  ({before / after:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from bot.rate_limiter import AsyncRateLimiter
+
+logger = logging.getLogger('deadline-bot.backfill')
+
+# Backfill configuration
+BACKFILL_ENABLED = os.getenv('BACKFILL_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+BACKFILL_CONCURRENCY = int(os.getenv('BACKFILL_CONCURRENCY', '4'))
+BACKFILL_RATE = float(os.getenv('BACKFILL_RATE', '2'))  # messages per second
+BACKFILL_MAX_MESSAGES = int(os.getenv('BACKFILL_MAX_MESSAGES', '500'))  # per channel
+BACKFILL_MAX_AGE_HOURS = int(os.getenv('BACKFILL_MAX_AGE_HOURS', '24'))
+BACKFILL_REPLY = os.getenv('BACKFILL_REPLY', 'false').lower() in ('1', 'true', 'yes')
+
+
+class Backfiller:
+    """Replays messages posted while the bot was offline
+
+    Each channel keeps a high-water mark (the last processed message ID) in
+    MongoDB. On startup every readable text channel is walked from its mark
+    forward in chronological order and each message is fed through the same
+    extraction path as live messages. Channels are processed concurrently up
+    to ``concurrency``, messages inside a channel are processed in order so
+    the checkpoint always reflects a contiguous prefix of the history.
+    Until a channel has been caught up, live messages must not move its
+    checkpoint (see ``caught_up``), or a crash mid-backfill would skip the
+    messages between the checkpoint and the live ones.
+    """
+
+    def __init__(self, db_client, process_message, concurrency=BACKFILL_CONCURRENCY,
+                 rate=BACKFILL_RATE, max_messages=BACKFILL_MAX_MESSAGES,
+                 max_age_hours=BACKFILL_MAX_AGE_HOURS):
+        """Initialize the backfiller
+
+        Args:
+            db_client: MongoDBClient used for checkpoints
+            process_message: Coroutine function ``(message, reply)`` that runs extraction
+            concurrency: Maximum number of channels processed at once
+            rate: Maximum number of messages processed per second across all channels
+            max_messages: Maximum number of messages replayed per channel per run
+            max_age_hours: How far back to look for channels without a checkpoint
+        """
+        self.db_client = db_client
+        self.process_message = process_message
+        self.max_messages = max_messages
+        self.max_age_hours = max_age_hours
+        self._semaphore = asyncio.Semaphore(max(concurrency, 1))
+        self._limiter = AsyncRateLimiter(rate, burst=max(int(rate), 1))
+        self._lock = asyncio.Lock()
+        self._caught_up = set()  # channel IDs backfilled since the last (re)connect
+
+    @property
+    def running(self):
+        """Whether a backfill run is currently in progress"""
+        return self._lock.locked()
+
+    def caught_up(self, channel_id):
+        """Whether a channel has been backfilled since the last (re)connect"""
+        return channel_id in self._caught_up
+
+    def reset(self):
+        """Forget which channels are caught up, called when a (re)connect schedules a run
+
+        Messages may have been missed while disconnected, so live traffic
+        stops advancing checkpoints until the next run has replayed them.
+        """
+        self._caught_up.clear()
+
+    async def run(self, guilds, channel_filter=None):
+        """Backfill all readable text channels in the given guilds
+
+        Runs are serialized, so a reconnect that fires ``on_ready`` again
+        while a run is still in progress is ignored.
+
+        Args:
+            guilds: Iterable of discord.Guild objects to backfill
+            channel_filter: Optional callable ``(channel) -> bool`` to skip channels
+
+        Returns:
+            int: Number of messages replayed
+        """
+        if self._lock.locked():
+            logger.info("Backfill already in progress, skipping")
+            return 0
+
+        async with self._lock:
+            channels = []
+            for guild in guilds:
+                for channel in guild.text_channels:
+                    permissions = channel.permissions_for(guild.me)
+                    if not (permissions.read_messages and permissions.read_message_history):
+                        continue
+                    if channel_filter and not channel_filter(channel):
+                        continue
+                    channels.append(channel)
+
+            logger.info(f"Starting backfill of {len(channels)} channels")
+            started = datetime.now()
+
+            results = await asyncio.gather(
+                *(self._backfill_channel(channel) for channel in channels),
+                return_exceptions=True
+            )
+
+            total = 0
+            for channel, result in zip(channels, results):
+                if isinstance(result, Exception):
+                    logger.error(f"Backfill failed for #{channel.name} ({channel.id}): {result}")
+                else:
+                    total += result
+
+            elapsed = (datetime.now() - started).total_seconds()
+            logger.info(f"Backfill complete: {total} messages replayed in {elapsed:.1f}s")
+            return total
+
+    async def _backfill_channel(self, channel):
+        """Replay missed messages for a single channel
+
+        Args:
+            channel: discord.TextChannel to backfill
+
+        Returns:
+            int: Number of messages replayed
+        """
+        async with self._semaphore:
+            last_seen = self.db_client.get_channel_checkpoint(channel.id)
+
+            if last_seen:
+                after = discord.Object(id=int(last_seen))
+            else:
+                after = datetime.now(timezone.utc) - timedelta(hours=self.max_age_hours)
+
+            count = 0
+            async for message in channel.history(limit=self.max_messages, after=after, oldest_first=True):
+                if message.author.bot:
+                    continue
+
+                await self._limiter.acquire()
+                await self.process_message(message, reply=BACKFILL_REPLY, live=False)
+                count += 1
+
+            self._caught_up.add(channel.id)
+
+            if count:
+                logger.info(f"Backfilled {count} messages from #{channel.name} in {channel.guild.name}")
+            return count
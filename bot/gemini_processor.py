@@ -1,14 +1,174 @@
 import os
 import logging
 import json
-from datetime import datetime
-import google.generativeai as genai
-from typing import Optional, Dict, Any, Tuple
+import time
+from datetime import datetime, timezone
+from functools import lru_cache
+from typing import Optional, Callable, Dict, Any, List, Tuple
 import re
 
+from pydantic import BaseModel, ValidationError
+
+from bot.metrics import prompt_metrics
+from bot.normalizer import estimate_tokens, normalize_message, restore_links
+from shared.dates import normalize_date, compute_due_at, local_today, DEFAULT_TIMEZONE
+
 # Configure logging
 logger = logging.getLogger('deadline-bot.gemini')
 
+# Matches the outermost JSON object in a model response
+_JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+# google.generativeai is slow to import, so it's loaded on first use
+genai = None
+
+# Token accounting and per-guild budgets (see set_usage_tracker)
+usage_tracker = None
+
+
+def _load_genai():
+    """Import the Gemini SDK once, on first use"""
+    global genai
+    if genai is None:
+        import google.generativeai
+        genai = google.generativeai
+    return genai
+
+
+# Gemini model and output settings. Structured mode asks for JSON matching
+# EVENT_SCHEMA via the response MIME type, so replies are valid JSON and short.
+GEMINI_MODEL = os.getenv('GEMINI_MODEL', 'gemini-1.5-pro')
+GEMINI_FALLBACK_MODEL = os.getenv('GEMINI_FALLBACK_MODEL', 'gemini-1.0-pro')
+GEMINI_STRUCTURED_OUTPUT = os.getenv('GEMINI_STRUCTURED_OUTPUT', 'true').lower() in ('1', 'true', 'yes')
+GEMINI_STREAM_EARLY_EXIT = os.getenv('GEMINI_STREAM_EARLY_EXIT', 'false').lower() in ('1', 'true', 'yes')
+GEMINI_MAX_OUTPUT_TOKENS = int(os.getenv('GEMINI_MAX_OUTPUT_TOKENS', '384'))
+
+# Matches a streamed structured response that has committed to "no event"
+_NO_EVENT_RE = re.compile(r'"has_event"\s*:\s*false')
+
+EVENT_CATEGORIES = ["event", "deadline", "meeting", "announcement"]
+
+# Response schema for structured output (OpenAPI subset understood by Gemini).
+# Gemini generates the properties in alphabetical order, not in the order
+# given here (google-generativeai pins a Schema proto without
+# propertyOrdering), so has_event follows category, club, date_str and
+# description. Only has_event is required, so "no event" answers usually
+# skip those, but a model that fills them in first leaves the streamed
+# early exit little to save.
+EVENT_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "has_event": {"type": "boolean"},
+        "title": {"type": "string"},
+        "date_str": {"type": "string"},
+        "club": {"type": "string"},
+        "description": {"type": "string"},
+        "location": {"type": "string"},
+        "time": {"type": "string"},
+        "links": {"type": "array", "items": {"type": "string"}},
+        "category": {"type": "string", "enum": EVENT_CATEGORIES},
+    },
+    "required": ["has_event"],
+}
+
+
+class GeminiEvent(BaseModel):
+    """Event extracted by Gemini in structured output mode"""
+    has_event: bool = False
+    title: Optional[str] = None
+    date_str: Optional[str] = None
+    club: Optional[str] = None
+    description: Optional[str] = None
+    location: Optional[str] = None
+    time: Optional[str] = None
+    links: Optional[List[str]] = None
+    category: Optional[str] = None
+
+
+FREEFORM_PROMPT = """
+    You are a helpful assistant that detects club announcements, events, and deadlines in messages.
+    
+    TASK:
+    Analyze the provided message and extract information about:
+    1. Club events or meetings
+    2. Application deadlines
+    3. Registration deadlines 
+    4. Any important dates mentioned
+    5. General club announcements
+    
+    If any event, deadline, or announcement is found:
+    1. Extract the title/name of the event or announcement
+    2. Extract any dates mentioned (event date, deadline date, etc.)
+    3. Determine the club or organization name
+    4. Extract location information if available
+    5. Extract time information if available
+    6. Extract any links/URLs mentioned
+    
+    OUTPUT FORMAT (JSON):
+    {
+      "has_event": true/false,
+      "title": "The title or name of the event/announcement",
+      "date_str": "The primary date mentioned (event date or deadline)",
+      "club": "Club or organization name",
+      "description": "Brief description of the event/announcement",
+      "location": "Location of the event if mentioned",
+      "time": "Time of the event if mentioned",
+      "links": ["array", "of", "links"],
+      "category": "event/deadline/meeting/announcement"
+    }
+    
+    DATE EXTRACTION GUIDANCE:
+    - For specific dates, capture the full date expression (e.g., "April 15th, 2023")
+    - For relative dates:
+      - Use "today" for events happening on the current day
+      - Use "tomorrow" for events happening the next day
+      - For other relative dates, interpret them relative to the current date
+    - If a date has no year specified, assume it's for the current year
+    - If no specific date is mentioned but the event is clearly upcoming, use today's date
+    
+    IMPORTANT:
+    - Return only the JSON without any markdown formatting or code blocks
+    - If no event or announcement is detected, return {"has_event": false}
+    - Extract any club name if present (e.g., "Chess Club", "ACM")
+    - If the channel name contains club info, use it
+    """
+
+# The schema is enforced by the API, so the structured prompt only has to
+# describe what to extract
+STRUCTURED_PROMPT = """
+You detect club announcements, events, and deadlines in Discord messages.
+
+Set has_event to false (and nothing else) when the message has no event, deadline,
+meeting or announcement. Otherwise fill in the title, the primary date (date_str,
+the full date expression as written, or "today"/"tomorrow" for relative dates),
+the club or organization (use the channel name if it names one), a brief
+description, location, time, any links, and the category. If no date is given but
+the event is clearly upcoming, use "today".
+"""
+
+
+@lru_cache(maxsize=None)
+def _get_model(structured: bool):
+    """Build the Gemini model once per output mode"""
+    generation_config = {
+        "temperature": 0.1,  # Low temperature for more deterministic responses
+        "top_p": 0.95,
+        "top_k": 64,
+        "max_output_tokens": GEMINI_MAX_OUTPUT_TOKENS if structured else 1024,
+    }
+    if structured:
+        generation_config["response_mime_type"] = "application/json"
+        generation_config["response_schema"] = EVENT_SCHEMA
+    
+    genai = _load_genai()
+    try:
+        return genai.GenerativeModel(model_name=GEMINI_MODEL, generation_config=generation_config)
+    except Exception as e:
+        logger.error(f"Error accessing Gemini model: {e}")
+        logger.info(f"Falling back to {GEMINI_FALLBACK_MODEL} model")
+        return genai.GenerativeModel(model_name=GEMINI_FALLBACK_MODEL, generation_config=generation_config)
+
+
 # Initialize Gemini AI
 def init_gemini(api_key: str = None):
     """Initialize the Gemini AI client with API key"""
@@ -20,156 +180,177 @@ def init_gemini(api_key: str = None):
         return False
         
     try:
-        genai.configure(api_key=api_key)
+        _load_genai().configure(api_key=api_key)
         logger.info("Gemini AI initialized successfully")
         return True
     except Exception as e:
         logger.error(f"Failed to initialize Gemini AI: {e}")
         return False
 
-def detect_deadline(message_content: str, channel_name: str = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+def detect_deadline(message_content: str, channel_name: str = None,
+                    on_usage: Optional[Callable[..., None]] = None) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Detect club announcements and events from a message using Gemini AI
     
     Args:
         message_content: The content of the message to analyze
         channel_name: The name of the channel where the message was posted
+        on_usage: Optional callback ``(model, prompt_tokens, output_tokens, latency)``
+            invoked after the model call
     
     Returns:
         Tuple with (success, event_info)
         - success: Boolean indicating if an event or announcement was found
         - event_info: Dictionary with extracted information or None if no event found
     """
+    # Drop content that costs tokens without helping extraction and cap the size
+    normalized = normalize_message(message_content)
+    prompt_metrics.record(normalized.original_tokens, normalized.tokens)
+    if normalized.tokens_saved:
+        logger.debug(f"Normalized message from ~{normalized.original_tokens} to ~{normalized.tokens} tokens")
+    
+    # Include channel name if available
+    input_text = normalized.text
+    if channel_name:
+        input_text = f"Channel: {channel_name}\nMessage: {normalized.text}"
+    
+    if normalized.links:
+        input_text += "\n(Links written as [linkN] are shortened, return them unchanged.)"
+    
     try:
-        # Create a system prompt that instructs Gemini to extract event information
-        system_prompt = """
-        You are a helpful assistant that detects club announcements, events, and deadlines in messages.
-        
-        TASK:
-        Analyze the provided message and extract information about:
-        1. Club events or meetings
-        2. Application deadlines
-        3. Registration deadlines 
-        4. Any important dates mentioned
-        5. General club announcements
-        
-        If any event, deadline, or announcement is found:
-        1. Extract the title/name of the event or announcement
-        2. Extract any dates mentioned (event date, deadline date, etc.)
-        3. Determine the club or organization name
-        4. Extract location information if available
-        5. Extract time information if available
-        6. Extract any links/URLs mentioned
-        
-        OUTPUT FORMAT (JSON):
-        {
-          "has_event": true/false,
-          "title": "The title or name of the event/announcement",
-          "date_str": "The primary date mentioned (event date or deadline)",
-          "club": "Club or organization name",
-          "description": "Brief description of the event/announcement",
-          "location": "Location of the event if mentioned",
-          "time": "Time of the event if mentioned",
-          "links": ["array", "of", "links"],
-          "category": "event/deadline/meeting/announcement"
-        }
-        
-        DATE EXTRACTION GUIDANCE:
-        - For specific dates, capture the full date expression (e.g., "April 15th, 2023")
-        - For relative dates:
-          - Use "today" for events happening on the current day
-          - Use "tomorrow" for events happening the next day
-          - For other relative dates, interpret them relative to the current date
-        - If a date has no year specified, assume it's for the current year
-        - If no specific date is mentioned but the event is clearly upcoming, use today's date
-        
-        IMPORTANT:
-        - Return only the JSON without any markdown formatting or code blocks
-        - If no event or announcement is detected, return {"has_event": false}
-        - Extract any club name if present (e.g., "Chess Club", "ACM")
-        - If the channel name contains club info, use it
-        """
-        
-        # Include channel name if available
-        input_text = message_content
-        if channel_name:
-            input_text = f"Channel: {channel_name}\nMessage: {message_content}"
-        
-        # Configure Gemini model
-        generation_config = {
-            "temperature": 0.1,  # Low temperature for more deterministic responses
-            "top_p": 0.95,
-            "top_k": 64,
-            "max_output_tokens": 1024,
-        }
-        
-        # Get models
+        if GEMINI_STRUCTURED_OUTPUT:
+            found, result = _detect_structured(input_text, on_usage)
+        else:
+            found, result = _detect_freeform(input_text, on_usage)
+    except Exception as e:
+        logger.error(f"Error using Gemini AI to detect event: {e}")
+        return False, None
+    
+    # Long links were replaced with placeholders in the prompt
+    if found and result:
+        result = restore_links(result, normalized.links)
+    return found, result
+
+
+def _report_usage(on_usage, model, response, prompt: str, response_text: str, elapsed: float):
+    """Pass token usage to the callback, estimating it when the response has no metadata"""
+    usage = getattr(response, "usage_metadata", None)
+    prompt_tokens = getattr(usage, "prompt_token_count", None) if usage else None
+    output_tokens = getattr(usage, "candidates_token_count", None) if usage else None
+    if not prompt_tokens:
+        prompt_tokens = estimate_tokens(prompt)
+    if output_tokens is None:
+        output_tokens = estimate_tokens(response_text)
+    
+    logger.info(f"Gemini AI responded in {elapsed:.2f}s ({prompt_tokens} prompt / {output_tokens} output tokens)")
+    if on_usage is not None:
+        model_name = getattr(model, "model_name", GEMINI_MODEL).replace("models/", "")
         try:
-            model = genai.GenerativeModel(
-                model_name="gemini-1.5-pro",
-                generation_config=generation_config
-            )
+            on_usage(model_name, prompt_tokens, output_tokens, elapsed)
         except Exception as e:
-            logger.error(f"Error accessing Gemini model: {e}")
-            logger.info("Falling back to gemini-1.0-pro model")
-            model = genai.GenerativeModel(
-                model_name="gemini-1.0-pro",
-                generation_config=generation_config
-            )
-        
-        # Generate response
-        response = model.generate_content(
-            [system_prompt, input_text]
-        )
+            logger.error(f"Failed to record token usage: {e}")
+
+
+def _detect_structured(input_text: str, on_usage=None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Call Gemini with schema-constrained JSON output and validate it in one pass
+    
+    With ``GEMINI_STREAM_EARLY_EXIT`` the response is streamed and abandoned
+    as soon as the model has committed to ``"has_event": false``, which is
+    the answer for most chat messages. The saving is limited to whatever
+    the model would generate after ``has_event`` in alphabetical order
+    (see ``EVENT_SCHEMA``), which is why the option is off by default.
+    """
+    model = _get_model(structured=True)
+    started = time.perf_counter()
+    
+    if GEMINI_STREAM_EARLY_EXIT:
+        response = model.generate_content([STRUCTURED_PROMPT, input_text], stream=True)
+        response_text = ""
+        for chunk in response:
+            response_text += chunk.text
+            if _NO_EVENT_RE.search(response_text):
+                logger.info("No event detected by Gemini AI (early exit)")
+                _report_usage(on_usage, model, None, STRUCTURED_PROMPT + input_text, response_text,
+                              time.perf_counter() - started)
+                return False, None
+    else:
+        response = model.generate_content([STRUCTURED_PROMPT, input_text])
+        response_text = response.text
+    
+    _report_usage(on_usage, model, response, STRUCTURED_PROMPT + input_text, response_text,
+                  time.perf_counter() - started)
+    
+    try:
+        event = GeminiEvent.model_validate_json(response_text)
+    except ValidationError as e:
+        logger.error(f"Gemini response didn't match the event schema: {response_text!r} ({e})")
+        return False, None
+    
+    if not event.has_event:
+        logger.info("No event or announcement detected by Gemini AI")
+        return False, None
+    
+    result = event.model_dump(exclude_none=True)
+    logger.info(f"Gemini AI response (processed): {result}")
+    return True, result
+
+
+def _detect_freeform(input_text: str, on_usage=None) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """Call Gemini with JSON requested in the prompt and parse it leniently"""
+    model = _get_model(structured=False)
+    started = time.perf_counter()
+    
+    # Generate response
+    response = model.generate_content(
+        [FREEFORM_PROMPT, input_text]
+    )
+    _report_usage(on_usage, model, response, FREEFORM_PROMPT + input_text, response.text,
+                  time.perf_counter() - started)
+    
+    # Extract and parse the JSON response - fix markdown formatting
+    try:
+        response_text = response.text
         
-        # Extract and parse the JSON response - fix markdown formatting
-        try:
-            response_text = response.text
+        # Remove markdown code blocks if present
+        if "```json" in response_text:
+            response_text = response_text.replace("```json", "").replace("```", "").strip()
+        elif "```" in response_text:
+            response_text = response_text.replace("```", "").strip()
             
-            # Remove markdown code blocks if present
-            if "```json" in response_text:
-                response_text = response_text.replace("```json", "").replace("```", "").strip()
-            elif "```" in response_text:
-                response_text = response_text.replace("```", "").strip()
-                
-            # Parse the JSON
-            result = json.loads(response_text)
-            logger.info(f"Gemini AI response (processed): {result}")
+        # Parse the JSON
+        result = json.loads(response_text)
+        logger.info(f"Gemini AI response (processed): {result}")
+        
+        # Check if an event was detected (backwards compatible with "has_deadline" key)
+        if result.get("has_event", False) or result.get("has_deadline", False):
+            # For backward compatibility
+            if "has_deadline" in result and "has_event" not in result:
+                result["has_event"] = result["has_deadline"]
             
-            # Check if an event was detected (backwards compatible with "has_deadline" key)
-            if result.get("has_event", False) or result.get("has_deadline", False):
-                # For backward compatibility
-                if "has_deadline" in result and "has_event" not in result:
-                    result["has_event"] = result["has_deadline"]
-                
-                return True, result
-            else:
-                logger.info("No event or announcement detected by Gemini AI")
-                return False, None
-                
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse Gemini response as JSON: {response.text}")
-            logger.error(f"JSON error: {e}")
+            return True, result
+        else:
+            logger.info("No event or announcement detected by Gemini AI")
+            return False, None
             
-            # Try to extract the JSON from the response manually as a fallback
-            try:
-                # Try to find JSON content between curly braces
-                match = re.search(r'\{.*\}', response.text, re.DOTALL)
-                if match:
-                    json_str = match.group(0)
-                    result = json.loads(json_str)
-                    logger.info(f"Successfully extracted JSON using regex: {result}")
-                    
-                    # Check if an event was detected
-                    if result.get("has_event", False) or result.get("has_deadline", False):
-                        return True, result
-            except Exception:
-                pass
+    except json.JSONDecodeError as e:
+        logger.error(f"Failed to parse Gemini response as JSON: {response.text}")
+        logger.error(f"JSON error: {e}")
+        
+        # Try to extract the JSON from the response manually as a fallback
+        try:
+            # Try to find JSON content between curly braces
+            match = _JSON_OBJECT_RE.search(response.text)
+            if match:
+                json_str = match.group(0)
+                result = json.loads(json_str)
+                logger.info(f"Successfully extracted JSON using regex: {result}")
                 
-            return False, None
+                # Check if an event was detected
+                if result.get("has_event", False) or result.get("has_deadline", False):
+                    return True, result
+        except Exception:
+            pass
             
-    except Exception as e:
-        logger.error(f"Error using Gemini AI to detect event: {e}")
         return False, None
 
 def format_deadline_data(
@@ -188,57 +369,17 @@ def format_deadline_data(
     Returns:
         Dictionary formatted for MongoDB storage
     """
-    # Get the current date for default and relative date handling
-    today = datetime.now()
+    # Relative dates ("tomorrow", "next Friday") are resolved in the guild's timezone
+    tz_name = message_info.get("timezone")
+    today = local_today(tz_name)
     
-    # Attempt to parse the date string
-    due_date = None
+    # Parse the date string (fast path for common formats, falls back to today)
     date_str = gemini_result.get("date_str", "")
-    standardized_date_str = ""
-    
     try:
-        from dateutil import parser
-        
-        # Handle special cases
-        if date_str:
-            # Case: "today" - use current date
-            if re.search(r'\btoday\b', date_str.lower()):
-                due_date = today
-                standardized_date_str = today.strftime("%Y-%m-%d")
-            
-            # Case: "tomorrow" - use next day
-            elif re.search(r'\btomorrow\b', date_str.lower()):
-                from datetime import timedelta
-                due_date = today + timedelta(days=1)
-                standardized_date_str = due_date.strftime("%Y-%m-%d")
-            
-            # General case: try to parse the date
-            else:
-                # Handle dates without year
-                if not re.search(r'\b\d{4}\b', date_str):
-                    # Add current year and try parsing
-                    modified_date_str = f"{date_str}, {today.year}"
-                    try:
-                        due_date = parser.parse(modified_date_str)
-                    except:
-                        # If that fails, try original string
-                        due_date = parser.parse(date_str)
-                else:
-                    # Parse with year included
-                    due_date = parser.parse(date_str)
-                
-                if due_date:
-                    standardized_date_str = due_date.strftime("%Y-%m-%d")
-        
-        # Fallback: if no date or parsing failed, use today's date
-        if not due_date:
-            due_date = today
-            standardized_date_str = today.strftime("%Y-%m-%d")
-            
+        due_date, standardized_date_str = normalize_date(date_str, today)
     except Exception as e:
         logger.error(f"Failed to parse date: {e}")
-        due_date = today  # Fallback
-        standardized_date_str = today.strftime("%Y-%m-%d")
+        due_date, standardized_date_str = normalize_date("", today)
     
     # Use club from Gemini or fallback to channel name extraction
     club = gemini_result.get("club", "")
@@ -282,6 +423,9 @@ def format_deadline_data(
     if time:
         description += f"\nTime: {time}"
     
+    # Normalized UTC due timestamp used for indexed date filters and sorting
+    due_at, all_day = compute_due_at(standardized_date_str, time, tz_name)
+    
     # Create the deadline data with the same structure as before
     deadline_data = {
         "title": title,
@@ -293,23 +437,84 @@ def format_deadline_data(
         "raw_content": message_content,
         "channel_name": message_info.get("channel_name", ""),
         "guild_name": message_info.get("guild_name", ""),
+        "guild_id": message_info.get("guild_id", ""),
+        "channel_id": message_info.get("channel_id", ""),
         "message_id": message_info.get("message_id", ""),
         "author_id": message_info.get("author_id", ""),
         "author_name": message_info.get("author_name", ""),
-        "timestamp": datetime.now(),
+        "timestamp": datetime.now(timezone.utc),
         "link": link,
         "source": "discord_bot",
         "category": category,
         "location": location,
-        "time": time
+        "time": time,
+        "due_at": due_at,
+        "all_day": all_day,
+        "timezone": tz_name or DEFAULT_TIMEZONE
     }
     
     return deadline_data
 
 
+# Local deadline detection patterns (used when a channel is routed to local-only extraction)
+_MONTH = r'(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Sept|Oct|Nov|Dec)[a-z]*\.?'
+LOCAL_DEADLINE_PATTERNS = [
+    re.compile(r'due\s+(?:on|by)?\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)', re.IGNORECASE),
+    re.compile(r'deadline[: ]\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)', re.IGNORECASE),
+    re.compile(r'submit\s+(?:before|by)?\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)', re.IGNORECASE),
+    re.compile(r'REMINDER:.*?deadline:?\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)', re.IGNORECASE),
+    re.compile(r'\b(' + _MONTH + r'\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)\b'),
+    re.compile(r'\b(today|tomorrow)\b', re.IGNORECASE),
+]
+_DEADLINE_WORDS = re.compile(r'\b(due|deadline|submit|apply|register)\b', re.IGNORECASE)
+_URL = re.compile(r'https?://\S+')
+
+
+def detect_deadline_locally(message_content: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+    """
+    Detect events using local regex patterns only (no model calls)
+    
+    Args:
+        message_content: The content of the message to analyze
+    
+    Returns:
+        Tuple with (success, event_info) in the same shape as detect_deadline
+    """
+    for pattern in LOCAL_DEADLINE_PATTERNS:
+        match = pattern.search(message_content)
+        if match:
+            break
+    else:
+        return False, None
+    
+    # Use the first non-empty line as the title
+    first_line = next((line.strip() for line in message_content.splitlines() if line.strip()), "")
+    title = first_line.strip("#*_ ")
+    if len(title) > 100:
+        title = title[:97] + "..."
+    
+    result = {
+        "has_event": True,
+        "title": title or "Untitled Event",
+        "date_str": match.group(1),
+        "description": message_content[:500],
+        "links": _URL.findall(message_content),
+        "category": "deadline" if _DEADLINE_WORDS.search(message_content) else "event",
+    }
+    logger.info(f"Local extractor matched date '{result['date_str']}'")
+    return True, result
+
+
+def set_usage_tracker(tracker):
+    """Record model token usage with (and enforce the budgets of) a UsageTracker"""
+    global usage_tracker
+    usage_tracker = tracker
+
+
 def extract_deadline_with_fallback(
     message_content: str,
-    message_info: Dict[str, Any]
+    message_info: Dict[str, Any],
+    mode: str = "llm"
 ) -> Tuple[bool, Optional[Dict[str, Any]]]:
     """
     Extract event information with fallback to regex if Gemini fails
@@ -317,14 +522,37 @@ def extract_deadline_with_fallback(
     Args:
         message_content: The content of the message
         message_info: Dictionary with additional message information
+        mode: Extraction mode for the channel ("llm", "local" or "off")
     
     Returns:
         Tuple with (success, event_data)
     """
+    if mode == "off":
+        return False, None
+    
+    if mode == "local":
+        has_event, local_result = detect_deadline_locally(message_content)
+        if has_event and local_result:
+            logger.info("Event/announcement detected using local patterns")
+            return True, format_deadline_data(local_result, message_content, message_info)
+        return False, None
+    
+    guild_id = message_info.get("guild_id", "")
+    channel_id = message_info.get("channel_id", "")
+    on_usage = None
+    if usage_tracker is not None:
+        # Guilds that used up today's token budget fall back to the local extractor
+        if usage_tracker.over_budget(guild_id):
+            return extract_deadline_with_fallback(message_content, message_info, mode="local")
+        
+        def on_usage(model, prompt_tokens, output_tokens, latency):
+            usage_tracker.record(guild_id, channel_id, model, prompt_tokens, output_tokens, latency)
+    
     # Try with Gemini AI first
     has_event, gemini_result = detect_deadline(
         message_content, 
-        message_info.get("channel_name", "")
+        message_info.get("channel_name", ""),
+        on_usage=on_usage
     )
     
     if has_event and gemini_result:
@@ -0,0 +1,56 @@
+# Job kinds on the durable queue (see MongoDBClient.enqueue_job)
+JOB_EXTRACT = "extract"  # Run deadline extraction on a message (handled by bot/worker.py)
+JOB_REPLY = "reply"      # Send a confirmation reply in Discord (handled by the bot)
+
+
+def extract_job_id(message_id, content_hash=None):
+    """Idempotency key for the extraction job of a message
+
+    Re-extractions after an edit pass the hash of the edited content, so each
+    distinct version of a message is queued once.
+    """
+    if content_hash:
+        return f"{JOB_EXTRACT}:{message_id}:{content_hash}"
+    return f"{JOB_EXTRACT}:{message_id}"
+
+
+def reply_job_id(message_id):
+    """Idempotency key for the confirmation reply to a message"""
+    return f"{JOB_REPLY}:{message_id}"
+
+
+def confirmation_message(event_data):
+    """Build the reply sent when an event has been tracked
+
+    Args:
+        event_data (dict): The saved deadline
+
+    Returns:
+        str: Reply text
+    """
+    title = event_data.get('title', 'Untitled Event')
+    category = event_data.get('category', 'event')
+    date_str = event_data.get('date_str', 'unknown date')
+
+    if category == 'deadline':
+        return f"✅ I've tracked this deadline: **{title}** due on **{date_str}**"
+    return f"✅ I've tracked this {category}: **{title}** on **{date_str}**"
+
+
+def confirmation_summary(event_data):
+    """One-line confirmation used when several replies in a channel are coalesced
+
+    Args:
+        event_data (dict): The saved deadline
+
+    Returns:
+        str: Summary line (links to the announcement when its link is known)
+    """
+    title = event_data.get('title', 'Untitled Event')
+    category = event_data.get('category', 'event')
+    date_str = event_data.get('date_str', 'unknown date')
+
+    line = f"{category}: **{title}** on **{date_str}**"
+    if event_data.get('link'):
+        line += f" ({event_data['link']})"
+    return line
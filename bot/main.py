@@ -1,18 +1,35 @@
 import os
+import asyncio
 import discord
 import re
 import logging
-import requests
 import time
-from dotenv import load_dotenv, find_dotenv
+import socket
 from discord.ext import commands
+from concurrent.futures import ThreadPoolExecutor, wait
 from datetime import datetime, timedelta
 import sys
 import os
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
-from database.mongodb_client import MongoDBClient
-from bot.gemini_processor import init_gemini, extract_deadline_with_fallback
+
+# Load environment variables before importing modules that read their config at import
+# (each .env file is only parsed once per process)
+from shared.env import load_env
+dotenv_path = load_env(os.path.dirname(os.path.abspath(__file__)))
+
+from database.mongodb_client import MongoDBClient, DatabaseUnavailableError, JOB_LEASE_SECONDS
+from bot.gemini_processor import init_gemini, extract_deadline_with_fallback, set_usage_tracker
+from bot.backfill import Backfiller, BACKFILL_ENABLED
+from bot.routing import RoutingTable, MODE_OFF
+from bot.jobs import JOB_EXTRACT, JOB_REPLY, extract_job_id, confirmation_message, confirmation_summary
+from bot.outbound import OutboundSender, SENT, UNDELIVERABLE
+from bot.metrics import metrics, prompt_metrics
+from bot.usage import UsageTracker
+from bot.sharding import SHARDING_ENABLED, SHARD_COUNT, SHARD_IDS, shard_label
+from bot.normalizer import salient_hash
+from bot.reminders import ReminderScheduler, REMINDERS_ENABLED
+from shared.dates import is_iso_date
 
 
 # Configure logging
@@ -26,10 +43,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger('deadline-bot')
 
-# Load environment variables with explicit file path
-dotenv_path = find_dotenv()
-logger.info(f"Loading environment variables from: {dotenv_path}")
-load_dotenv(dotenv_path)
+logger.info(f"Loaded environment variables from: {dotenv_path}")
 
 # Get configuration from environment variables
 TOKEN = os.getenv('DISCORD_TOKEN')
@@ -40,16 +54,49 @@ guild_ids_str = os.getenv('GUILD_IDS', '')
 GUILD_IDS = [gid.strip() for gid in guild_ids_str.split(',') if gid.strip()]
 logger.info(f"Guild IDs monitoring: {GUILD_IDS if GUILD_IDS else 'ALL GUILDS'}")
 
+admin_ids_str = os.getenv('ADMIN_USER_IDS', '')
+ADMIN_USER_IDS = [uid.strip() for uid in admin_ids_str.split(',') if uid.strip()]
+
 API_URL = os.getenv('API_URL', 'http://localhost:8000')
 BOT_API_KEY = os.getenv('BOT_API_KEY', 'your_bot_api_key_here')
 GEMINI_API_KEY = os.getenv('GEMINI_API_KEY')
 
+# Buffer deadline saves and write them in batches; in durable mode the
+# confirmation reply waits until the batch has been flushed
+WRITE_BEHIND_ENABLED = os.getenv('WRITE_BEHIND_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+WRITE_BEHIND_DURABLE = os.getenv('WRITE_BEHIND_DURABLE', 'true').lower() in ('1', 'true', 'yes')
+
+# Maximum time to wait for the startup health checks
+STARTUP_CHECK_TIMEOUT = float(os.getenv('STARTUP_CHECK_TIMEOUT', '10'))
+
+# "inline" runs extraction in this process, "queue" hands it to bot/worker.py
+# processes through the durable job queue
+EXTRACTION_MODE = os.getenv('EXTRACTION_MODE', 'inline').lower()
+REPLY_POLL_INTERVAL = float(os.getenv('REPLY_POLL_INTERVAL', '1'))
+# Reply jobs claimed but not yet sent, about what the outbound rate limit
+# can deliver within one lease
+REPLY_MAX_IN_FLIGHT = int(os.getenv('REPLY_MAX_IN_FLIGHT', '50'))
+
+# Number of deadlines listed by !deadlines (default and upper bound)
+UPCOMING_DEFAULT_COUNT = int(os.getenv('UPCOMING_DEFAULT_COUNT', '5'))
+UPCOMING_MAX_COUNT = int(os.getenv('UPCOMING_MAX_COUNT', '20'))
+
+# Seconds to wait for further edits before re-extracting an edited message
+EDIT_DEBOUNCE_SECONDS = float(os.getenv('EDIT_DEBOUNCE_SECONDS', '10'))
+
 # Initialize bot with intents
 intents = discord.Intents.default()
 intents.message_content = True
 intents.guilds = True
 
-bot = commands.Bot(command_prefix='!', intents=intents)
+if SHARDING_ENABLED:
+    # Each process only connects the shards in SHARD_IDS (all of them if unset)
+    bot = commands.AutoShardedBot(
+        command_prefix='!', intents=intents, shard_count=SHARD_COUNT, shard_ids=SHARD_IDS
+    )
+    logger.info(f"Sharded mode: running shards {shard_label()}")
+else:
+    bot = commands.Bot(command_prefix='!', intents=intents)
 
 # Initialize database client
 db_client = MongoDBClient()
@@ -57,19 +104,37 @@ db_client = MongoDBClient()
 # Flag to track if Gemini is available
 gemini_available = False
 
-# Legacy deadline detection patterns (kept as fallback)
-deadline_patterns = [
-    r'due\s+(?:on|by)?\s+(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)',
-    r'deadline[: ]\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)',
-    r'submit\s+(?:before|by)?\s+(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)',
-    r'REMINDER:.*?deadline:?\s*(\w+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)',
-    r'([A-Z][a-z]+\s+\d{1,2}(?:st|nd|rd|th)?(?:,?\s+\d{4})?)'
-]
+# Catch-up backfill runners, one per shard (created once the event loop is running)
+backfillers = {}
+
+# Task relaying confirmation replies from extraction workers (queue mode)
+reply_relay_task = None
+
+# Replies are queued per channel and sent in the background, so extraction
+# never waits on Discord rate limits
+outbound = OutboundSender(bot)
+
+# Deadline reminders (started once the event loop is running)
+reminder_scheduler = None
+reminder_task = None
+
+# Debounced re-extractions of edited messages, keyed by message ID
+pending_edits = {}
+
+# Channel routing rules (which channels get LLM, local-only or no extraction).
+# Legacy regex patterns now live in gemini_processor.LOCAL_DEADLINE_PATTERNS.
+routing_table = RoutingTable()
+
+# Model token accounting per guild/channel with the daily budgets from the routing config
+usage_tracker = UsageTracker(db_client, routing_table.token_budget_for)
+set_usage_tracker(usage_tracker)
 
 
 @bot.event
 async def on_ready():
     """Event triggered when the bot is ready"""
+    global reply_relay_task, reminder_scheduler, reminder_task
+    
     logger.info(f'{bot.user.name} has connected to Discord!')
     logger.info(f'Bot is active in {len(bot.guilds)} guilds')
     
@@ -78,6 +143,66 @@ async def on_ready():
     
     general_channel = bot.get_channel(1358156201208315958)
     #await general_channel.send("bot just started")
+    
+    if EXTRACTION_MODE == "queue" and reply_relay_task is None:
+        reply_relay_task = asyncio.create_task(relay_replies())
+    
+    if REMINDERS_ENABLED and reminder_task is None:
+        reminder_scheduler = ReminderScheduler(bot, db_client, sharded=SHARDING_ENABLED)
+        reminder_task = asyncio.create_task(reminder_scheduler.run())
+    
+    # Catch up on messages posted while the bot was offline (sharded bots do
+    # this per shard in on_shard_ready)
+    if not SHARDING_ENABLED:
+        shard_metrics = metrics.shard(0)
+        shard_metrics.incr("ready")
+        shard_metrics.last_ready_at = time.time()
+        start_backfill()
+
+
+@bot.event
+async def on_shard_ready(shard_id):
+    """Event triggered when a single shard has connected (sharded mode)"""
+    shard_guilds = [g for g in bot.guilds if g.shard_id == shard_id]
+    logger.info(f"Shard {shard_id} ready with {len(shard_guilds)} guilds")
+    
+    shard_metrics = metrics.shard(shard_id)
+    shard_metrics.incr("ready")
+    shard_metrics.last_ready_at = time.time()
+    start_backfill(shard_id)
+
+
+@bot.event
+async def on_shard_disconnect(shard_id):
+    metrics.shard(shard_id).incr("disconnects")
+
+
+@bot.event
+async def on_shard_resumed(shard_id):
+    metrics.shard(shard_id).incr("resumes")
+
+
+def start_backfill(shard_id=None):
+    """Start a catch-up backfill for the guilds of a shard (all guilds if None)"""
+    if not BACKFILL_ENABLED:
+        return
+    
+    backfiller = backfillers.get(shard_id)
+    if backfiller is None:
+        backfiller = backfillers[shard_id] = Backfiller(db_client, process_message_for_deadlines)
+    if not backfiller.running:
+        backfiller.reset()
+    
+    guilds = [
+        g for g in bot.guilds
+        if (shard_id is None or g.shard_id == shard_id) and (not GUILD_IDS or str(g.id) in GUILD_IDS)
+    ]
+    asyncio.create_task(_run_backfill(backfiller, guilds, shard_id))
+
+
+async def _run_backfill(backfiller, guilds, shard_id):
+    replayed = await backfiller.run(guilds, channel_filter=is_channel_routed)
+    metrics.shard(shard_id).incr("backfill_replayed", replayed)
 
 
 @bot.event
@@ -87,6 +212,9 @@ async def on_message(message):
     if message.author == bot.user:
         return
     
+    if message.guild is not None:
+        metrics.shard(message.guild.shard_id).incr("messages_seen")
+    
     # Process commands
     await bot.process_commands(message)
 
@@ -103,6 +231,11 @@ async def on_message(message):
         except Exception as e:
             logger.error(f"Error forwarding announcement: {e}")
     
+    # Skip channels the routing table has turned off before doing any work
+    if not is_channel_routed(message.channel):
+        logger.debug(f"Skipping message from unrouted channel: #{message.channel.name} in {message.guild.name}")
+        return
+    
     # Process messages from all guilds if GUILD_IDS is empty,
     # otherwise only process from specific guilds
     if not GUILD_IDS or str(message.guild.id) in GUILD_IDS:
@@ -112,34 +245,265 @@ async def on_message(message):
         logger.debug(f"Skipping message from unmonitored guild: {message.guild.name} (ID: {message.guild.id})")
 
 
-async def process_message_for_deadlines(message):
-    """Process a message to extract event information using Gemini AI"""
+@bot.event
+async def on_raw_message_edit(payload):
+    """Re-extract an edited message once its edits have settled
+    
+    Raw events fire for messages outside the cache too. Embed-only updates
+    (link previews) carry no content and are ignored.
+    """
+    data = payload.data
+    if "content" not in data or payload.guild_id is None:
+        return
+    if data.get("author", {}).get("bot"):
+        return
+    if GUILD_IDS and str(payload.guild_id) not in GUILD_IDS:
+        return
+    
+    # Restart the debounce window on every edit
+    previous = pending_edits.pop(payload.message_id, None)
+    if previous is not None:
+        previous.cancel()
+    pending_edits[payload.message_id] = asyncio.create_task(
+        _handle_edit(payload.channel_id, payload.message_id)
+    )
+
+
+@bot.event
+async def on_raw_message_delete(payload):
+    """Hide deadlines extracted from a deleted message"""
+    await _handle_deletes([payload.message_id], payload.guild_id)
+
+
+@bot.event
+async def on_raw_bulk_message_delete(payload):
+    """Hide deadlines extracted from bulk-deleted messages"""
+    await _handle_deletes(list(payload.message_ids), payload.guild_id)
+
+
+async def _handle_deletes(message_ids, guild_id):
+    for message_id in message_ids:
+        pending = pending_edits.pop(message_id, None)
+        if pending is not None:
+            pending.cancel()
+    
+    loop = asyncio.get_running_loop()
+    deleted = await loop.run_in_executor(None, db_client.soft_delete_messages, message_ids)
+    if deleted and guild_id is not None:
+        guild = bot.get_guild(guild_id)
+        shard_id = guild.shard_id if guild else None
+        metrics.shard(shard_id).incr("deletes", deleted)
+
+
+async def _handle_edit(channel_id, message_id):
+    """Re-extract an edited message if the parts extraction depends on changed"""
+    try:
+        await asyncio.sleep(EDIT_DEBOUNCE_SECONDS)
+    except asyncio.CancelledError:
+        return
+    pending_edits.pop(message_id, None)
+    
+    try:
+        channel = bot.get_channel(channel_id) or await bot.fetch_channel(channel_id)
+        message = await channel.fetch_message(message_id)
+    except (discord.NotFound, discord.Forbidden):
+        return
+    except discord.HTTPException as e:
+        logger.warning(f"Couldn't fetch edited message {message_id}: {e}")
+        return
+    
+    if not is_channel_routed(message.channel):
+        return
+    
+    shard_metrics = metrics.shard(message.guild.shard_id)
+    content_hash = salient_hash(message.content)
+    loop = asyncio.get_running_loop()
+    try:
+        stored_hash = await loop.run_in_executor(None, db_client.get_content_hash, message_id)
+    except DatabaseUnavailableError as e:
+        logger.error(f"Skipping edit of message {message_id}, database unavailable: {e}")
+        return
+    
+    if stored_hash == content_hash:
+        shard_metrics.incr("edits_skipped")
+        logger.debug(f"Edit of message {message_id} didn't touch the title, dates or location")
+        return
+    
+    message_info = build_message_info(message)
+    mode = routing_table.resolve(message.guild.id, message.channel.id, message.channel.name)
+    
+    if EXTRACTION_MODE == "queue":
+        # The worker upserts or deletes the deadline and stores the new hash
+        payload = {
+            "content": message.content, "message_info": message_info, "mode": mode,
+            "edit": True, "content_hash": content_hash,
+        }
+        try:
+            await loop.run_in_executor(
+                None, db_client.enqueue_job, JOB_EXTRACT, payload, extract_job_id(message_id, content_hash)
+            )
+        except DatabaseUnavailableError as e:
+            logger.error(f"Skipping edit of message {message_id}, database unavailable: {e}")
+            return
+        shard_metrics.incr("jobs_enqueued")
+        logger.info(f"Queued re-extraction of edited message {message_id}")
+        return
+    
+    event_found, event_data = await loop.run_in_executor(
+        None, extract_deadline_with_fallback, message.content, message_info, mode
+    )
+    shard_metrics.incr("edits_reextracted")
+    
+    if event_found and event_data:
+        db_result = await loop.run_in_executor(None, db_client.upsert_deadline, event_data)
+        if not db_result:
+            # Keep the old hash so the next edit tries again
+            return
+        logger.info(f"Updated deadline {db_result} after message {message_id} was edited")
+    else:
+        # The edit removed the event
+        await loop.run_in_executor(None, db_client.soft_delete_messages, [message_id])
+    
+    await loop.run_in_executor(None, db_client.set_content_hash, message_id, content_hash)
+
+
+def is_channel_routed(channel):
+    """Check whether a channel is routed to any extraction mode"""
+    return routing_table.resolve(channel.guild.id, channel.id, channel.name) != MODE_OFF
+
+
+def checkpoint_allowed(channel):
+    """Whether live messages may advance a channel's backfill checkpoint
+    
+    Only once the channel's backfill has caught up, so the checkpoint never
+    jumps past messages that are still waiting to be replayed.
+    """
+    if not BACKFILL_ENABLED:
+        return True
+    backfiller = backfillers.get(channel.guild.shard_id if SHARDING_ENABLED else None)
+    return backfiller is not None and backfiller.caught_up(channel.id)
+
+
+async def process_message_for_deadlines(message, reply=True, live=True):
+    """Process a message to extract event information using Gemini AI
+    
+    Args:
+        message: The Discord message to process
+        reply: Whether to reply to the message when an event is tracked
+        live: False when replayed by backfill, which owns the checkpoint until it has caught up
+    """
+    try:
+        handled = await _extract_and_save(message, reply)
+    except DatabaseUnavailableError as e:
+        # Leave the checkpoint alone so backfill picks this message up once MongoDB is back
+        logger.error(f"Skipping message {message.id}, database unavailable: {e}")
+        return
+    
+    if not handled:
+        # The message couldn't be claimed or saved, let backfill retry it
+        return
+    
+    # Advance the channel high-water mark so backfill resumes after this message
+    if live and not checkpoint_allowed(message.channel):
+        return
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(
+        None, db_client.update_channel_checkpoint, message.channel.id, message.id, message.guild.id
+    )
+
+
+async def _extract_and_save(message, reply):
+    """Run extraction on a message and save any detected event
+    
+    Returns:
+        bool: False if the message couldn't be claimed or its event couldn't be saved
+    """
     content = message.content
     logger.info(f"Processing message for events: '{content[:50]}...' in channel '{message.channel.name}'")
     
     # Check if it's in a monitored guild
     if GUILD_IDS and str(message.guild.id) not in GUILD_IDS:
         logger.info(f"Skipping message - guild {message.guild.id} is not in monitored guilds: {GUILD_IDS}")
-        return
+        return True
     
     # Prepare message info for Gemini
-    message_info = {
+    message_info = build_message_info(message)
+    
+    # Look up the extraction mode for this channel
+    mode = routing_table.resolve(message.guild.id, message.channel.id, message.channel.name)
+    if mode == MODE_OFF:
+        logger.info(f"Skipping message - extraction is off for channel '{message.channel.name}'")
+        return True
+    
+    # Claim the message so no other shard or process handles it. Claims are
+    # kept for messages without events too, so replays never re-extract them.
+    shard_metrics = metrics.shard(message.guild.shard_id)
+    loop = asyncio.get_running_loop()
+    try:
+        claimed = await loop.run_in_executor(
+            None, db_client.claim_message, message_info["message_id"], shard_label(), salient_hash(content)
+        )
+    except DatabaseUnavailableError as e:
+        logger.error(f"Skipping message {message.id}, database unavailable: {e}")
+        return False
+    
+    if not claimed:
+        shard_metrics.incr("messages_skipped_duplicate")
+        logger.info(f"Skipping already processed message with ID: {message_info['message_id']}")
+        return True
+    
+    saved = False
+    try:
+        saved = await _run_extraction(message, message_info, mode, reply)
+    finally:
+        if not saved:
+            # Let a later replay retry the message
+            shard_metrics.incr("errors")
+            await loop.run_in_executor(None, db_client.release_message, message_info["message_id"])
+    return saved
+
+
+def build_message_info(message):
+    """Message metadata passed to extraction and stored with the deadline"""
+    return {
         "channel_name": message.channel.name,
         "guild_name": message.guild.name,
+        "guild_id": str(message.guild.id),
+        "channel_id": str(message.channel.id),
+        "timezone": routing_table.timezone_for(message.guild.id),
         "message_id": str(message.id),
         "author_id": str(message.author.id),
         "author_name": str(message.author),
         "link": message.jump_url,
     }
+
+
+async def _run_extraction(message, message_info, mode, reply):
+    """Extract an event from a claimed message and save it (or queue it for a worker)
     
-    # First check if we've already processed this message (to prevent duplicate processing)
-    existing_event = db_client.check_exists_by_message_id(message_info["message_id"])
-    if existing_event:
-        logger.info(f"Skipping already processed message with ID: {message_info['message_id']}")
-        return
+    Returns:
+        bool: False if an event was detected but couldn't be saved
+    """
+    content = message.content
+    shard_metrics = metrics.shard(message.guild.shard_id)
+    shard_metrics.incr("messages_processed")
+    loop = asyncio.get_running_loop()
+    
+    if EXTRACTION_MODE == "queue":
+        # Hand the message to the extraction workers; the job is durable once enqueued
+        payload = {"content": content, "message_info": message_info, "mode": mode, "reply": reply}
+        await loop.run_in_executor(
+            None, db_client.enqueue_job, JOB_EXTRACT, payload, extract_job_id(message.id)
+        )
+        shard_metrics.incr("jobs_enqueued")
+        logger.info(f"Queued extraction job for message {message.id}")
+        return True
     
-    # Try to extract event with Gemini AI (with fallback to regex if needed)
-    event_found, event_data = extract_deadline_with_fallback(content, message_info)
+    # Try to extract event with Gemini AI (with fallback to regex if needed).
+    # Run it in a worker thread so slow model calls don't block the gateway.
+    event_found, event_data = await loop.run_in_executor(
+        None, extract_deadline_with_fallback, content, message_info, mode
+    )
     
     if event_found and event_data:
         date_str = event_data.get('date_str', 'unknown date')
@@ -150,32 +514,48 @@ async def process_message_for_deadlines(message):
         
         try:
             # Save directly to MongoDB only
-            db_result = db_client.save_deadline(event_data)
-            
-            if db_result:
-                logger.info(f"Successfully saved event to MongoDB with ID: {db_result}")
-                
-                # Check if date is properly formatted as YYYY-MM-DD
-                if re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                    # Reply to the message if event was detected and saved
-                    if category == 'deadline':
-                        reply_msg = f"✅ I've tracked this deadline: **{title}** due on **{date_str}**"
-                    else:
-                        reply_msg = f"✅ I've tracked this {category}: **{title}** on **{date_str}**"
-                        
-                    await message.reply(reply_msg)
+            if db_client.write_behind_enabled:
+                future = db_client.queue_deadline(event_data)
+                if WRITE_BEHIND_DURABLE:
+                    # Wait for the batch to be written before confirming in Discord
+                    db_result = await asyncio.wrap_future(future)
                 else:
-                    logger.info(f"Not sending confirmation reply for non-standard date format: {date_str}")
+                    db_result = event_data.get("message_id")
             else:
-                logger.warning(f"Skipped saving to MongoDB (likely due to date format or duplicate)")
+                db_result = db_client.save_deadline(event_data)
+            
+            if not db_result:
                 # Don't reply as the event wasn't saved
+                logger.warning(f"Failed to save event from message {message.id} to MongoDB")
+                return False
+            
+            logger.info(f"Successfully saved event to MongoDB with ID: {db_result}")
+            shard_metrics.incr("deadlines_saved")
+            
+            # Check if date is properly formatted as YYYY-MM-DD
+            if not reply:
+                logger.debug("Not sending confirmation reply for replayed message")
+            elif is_iso_date(date_str):
+                # Reply to the message if event was detected and saved
+                outbound.reply(
+                    message.channel.id, message.id,
+                    confirmation_message(event_data), confirmation_summary(event_data)
+                )
+            else:
+                logger.info(f"Not sending confirmation reply for non-standard date format: {date_str}")
             
         except Exception as db_error:
             logger.error(f"Failed to save to MongoDB: {db_error}")
             # Notify the user there was an issue
-            await message.reply(f"⚠️ Detected {category}: **{title}**, but couldn't save it (MongoDB connection issue)")
+            outbound.reply(
+                message.channel.id, message.id,
+                f"⚠️ Detected {category}: **{title}**, but couldn't save it (MongoDB connection issue)"
+            )
+            return False
     else:
         logger.info("No event detected in message")
+    
+    return True
 
 
 def extract_title(content):
@@ -224,6 +604,8 @@ def send_deadline_to_api(event_data):
     Returns:
         bool: True if the event was successfully sent to the API, False otherwise
     """
+    import requests
+    
     try:
         # Verify we have an API key and URL
         if not BOT_API_KEY or BOT_API_KEY == "your_bot_api_key_here":
@@ -285,10 +667,144 @@ def send_deadline_to_api(event_data):
         return False
 
 
+async def relay_replies():
+    """Post confirmation replies queued by extraction workers
+    
+    At most ``REPLY_MAX_IN_FLIGHT`` jobs are held at once, so replies piling
+    up behind the outbound rate limit stay in the queue where other bot
+    processes can pick them up instead of sitting on expiring leases here.
+    """
+    loop = asyncio.get_running_loop()
+    worker_id = f"bot-{socket.gethostname()}-{os.getpid()}"
+    in_flight = asyncio.Semaphore(max(REPLY_MAX_IN_FLIGHT, 1))
+    logger.info("Relaying confirmation replies from extraction workers")
+    
+    while not bot.is_closed():
+        await in_flight.acquire()
+        try:
+            job = await loop.run_in_executor(None, db_client.claim_job, [JOB_REPLY], worker_id)
+        except DatabaseUnavailableError:
+            job = None
+        
+        if job is None:
+            in_flight.release()
+            await asyncio.sleep(REPLY_POLL_INTERVAL)
+            continue
+        
+        payload = job["payload"]
+        sent = outbound.reply(
+            payload["channel_id"], payload["message_id"], payload["content"], payload.get("summary")
+        )
+        # Ack once the reply is out, without holding up the next job
+        asyncio.create_task(_finish_reply_job(job, worker_id, sent, in_flight))
+
+
+async def _finish_reply_job(job, worker_id, sent, in_flight):
+    """Ack or fail a reply job once the outbound sender has tried to deliver it
+    
+    The lease is renewed while the reply waits in the outbound queue, so a
+    slow channel doesn't hand the job to another process and send it twice.
+    """
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                result = await asyncio.wait_for(asyncio.shield(sent), max(JOB_LEASE_SECONDS / 3, 1))
+                break
+            except asyncio.TimeoutError:
+                await loop.run_in_executor(None, db_client.extend_lease, job["_id"], worker_id)
+        
+        if result in (SENT, UNDELIVERABLE):
+            await loop.run_in_executor(None, db_client.ack_job, job["_id"], worker_id, result)
+        else:
+            error = RuntimeError(f"Failed to send reply to message {job['payload']['message_id']}")
+            await loop.run_in_executor(None, db_client.fail_job, job, worker_id, error)
+    finally:
+        in_flight.release()
+
+
 @bot.command(name='deadlines')
-async def list_deadlines(ctx):
+async def list_deadlines(ctx, count: int = UPCOMING_DEFAULT_COUNT):
     """Command to list upcoming deadlines"""
-    await ctx.send("Upcoming deadlines (placeholder - will be implemented by the team)")
+    count = max(1, min(count, UPCOMING_MAX_COUNT))
+    guild_id = str(ctx.guild.id) if ctx.guild else None
+    
+    loop = asyncio.get_running_loop()
+    try:
+        deadlines = await loop.run_in_executor(None, db_client.get_upcoming, guild_id, count)
+    except DatabaseUnavailableError:
+        await ctx.send("⚠️ The deadline database is unavailable right now, please try again later")
+        return
+    
+    if not deadlines:
+        await ctx.send("No upcoming deadlines 🎉")
+        return
+    
+    lines = [f"**Next {len(deadlines)} deadline{'s' if len(deadlines) != 1 else ''}**"]
+    for deadline in deadlines:
+        when = deadline.get("date_str", "")
+        if deadline.get("time"):
+            when += f" {deadline['time']}"
+        lines.append(f"• **{deadline.get('title', 'Untitled')}** - {when} (#{deadline.get('channel_name', '?')})")
+    await ctx.send("\n".join(lines))
+
+
+@bot.command(name='reload_routing')
+async def reload_routing(ctx):
+    """Admin command to reload the channel routing config without a restart"""
+    if str(ctx.author.id) not in ADMIN_USER_IDS:
+        await ctx.send("⛔ Only bot admins can reload the routing config")
+        return
+    
+    if routing_table.reload():
+        await ctx.send("✅ Routing config reloaded")
+    else:
+        await ctx.send("⚠️ Routing config is invalid - keeping the previous rules (see bot logs)")
+
+
+@bot.command(name='usage')
+async def usage_command(ctx):
+    """Show today's model token usage and budget for this server"""
+    if ctx.guild is None:
+        return
+    
+    used = usage_tracker.tokens_today(ctx.guild.id)
+    budget = usage_tracker.budget(ctx.guild.id)
+    if budget:
+        status = "⚠️ over budget, using local extraction" if used >= budget else f"{used / budget:.0%} of budget"
+        await ctx.send(f"Model tokens used today: **{used:,}** / {budget:,} ({status})")
+    else:
+        await ctx.send(f"Model tokens used today: **{used:,}** (no daily budget)")
+
+
+@bot.command(name='shard_stats')
+async def shard_stats(ctx):
+    """Admin command to show per-shard message and backfill counters"""
+    if str(ctx.author.id) not in ADMIN_USER_IDS:
+        await ctx.send("⛔ Only bot admins can view shard stats")
+        return
+    
+    lines = [f"**Shards {shard_label()}**"]
+    for stats in metrics.snapshot():
+        shard = bot.get_shard(stats["shard_id"]) if SHARDING_ENABLED else None
+        latency = shard.latency if shard else bot.latency
+        lines.append(
+            f"`{stats['shard_id']}` seen {stats['messages_seen']}, processed {stats['messages_processed']}, "
+            f"saved {stats['deadlines_saved']}, dupes {stats['messages_skipped_duplicate']}, "
+            f"backfilled {stats['backfill_replayed']}, errors {stats['errors']}, "
+            f"reconnects {stats['disconnects']}, latency {latency * 1000:.0f}ms"
+        )
+    
+    prompt = prompt_metrics.snapshot()
+    lines.append(
+        f"Prompt normalization: {prompt['messages']} messages, ~{prompt['tokens_saved']} tokens saved "
+        f"(avg {prompt['avg_saved']:.0f}, max {prompt['max_saved']})"
+    )
+    lines.append(
+        f"Outbound: {outbound.pending} queued, {outbound.stats['sent']} sent, "
+        f"{outbound.stats['coalesced']} coalesced, {outbound.stats['retries']} retries, {outbound.stats['failed']} failed"
+    )
+    await ctx.send("\n".join(lines))
 
 
 @bot.command(name='help_bot')
@@ -296,7 +812,8 @@ async def help_command(ctx):
     """Display help information"""
     help_text = """
 **Club Announcement Tracker Bot Commands**
-`!deadlines` - List upcoming deadlines and events
+`!deadlines [count]` - List the next upcoming deadlines and events
+`!usage` - Show today's AI token usage for this server
 `!help_bot` - Display this help message
 
 This bot automatically detects and tracks:
@@ -308,25 +825,8 @@ This bot automatically detects and tracks:
     await ctx.send(help_text)
 
 
-def main():
-    """Main function to start the bot"""
-    global gemini_available
-    
-    # Better token validation
-    if not TOKEN:
-        logger.error("No Discord token found. Please set the DISCORD_TOKEN environment variable.")
-        logger.error("Make sure your .env file exists and contains DISCORD_TOKEN=your_token_here")
-        logger.error("No quotes, no spaces around the equals sign.")
-        return
-    
-    # Validate token format
-    if len(TOKEN) < 50 or " " in TOKEN or TOKEN.startswith('"') or TOKEN.startswith("'"):
-        logger.error("Discord token appears malformed.")
-        logger.error("Token should be ~59-70 characters without quotes or spaces.")
-        logger.error("Please check your .env file format and token value.")
-        return
-    
-    # Explicitly test MongoDB Atlas connection
+def check_mongodb():
+    """Startup check: test the MongoDB connection"""
     try:
         # Get MongoDB URI for troubleshooting
         mongodb_uri = os.getenv('MONGODB_URI')
@@ -340,6 +840,7 @@ def main():
         # Test connection by getting server info
         db_info = db_client.test_connection()
         logger.info(f"Successfully connected to MongoDB Atlas: {db_info}")
+        return True
     except Exception as e:
         logger.error(f"Failed to connect to MongoDB: {e}")
         logger.error("If using MongoDB Atlas, please check:")
@@ -347,27 +848,77 @@ def main():
         logger.error("2. Your username, password, and network access are properly configured")
         logger.error("3. You've whitelisted your IP address in MongoDB Atlas network settings")
         # Continue anyway to allow Discord functionality
+        return False
+
+
+def setup_gemini():
+    """Startup check: initialize Gemini AI"""
+    if not GEMINI_API_KEY:
+        logger.warning("No GEMINI_API_KEY found in environment variables - will fall back to regex patterns")
+        return False
     
-    # Initialize Gemini AI
-    if GEMINI_API_KEY:
-        gemini_available = init_gemini(GEMINI_API_KEY)
-        if gemini_available:
-            logger.info("Gemini AI initialized successfully")
-        else:
-            logger.warning("Failed to initialize Gemini AI - will fall back to regex patterns")
+    available = init_gemini(GEMINI_API_KEY)
+    if available:
+        logger.info("Gemini AI initialized successfully")
     else:
-        logger.warning("No GEMINI_API_KEY found in environment variables - will fall back to regex patterns")
+        logger.warning("Failed to initialize Gemini AI - will fall back to regex patterns")
+    return available
+
+
+def check_api():
+    """Startup check: make sure the backend API is reachable"""
+    import requests
     
-    # Check API connection
     try:
-        response = requests.get(f"{API_URL}")
+        response = requests.get(f"{API_URL}", timeout=STARTUP_CHECK_TIMEOUT)
         if response.status_code == 200:
             logger.info(f"Successfully connected to backend API at {API_URL}")
-        else:
-            logger.warning(f"Backend API responded with status code {response.status_code}")
+            return True
+        logger.warning(f"Backend API responded with status code {response.status_code}")
     except Exception as e:
         logger.error(f"Failed to connect to backend API: {e}")
         logger.error(f"Please make sure the backend API is running at {API_URL}")
+    return False
+
+
+def main():
+    """Main function to start the bot"""
+    global gemini_available
+    
+    # Better token validation
+    if not TOKEN:
+        logger.error("No Discord token found. Please set the DISCORD_TOKEN environment variable.")
+        logger.error("Make sure your .env file exists and contains DISCORD_TOKEN=your_token_here")
+        logger.error("No quotes, no spaces around the equals sign.")
+        return
+    
+    # Validate token format
+    if len(TOKEN) < 50 or " " in TOKEN or TOKEN.startswith('"') or TOKEN.startswith("'"):
+        logger.error("Discord token appears malformed.")
+        logger.error("Token should be ~59-70 characters without quotes or spaces.")
+        logger.error("Please check your .env file format and token value.")
+        return
+    
+    # Run the startup health checks in parallel so a slow dependency doesn't delay the others
+    executor = ThreadPoolExecutor(max_workers=3, thread_name_prefix="startup-check")
+    checks = {
+        "MongoDB": executor.submit(check_mongodb),
+        "Gemini AI": executor.submit(setup_gemini),
+        "backend API": executor.submit(check_api),
+    }
+    done, _ = wait(checks.values(), timeout=STARTUP_CHECK_TIMEOUT)
+    executor.shutdown(wait=False)
+    
+    for name, future in checks.items():
+        if future not in done:
+            logger.warning(f"{name} startup check timed out after {STARTUP_CHECK_TIMEOUT}s - continuing anyway")
+    
+    gemini_future = checks["Gemini AI"]
+    gemini_available = gemini_future in done and gemini_future.result()
+    
+    if WRITE_BEHIND_ENABLED:
+        db_client.enable_write_behind()
+    usage_tracker.start()
     
     logger.info("Starting Discord bot...")
     try:
@@ -377,6 +928,10 @@ def main():
         if "Improper token" in str(e):
             logger.error("Please check your Discord token. It may be expired or invalid.")
             logger.error("Go to Discord Developer Portal and reset your token if needed.")
+    finally:
+        # Flush buffered writes and usage totals, then close the connection pool
+        usage_tracker.close()
+        db_client.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,106 @@
+import time
+import threading
+from collections import Counter
+
+# Counters tracked for every shard
+METRIC_NAMES = (
+    "messages_seen",
+    "messages_processed",
+    "messages_skipped_duplicate",
+    "jobs_enqueued",
+    "deadlines_saved",
+    "backfill_replayed",
+    "edits_reextracted",
+    "edits_skipped",
+    "deletes",
+    "errors",
+    "ready",
+    "disconnects",
+    "resumes",
+)
+
+
+class ShardMetrics:
+    """Counters for a single shard"""
+
+    def __init__(self, shard_id):
+        self.shard_id = shard_id
+        self.started_at = time.time()
+        self.last_ready_at = None
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def incr(self, name, amount=1):
+        """Increment a counter"""
+        with self._lock:
+            self._counts[name] += amount
+
+    def snapshot(self):
+        """Get the counters as a plain dict"""
+        with self._lock:
+            counts = {name: self._counts.get(name, 0) for name in METRIC_NAMES}
+        counts["shard_id"] = self.shard_id
+        counts["uptime_seconds"] = int(time.time() - self.started_at)
+        counts["last_ready_at"] = self.last_ready_at
+        return counts
+
+
+class ShardMetricsRegistry:
+    """Per-shard metrics, created on first use
+
+    A non-sharded bot reports everything under shard ``0``.
+    """
+
+    def __init__(self):
+        self._shards = {}
+        self._lock = threading.Lock()
+
+    def shard(self, shard_id):
+        """Get the metrics for a shard"""
+        shard_id = shard_id or 0
+        metrics = self._shards.get(shard_id)
+        if metrics is None:
+            with self._lock:
+                metrics = self._shards.setdefault(shard_id, ShardMetrics(shard_id))
+        return metrics
+
+    def snapshot(self):
+        """Get the counters of every shard, ordered by shard ID"""
+        return [self._shards[shard_id].snapshot() for shard_id in sorted(self._shards)]
+
+
+class PromptMetrics:
+    """Input tokens saved by normalizing messages before they're sent to the model"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.messages = 0
+        self.tokens_original = 0
+        self.tokens_sent = 0
+        self.max_saved = 0
+
+    def record(self, original_tokens, sent_tokens):
+        """Record the token estimates for one message"""
+        saved = max(original_tokens - sent_tokens, 0)
+        with self._lock:
+            self.messages += 1
+            self.tokens_original += original_tokens
+            self.tokens_sent += sent_tokens
+            self.max_saved = max(self.max_saved, saved)
+
+    def snapshot(self):
+        """Get the totals as a plain dict"""
+        with self._lock:
+            saved = self.tokens_original - self.tokens_sent
+            return {
+                "messages": self.messages,
+                "tokens_original": self.tokens_original,
+                "tokens_sent": self.tokens_sent,
+                "tokens_saved": saved,
+                "avg_saved": saved / self.messages if self.messages else 0.0,
+                "max_saved": self.max_saved,
+            }
+
+
+metrics = ShardMetricsRegistry()
+prompt_metrics = PromptMetrics()
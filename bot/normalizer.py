@@ -0,0 +1,208 @@
+import os
+import re
+import math
+import hashlib
+from typing import Any, Dict, NamedTuple
+
+# Maximum estimated input tokens sent to the model per message
+PROMPT_TOKEN_BUDGET = int(os.getenv('PROMPT_TOKEN_BUDGET', '1024'))
+
+# URLs longer than this are swapped for a short placeholder in the prompt
+# and restored in the model's answer
+PROMPT_URL_MAX_CHARS = int(os.getenv('PROMPT_URL_MAX_CHARS', '60'))
+
+_CODE_BLOCK_RE = re.compile(r'```[^\n`]*\n?(.*?)```', re.DOTALL)
+_USER_MENTION_RE = re.compile(r'<@!?\d+>')
+_ROLE_MENTION_RE = re.compile(r'<@&\d+>')
+_CHANNEL_MENTION_RE = re.compile(r'<#\d+>')
+_CUSTOM_EMOJI_RE = re.compile(r'<a?:(\w+):\d+>')
+_URL_RE = re.compile(r'https?://[^\s<>()]+')
+# Runs of the same symbol/emoji sequence or letter ("!!!!!!", "🎉🎉🎉🎉🎉", "sooooo"), digits are left alone
+_REPEATED_SYMBOL_RE = re.compile(r'([^\w\s]{1,4}?)\1{3,}')
+_REPEATED_LETTER_RE = re.compile(r'([^\W\d_])\1{3,}')
+_REPEATED_TOKEN_RE = re.compile(r'(\S+)(?:[ \t]+\1){2,}')
+_SPACES_RE = re.compile(r'[ \t\u200b]+')
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+
+# Lines worth keeping when trimming: dates, times, links and headings
+_DATE_HINT_RE = re.compile(
+    r'\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\.?\s+\d'
+    r'|\b(?:mon|tue|wed|thu|fri|sat|sun)[a-z]*day\b'
+    r'|\b(?:today|tonight|tomorrow|deadline|due)\b'
+    r'|\b\d{1,2}[/-]\d{1,2}\b|\b\d{4}-\d{2}-\d{2}\b'
+    r'|\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b',
+    re.IGNORECASE
+)
+_HEADING_RE = re.compile(r'^\s*(?:#{1,3}\s|\*\*[^*]+\*\*\s*$|__[^_]+__\s*$)')
+_LINK_PLACEHOLDER_RE = re.compile(r'\[link(\d+)\]')
+
+
+class NormalizedText(NamedTuple):
+    """Result of normalizing a message for the prompt"""
+    text: str
+    original_tokens: int
+    tokens: int
+    links: Dict[str, str]
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.original_tokens - self.tokens, 0)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (about four characters per token for English)"""
+    if not text:
+        return 0
+    return math.ceil(len(text) / 4)
+
+
+def _compact_code_block(match) -> str:
+    """Replace a code block with its date lines (if any) and a size marker"""
+    lines = match.group(1).strip().splitlines()
+    kept = [line.strip() for line in lines if _DATE_HINT_RE.search(line)]
+    marker = f"[code block: {len(lines)} lines]"
+    return "\n".join([marker] + kept[:5])
+
+
+def _is_priority_line(line: str) -> bool:
+    return bool(_HEADING_RE.match(line) or _DATE_HINT_RE.search(line) or '[link' in line or 'http' in line)
+
+
+def _trim_to_budget(text: str, budget: int) -> str:
+    """Keep the opening lines plus headings, date and link lines within the budget"""
+    lines = text.splitlines()
+    keep = [False] * len(lines)
+    used = 0
+
+    def take(index):
+        nonlocal used
+        cost = estimate_tokens(lines[index]) + 1
+        if keep[index] or used + cost > budget:
+            return False
+        keep[index] = True
+        used += cost
+        return True
+
+    # The opening lines usually carry the title, then prioritize the informative lines
+    for index in range(min(3, len(lines))):
+        take(index)
+    for index, line in enumerate(lines):
+        if _is_priority_line(line):
+            take(index)
+    for index in range(len(lines)):
+        take(index)
+
+    # A single huge line gets cut
+    if not any(keep) and lines:
+        return lines[0][:budget * 4] + " [...]"
+
+    result = []
+    skipped = False
+    for line, kept in zip(lines, keep):
+        if kept:
+            result.append(line)
+            skipped = False
+        elif not skipped:
+            result.append("[...]")
+            skipped = True
+    return "\n".join(result)
+
+
+def normalize_message(content: str, budget: int = PROMPT_TOKEN_BUDGET,
+                      url_max_chars: int = PROMPT_URL_MAX_CHARS) -> NormalizedText:
+    """Strip and compact content that costs tokens without helping extraction
+
+    Code blocks are reduced to the lines mentioning dates, mentions and
+    custom emoji are shortened, long URLs are replaced with ``[linkN]``
+    placeholders, runs of repeated characters/emoji/words are collapsed,
+    and the result is trimmed to ``budget`` estimated tokens, keeping the
+    opening lines, headings, dates and links first.
+
+    Args:
+        content: Raw message content
+        budget: Maximum estimated tokens to keep
+        url_max_chars: URLs longer than this are replaced with placeholders
+
+    Returns:
+        NormalizedText with the prompt text, token estimates and the
+        placeholder -> URL mapping needed by ``restore_links``
+    """
+    original_tokens = estimate_tokens(content)
+    text = content or ""
+
+    text = _CODE_BLOCK_RE.sub(_compact_code_block, text)
+    text = _USER_MENTION_RE.sub("@user", text)
+    text = _ROLE_MENTION_RE.sub("@role", text)
+    text = _CHANNEL_MENTION_RE.sub("#channel", text)
+    text = _CUSTOM_EMOJI_RE.sub(r":\1:", text)
+
+    links = {}
+
+    def shorten_url(match):
+        url = match.group(0)
+        if len(url) <= url_max_chars:
+            return url
+        for placeholder, existing in links.items():
+            if existing == url:
+                return placeholder
+        placeholder = f"[link{len(links) + 1}]"
+        links[placeholder] = url
+        return placeholder
+
+    text = _URL_RE.sub(shorten_url, text)
+    text = _REPEATED_SYMBOL_RE.sub(r"\1\1\1", text)
+    text = _REPEATED_LETTER_RE.sub(r"\1\1\1", text)
+    text = _REPEATED_TOKEN_RE.sub(r"\1 \1", text)
+    text = "\n".join(_SPACES_RE.sub(" ", line).strip() for line in text.splitlines())
+    text = _BLANK_LINES_RE.sub("\n\n", text).strip()
+
+    if estimate_tokens(text) > budget:
+        text = _trim_to_budget(text, budget)
+
+    return NormalizedText(text, original_tokens, estimate_tokens(text), links)
+
+
+def restore_links(value: Any, links: Dict[str, str]) -> Any:
+    """Put the original URLs back wherever the model echoed a placeholder
+
+    Args:
+        value: Model output (dict, list or string)
+        links: Placeholder -> URL mapping from ``normalize_message``
+
+    Returns:
+        The value with placeholders replaced
+    """
+    if not links:
+        return value
+    if isinstance(value, str):
+        return _LINK_PLACEHOLDER_RE.sub(lambda m: links.get(m.group(0), m.group(0)), value)
+    if isinstance(value, list):
+        return [restore_links(item, links) for item in value]
+    if isinstance(value, dict):
+        return {key: restore_links(item, links) for key, item in value.items()}
+    return value
+
+
+_LOCATION_HINT_RE = re.compile(r'\b(?:where|location|room|hall|building|venue|zoom|meet)\b|📍', re.IGNORECASE)
+
+
+def salient_hash(content: str) -> str:
+    """Hash the parts of a message that extraction depends on
+
+    Only the opening line (usually the title), headings and lines with
+    dates, times or locations are hashed, after normalization, so edits
+    that fix a typo elsewhere or add emoji don't trigger a re-extraction.
+
+    Args:
+        content: Raw message content
+
+    Returns:
+        str: Hex digest
+    """
+    text = normalize_message(content or "", budget=10 ** 9).text
+    lines = [line.strip().lower() for line in text.splitlines() if line.strip()]
+    salient = [
+        line for index, line in enumerate(lines)
+        if index == 0 or _HEADING_RE.match(line) or _DATE_HINT_RE.search(line) or _LOCATION_HINT_RE.search(line)
+    ]
+    return hashlib.sha1("\n".join(salient).encode("utf-8")).hexdigest()
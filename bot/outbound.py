@@ -0,0 +1,226 @@
+import os
+import asyncio
+import logging
+
+import discord
+
+from bot.rate_limiter import AsyncRateLimiter
+
+logger = logging.getLogger('deadline-bot.outbound')
+
+# Outbound message configuration. Discord allows about 5 messages per
+# 5 seconds per channel, the rate leaves some headroom for other writers.
+OUTBOUND_CHANNEL_RATE = float(os.getenv('OUTBOUND_CHANNEL_RATE', '0.8'))  # messages per second per channel
+OUTBOUND_CHANNEL_BURST = int(os.getenv('OUTBOUND_CHANNEL_BURST', '4'))
+OUTBOUND_MAX_RETRIES = int(os.getenv('OUTBOUND_MAX_RETRIES', '3'))
+OUTBOUND_IDLE_TIMEOUT = float(os.getenv('OUTBOUND_IDLE_TIMEOUT', '60'))  # seconds before an idle channel is dropped
+OUTBOUND_MAX_BATCH = int(os.getenv('OUTBOUND_MAX_BATCH', '10'))
+
+# Discord's message length limit
+MAX_MESSAGE_LENGTH = 2000
+
+# Send outcomes
+SENT = "sent"
+UNDELIVERABLE = "undeliverable"
+FAILED = "failed"
+
+
+class _Outgoing:
+    """A queued reply and the future resolved with its outcome"""
+
+    __slots__ = ("message_id", "content", "summary", "future")
+
+    def __init__(self, message_id, content, summary, future):
+        self.message_id = message_id
+        self.content = content
+        self.summary = summary
+        self.future = future
+
+
+def _chunk_lines(header, lines, limit=MAX_MESSAGE_LENGTH):
+    """Join lines under a header into as few messages as fit the length limit
+
+    Returns:
+        list: (message, number of lines in it) tuples
+    """
+    chunks = []
+    current = header
+    count = 0
+    for line in lines:
+        line = line[:limit - len(header) - 1]
+        if count and len(current) + 1 + len(line) > limit:
+            chunks.append((current, count))
+            current = header
+            count = 0
+        current += "\n" + line
+        count += 1
+    chunks.append((current, count))
+    return chunks
+
+
+class OutboundSender:
+    """Sends replies in the background with one queue per channel
+
+    Callers enqueue and move on, so extraction never waits on Discord.
+    Each channel has a worker task that sends its replies in order, paced
+    by a per-channel token bucket below Discord's channel limit, and
+    retries 429s and server errors with backoff. When replies pile up
+    behind the limit, the ones that have a ``summary`` line are sent as a
+    single summary message instead of one reply each. Idle channel
+    workers exit after ``idle_timeout`` so memory is bounded by the number
+    of active channels.
+    """
+
+    def __init__(self, bot, rate=OUTBOUND_CHANNEL_RATE, burst=OUTBOUND_CHANNEL_BURST,
+                 max_retries=OUTBOUND_MAX_RETRIES, idle_timeout=OUTBOUND_IDLE_TIMEOUT,
+                 max_batch=OUTBOUND_MAX_BATCH):
+        """Initialize the sender
+
+        Args:
+            bot: The discord.py bot used to resolve channels
+            rate: Messages per second per channel
+            burst: Messages a channel can send at once after being quiet
+            max_retries: Retries for rate-limited or failed sends
+            idle_timeout: Seconds an empty channel queue is kept around
+            max_batch: Maximum number of replies coalesced into one summary
+        """
+        self.bot = bot
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.idle_timeout = idle_timeout
+        self.max_batch = max(max_batch, 1)
+        self._queues = {}   # channel_id -> asyncio.Queue
+        self._workers = {}  # channel_id -> asyncio.Task
+        self.stats = {"sent": 0, "coalesced": 0, "retries": 0, "failed": 0}
+
+    @property
+    def pending(self):
+        """Number of replies waiting to be sent"""
+        return sum(queue.qsize() for queue in self._queues.values())
+
+    def reply(self, channel_id, message_id, content, summary=None):
+        """Queue a reply to a message
+
+        Args:
+            channel_id: Channel the message is in
+            message_id: Message to reply to
+            content: Reply text when sent on its own
+            summary: Optional one-line version used when coalescing replies
+
+        Returns:
+            asyncio.Future: Resolved with ``SENT``, ``UNDELIVERABLE`` or ``FAILED``
+        """
+        channel_id = int(channel_id)
+        future = asyncio.get_running_loop().create_future()
+        queue = self._queues.get(channel_id)
+        if queue is None:
+            queue = self._queues[channel_id] = asyncio.Queue()
+        queue.put_nowait(_Outgoing(int(message_id), content, summary, future))
+
+        if channel_id not in self._workers:
+            self._workers[channel_id] = asyncio.create_task(self._drain(channel_id, queue))
+        return future
+
+    async def close(self):
+        """Stop the channel workers (replies still queued are dropped)"""
+        for task in self._workers.values():
+            task.cancel()
+        await asyncio.gather(*self._workers.values(), return_exceptions=True)
+        self._workers.clear()
+        self._queues.clear()
+
+    async def _drain(self, channel_id, queue):
+        limiter = AsyncRateLimiter(self.rate, burst=self.burst)
+        try:
+            while True:
+                try:
+                    first = await asyncio.wait_for(queue.get(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    return
+
+                await limiter.acquire()
+
+                # Everything that queued up while waiting for the limiter goes out together
+                batch = [first]
+                while not queue.empty() and len(batch) < self.max_batch:
+                    batch.append(queue.get_nowait())
+
+                try:
+                    channel = self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+                except (discord.NotFound, discord.Forbidden) as e:
+                    logger.warning(f"Dropping {len(batch)} replies for channel {channel_id}: {e}")
+                    self._resolve(batch, UNDELIVERABLE)
+                    continue
+                except Exception as e:
+                    logger.error(f"Couldn't resolve channel {channel_id}: {e}")
+                    self._resolve(batch, FAILED)
+                    continue
+
+                await self._send_batch(channel, batch, limiter)
+        finally:
+            # Nothing can be queued between the timeout and here, the loop is single-threaded
+            if self._workers.get(channel_id) is asyncio.current_task():
+                del self._workers[channel_id]
+                self._queues.pop(channel_id, None)
+
+    async def _send_batch(self, channel, batch, limiter):
+        coalesce = [item for item in batch if item.summary]
+        single = [item for item in batch if not item.summary]
+        if len(coalesce) < 2:
+            single = batch
+            coalesce = []
+
+        if coalesce:
+            header = f"✅ Tracked {len(coalesce)} events:"
+            chunks = _chunk_lines(header, [f"• {item.summary}" for item in coalesce])
+            # Each item is resolved with the outcome of the chunk that carried its line
+            start = 0
+            outcome = SENT
+            for index, (chunk, size) in enumerate(chunks):
+                items = coalesce[start:start + size]
+                start += size
+                if outcome != SENT:
+                    # Stop after a failed chunk, the later ones would fail the same way
+                    self._resolve(items, outcome)
+                    continue
+                if index:
+                    await limiter.acquire()
+                outcome = await self._send(channel.send, chunk)
+                self._resolve(items, outcome)
+            self.stats["coalesced"] += len(coalesce)
+
+        for index, item in enumerate(single):
+            if index or coalesce:
+                await limiter.acquire()
+            target = channel.get_partial_message(item.message_id)
+            self._resolve([item], await self._send(target.reply, item.content))
+
+    async def _send(self, send, content):
+        """Call ``send(content)`` with retries, returning the outcome"""
+        for attempt in range(self.max_retries + 1):
+            try:
+                await send(content)
+                self.stats["sent"] += 1
+                return SENT
+            except (discord.NotFound, discord.Forbidden) as e:
+                # The message or channel is gone, retrying won't help
+                logger.warning(f"Dropping outbound message: {e}")
+                return UNDELIVERABLE
+            except (discord.HTTPException, OSError, asyncio.TimeoutError) as e:
+                status = getattr(e, "status", None)
+                if (status is not None and status != 429 and status < 500) or attempt == self.max_retries:
+                    logger.error(f"Failed to send outbound message: {e}")
+                    break
+                retry_after = getattr(e, "retry_after", None) or 2 ** attempt
+                self.stats["retries"] += 1
+                logger.warning(f"Outbound send failed ({e}), retrying in {retry_after}s")
+                await asyncio.sleep(retry_after)
+        self.stats["failed"] += 1
+        return FAILED
+
+    @staticmethod
+    def _resolve(items, outcome):
+        for item in items:
+            if not item.future.done():
+                item.future.set_result(outcome)
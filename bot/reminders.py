@@ -0,0 +1,205 @@
+import os
+import heapq
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+import discord
+
+from bot.rate_limiter import AsyncRateLimiter
+
+logger = logging.getLogger('deadline-bot.reminders')
+
+# Reminder configuration
+REMINDERS_ENABLED = os.getenv('REMINDERS_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+REMINDER_LEAD_MINUTES = int(os.getenv('REMINDER_LEAD_MINUTES', '1440'))  # how long before due_at
+REMINDER_WINDOW_HOURS = int(os.getenv('REMINDER_WINDOW_HOURS', '24'))  # how far past the lead to load
+REMINDER_MAX_QUEUED = int(os.getenv('REMINDER_MAX_QUEUED', '1000'))
+REMINDER_REFRESH_INTERVAL = float(os.getenv('REMINDER_REFRESH_INTERVAL', '60'))
+REMINDER_RESYNC_INTERVAL = float(os.getenv('REMINDER_RESYNC_INTERVAL', '600'))
+REMINDER_RATE = float(os.getenv('REMINDER_RATE', '2'))  # reminders per second
+REMINDER_MAX_RETRIES = int(os.getenv('REMINDER_MAX_RETRIES', '3'))
+
+
+def reminder_message(deadline):
+    """Build the text of a reminder
+
+    Args:
+        deadline (dict): Deadline document from ``get_pending_reminders``
+
+    Returns:
+        str: Reminder text
+    """
+    title = deadline.get('title', 'Untitled Event')
+    category = deadline.get('category', 'event')
+    # Discord renders <t:...> timestamps in each reader's own timezone
+    when = f"<t:{int(deadline['due_at'].timestamp())}:R>"
+    if deadline.get('all_day'):
+        when = f"on **{deadline.get('date_str')}**"
+
+    text = f"⏰ Reminder: the {category} **{title}** is due {when}"
+    if deadline.get('link'):
+        text += f"\n{deadline['link']}"
+    return text
+
+
+class ReminderScheduler:
+    """Sends a reminder in the source channel ahead of each deadline
+
+    Only the next reminders are kept in memory, in a min-heap ordered by
+    reminder time and capped at ``max_queued``, so memory stays bounded no
+    matter how many future events are stored. The heap is filled from an
+    indexed ``due_at`` range: every ``refresh_interval`` the window is
+    extended from where the last load stopped, and every
+    ``resync_interval`` it is reloaded from scratch to pick up events
+    saved by other processes, edited or deleted since they were loaded.
+
+    Each deadline is marked with ``reminder_sent_at`` in MongoDB before its
+    reminder is sent, with an atomic update that only one process can win,
+    so reminders survive restarts and are never sent twice. That update
+    returns the current deadline, so one whose ``due_at`` was edited after
+    it was loaded is queued again for its new time instead of being sent.
+    """
+
+    def __init__(self, bot, db_client, lead_minutes=REMINDER_LEAD_MINUTES, window_hours=REMINDER_WINDOW_HOURS,
+                 max_queued=REMINDER_MAX_QUEUED, refresh_interval=REMINDER_REFRESH_INTERVAL,
+                 resync_interval=REMINDER_RESYNC_INTERVAL, rate=REMINDER_RATE, sharded=False):
+        """Initialize the scheduler
+
+        Args:
+            bot: The discord.py bot used to send reminders
+            db_client: MongoDBClient holding the deadlines
+            lead_minutes: How long before a deadline its reminder is sent
+            window_hours: How far beyond the lead time deadlines are loaded
+            max_queued: Maximum number of reminders kept in memory
+            refresh_interval: Seconds between incremental loads
+            resync_interval: Seconds between full reloads of the window
+            rate: Maximum number of reminders sent per second
+            sharded: Only load deadlines from guilds this process is connected to
+        """
+        self.bot = bot
+        self.db_client = db_client
+        self.lead = timedelta(minutes=lead_minutes)
+        self.window = timedelta(hours=window_hours)
+        self.max_queued = max(max_queued, 1)
+        self.refresh_interval = refresh_interval
+        self.resync_interval = resync_interval
+        self.sharded = sharded
+        self._limiter = AsyncRateLimiter(rate, burst=max(int(rate), 1))
+        self._heap = []       # (remind_at, deadline_id, deadline)
+        self._queued = set()  # deadline IDs in the heap
+        self._loaded_until = None
+        self._next_resync = 0.0
+
+    def __len__(self):
+        return len(self._heap)
+
+    async def run(self):
+        """Load and send reminders until cancelled"""
+        loop = asyncio.get_running_loop()
+        logger.info(f"Reminder scheduler started ({int(self.lead.total_seconds() // 60)} minutes ahead)")
+        while True:
+            try:
+                await self.refresh(full=loop.time() >= self._next_resync)
+            except Exception as e:
+                logger.error(f"Failed to load reminders: {e}")
+
+            next_refresh = loop.time() + self.refresh_interval
+            while loop.time() < next_refresh:
+                await self._send_due()
+                delay = next_refresh - loop.time()
+                if self._heap:
+                    delay = min(delay, (self._heap[0][0] - datetime.now(timezone.utc)).total_seconds())
+                await asyncio.sleep(max(delay, 0.05))
+
+    async def refresh(self, full=False):
+        """Load the reminders due in the window into the heap
+
+        Args:
+            full: Reload the whole window instead of extending it
+        """
+        loop = asyncio.get_running_loop()
+        now = datetime.now(timezone.utc)
+        end = now + self.lead + self.window
+
+        if full or self._loaded_until is None:
+            self._heap.clear()
+            self._queued.clear()
+            self._loaded_until = now
+            self._next_resync = loop.time() + self.resync_interval
+
+        room = self.max_queued - len(self._heap)
+        if room <= 0 or self._loaded_until >= end:
+            return
+
+        guild_ids = [guild.id for guild in self.bot.guilds] if self.sharded else None
+        deadlines = await loop.run_in_executor(
+            None, self.db_client.get_pending_reminders, self._loaded_until, end, room, guild_ids
+        )
+        for deadline in deadlines:
+            self._push(deadline)
+
+        # A full batch means there's more in the window, continue after the last one next time
+        if len(deadlines) >= room:
+            self._loaded_until = deadlines[-1]["due_at"]
+        else:
+            self._loaded_until = end
+
+    def _push(self, deadline):
+        if deadline["_id"] in self._queued:
+            return
+        remind_at = deadline["due_at"] - self.lead
+        heapq.heappush(self._heap, (remind_at, deadline["_id"], deadline))
+        self._queued.add(deadline["_id"])
+
+    async def _send_due(self):
+        """Send every reminder whose time has come"""
+        now = datetime.now(timezone.utc)
+        while self._heap and self._heap[0][0] <= now:
+            _, deadline_id, deadline = heapq.heappop(self._heap)
+            self._queued.discard(deadline_id)
+            if deadline["due_at"] <= now:
+                continue
+            await self._remind(deadline)
+
+    async def _remind(self, deadline):
+        loop = asyncio.get_running_loop()
+        current = await loop.run_in_executor(None, self.db_client.mark_reminder_sent, deadline["_id"])
+        if current is None:
+            # Another process sent it, or the deadline was deleted
+            return
+        
+        if current.get("due_at") != deadline["due_at"]:
+            # Edited since it was loaded, queue it again for its new time
+            await loop.run_in_executor(None, self.db_client.clear_reminder_sent, deadline["_id"])
+            if current.get("due_at") is not None:
+                self._push(current)
+            return
+        deadline = current
+
+        try:
+            channel = self.bot.get_channel(int(deadline["channel_id"]))
+            if channel is None:
+                channel = await self.bot.fetch_channel(int(deadline["channel_id"]))
+            await self._send(channel, reminder_message(deadline))
+            logger.info(f"Sent reminder for deadline {deadline['_id']} in channel {deadline['channel_id']}")
+        except (discord.NotFound, discord.Forbidden) as e:
+            # The channel is gone or closed to the bot, don't try again
+            logger.warning(f"Can't send reminder for deadline {deadline['_id']}: {e}")
+        except Exception as e:
+            logger.error(f"Failed to send reminder for deadline {deadline['_id']}: {e}")
+            # Let the next resync pick it up again
+            await loop.run_in_executor(None, self.db_client.clear_reminder_sent, deadline["_id"])
+
+    async def _send(self, channel, content):
+        """Send a message, paced by the limiter and backing off on 429s"""
+        for attempt in range(REMINDER_MAX_RETRIES + 1):
+            await self._limiter.acquire()
+            try:
+                return await channel.send(content)
+            except discord.HTTPException as e:
+                if (e.status != 429 and e.status < 500) or attempt == REMINDER_MAX_RETRIES:
+                    raise
+                retry_after = getattr(e, 'retry_after', None) or 2 ** attempt
+                logger.warning(f"Reminder send failed with {e.status}, retrying in {retry_after}s")
+                await asyncio.sleep(retry_after)
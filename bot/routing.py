@@ -0,0 +1,207 @@
+import os
+import re
+import json
+import logging
+
+logger = logging.getLogger('deadline-bot.routing')
+
+# Extraction modes a channel can be routed to
+MODE_LLM = "llm"        # Gemini extraction
+MODE_LOCAL = "local"    # Local regex extraction only, no model calls
+MODE_OFF = "off"        # Never run extraction
+MODES = (MODE_LLM, MODE_LOCAL, MODE_OFF)
+
+ROUTING_CONFIG_PATH = os.getenv(
+    'ROUTING_CONFIG_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'routing.json')
+)
+
+
+def _check_mode(mode, where):
+    """Validate an extraction mode from the config file"""
+    if mode not in MODES:
+        raise ValueError(f"Invalid extraction mode '{mode}' in {where} (expected one of {', '.join(MODES)})")
+    return mode
+
+
+def _compile_rules(rules, where):
+    """Compile a list of ``{"pattern": ..., "mode": ...}`` channel-name rules"""
+    compiled = []
+    for rule in rules or []:
+        pattern = re.compile(rule["pattern"], re.IGNORECASE)
+        compiled.append((pattern, _check_mode(rule.get("mode", MODE_LLM), where)))
+    return compiled
+
+
+class _GuildRoutes:
+    """Compiled routing rules for a single guild"""
+
+    def __init__(self, guild_id, config, default_mode):
+        where = f"guild {guild_id}"
+        self.default_mode = _check_mode(config.get("default_mode", default_mode), where)
+        self.allow = {str(c).lower() for c in config.get("allow", [])}
+        self.deny = {str(c).lower() for c in config.get("deny", [])}
+        self.channels = {
+            str(channel).lower(): _check_mode(mode, where)
+            for channel, mode in config.get("channels", {}).items()
+        }
+        self.rules = _compile_rules(config.get("rules"), where)
+        self.timezone = config.get("timezone")
+        self.daily_token_budget = config.get("daily_token_budget")
+
+
+class RoutingTable:
+    """Decides which extraction mode applies to a channel
+
+    The table is loaded from a JSON file and compiled once. Channels can be
+    referenced by ID or by name. Resolution order for a message is:
+
+    1. Guild denylist -> off
+    2. Guild allowlist (when non-empty) -> off for channels not listed
+    3. Explicit per-channel mode for the guild
+    4. First matching guild regex rule, then first matching global rule
+    5. Guild default mode, then global default mode
+
+    Example config::
+
+        {
+          "default_mode": "llm",
+          "timezone": "America/Los_Angeles",
+          "daily_token_budget": 200000,
+          "rules": [{"pattern": "^(general|chat|memes|off-topic)", "mode": "off"}],
+          "guilds": {
+            "1234567890": {
+              "allow": ["announcements", "club-events"],
+              "timezone": "America/New_York",
+              "daily_token_budget": 500000,
+              "channels": {"club-events": "local"}
+            }
+          }
+        }
+    """
+
+    def __init__(self, path=ROUTING_CONFIG_PATH):
+        """Initialize the routing table
+
+        Args:
+            path: Path to the JSON routing config. A missing file routes every
+                channel to the LLM extractor, matching the previous behaviour.
+        """
+        self.path = path
+        self._default_mode = MODE_LLM
+        self._timezone = None
+        self._daily_token_budget = None
+        self._rules = []
+        self._guilds = {}
+        self._cache = {}
+        self.reload()
+
+    def reload(self):
+        """Reload and recompile the routing config from disk
+
+        If the file is invalid the previous table is kept.
+
+        Returns:
+            bool: True if the config was (re)loaded, False if it was rejected
+        """
+        config = {}
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+            except Exception as e:
+                logger.error(f"Failed to read routing config {self.path}: {e}")
+                return False
+        else:
+            logger.info(f"No routing config at {self.path}, routing all channels to '{MODE_LLM}'")
+
+        try:
+            default_mode = _check_mode(config.get("default_mode", MODE_LLM), "default_mode")
+            rules = _compile_rules(config.get("rules"), "global rules")
+            guilds = {
+                str(guild_id): _GuildRoutes(guild_id, guild_config, default_mode)
+                for guild_id, guild_config in config.get("guilds", {}).items()
+            }
+        except Exception as e:
+            logger.error(f"Invalid routing config {self.path}, keeping previous rules: {e}")
+            return False
+
+        # Swap in the new table in one go
+        self._default_mode = default_mode
+        self._timezone = config.get("timezone")
+        self._daily_token_budget = config.get("daily_token_budget")
+        self._rules = rules
+        self._guilds = guilds
+        self._cache = {}
+        logger.info(f"Loaded routing config: {len(guilds)} guild overrides, {len(rules)} global rules")
+        return True
+
+    def resolve(self, guild_id, channel_id, channel_name):
+        """Get the extraction mode for a channel
+
+        Args:
+            guild_id: The Discord guild ID
+            channel_id: The Discord channel ID
+            channel_name: The channel name
+
+        Returns:
+            str: One of ``MODE_LLM``, ``MODE_LOCAL`` or ``MODE_OFF``
+        """
+        key = (str(guild_id), str(channel_id), channel_name)
+        mode = self._cache.get(key)
+        if mode is None:
+            mode = self._resolve(*key)
+            self._cache[key] = mode
+        return mode
+
+    def timezone_for(self, guild_id):
+        """Get the configured timezone for a guild
+
+        Args:
+            guild_id: The Discord guild ID
+
+        Returns:
+            str: IANA timezone name, or None to use the default timezone
+        """
+        guild = self._guilds.get(str(guild_id))
+        if guild and guild.timezone:
+            return guild.timezone
+        return self._timezone
+
+    def token_budget_for(self, guild_id):
+        """Get the daily model token budget for a guild
+
+        Args:
+            guild_id: The Discord guild ID
+
+        Returns:
+            int: Daily token budget (0 = unlimited), or None if not configured
+        """
+        guild = self._guilds.get(str(guild_id))
+        if guild and guild.daily_token_budget is not None:
+            return guild.daily_token_budget
+        return self._daily_token_budget
+
+    def _resolve(self, guild_id, channel_id, channel_name):
+        name = (channel_name or "").lower()
+        guild = self._guilds.get(guild_id)
+
+        if guild:
+            if channel_id in guild.deny or name in guild.deny:
+                return MODE_OFF
+            if guild.allow and channel_id not in guild.allow and name not in guild.allow:
+                return MODE_OFF
+
+            mode = guild.channels.get(channel_id) or guild.channels.get(name)
+            if mode:
+                return mode
+
+            for pattern, mode in guild.rules:
+                if pattern.search(name):
+                    return mode
+
+        for pattern, mode in self._rules:
+            if pattern.search(name):
+                return mode
+
+        return guild.default_mode if guild else self._default_mode
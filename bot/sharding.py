@@ -0,0 +1,54 @@
+import os
+
+
+def parse_shard_ids(value):
+    """Parse a shard list such as ``"0-3,8,10-11"``
+
+    Args:
+        value (str): Comma-separated shard IDs and inclusive ranges
+
+    Returns:
+        list: Sorted shard IDs, or None if ``value`` is empty
+    """
+    if not value or not value.strip():
+        return None
+
+    shard_ids = set()
+    for part in value.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        if "-" in part:
+            start, end = (int(p) for p in part.split("-", 1))
+            if end < start:
+                raise ValueError(f"Invalid shard range '{part}'")
+            shard_ids.update(range(start, end + 1))
+        else:
+            shard_ids.add(int(part))
+    return sorted(shard_ids)
+
+
+# Sharding: SHARDING_ENABLED alone lets Discord pick the shard count and runs
+# every shard in this process. Set SHARD_COUNT and SHARD_IDS to split the
+# shards across several processes (e.g. SHARD_COUNT=8, SHARD_IDS=0-3 and 4-7).
+SHARD_COUNT = int(os.getenv('SHARD_COUNT', '0')) or None
+SHARD_IDS = parse_shard_ids(os.getenv('SHARD_IDS', ''))
+SHARDING_ENABLED = (
+    os.getenv('SHARDING_ENABLED', 'false').lower() in ('1', 'true', 'yes')
+    or SHARD_COUNT is not None
+)
+
+if SHARD_IDS is not None:
+    if SHARD_COUNT is None:
+        raise ValueError("SHARD_IDS requires SHARD_COUNT to be set")
+    if SHARD_IDS[-1] >= SHARD_COUNT:
+        raise ValueError(f"SHARD_IDS {SHARD_IDS} out of range for SHARD_COUNT={SHARD_COUNT}")
+
+
+def shard_label():
+    """Identify this process's shards in logs and claims"""
+    if not SHARDING_ENABLED:
+        return "single"
+    if SHARD_IDS is None:
+        return f"all/{SHARD_COUNT or 'auto'}"
+    return f"{SHARD_IDS[0]}-{SHARD_IDS[-1]}/{SHARD_COUNT}"
@@ -0,0 +1,171 @@
+import os
+import logging
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+logger = logging.getLogger('deadline-bot.usage')
+
+# How often aggregated usage is written to MongoDB (seconds)
+USAGE_FLUSH_INTERVAL = float(os.getenv('USAGE_FLUSH_INTERVAL', '30'))
+
+# Daily token budget for guilds without one in the routing config (0 = unlimited)
+DEFAULT_DAILY_TOKEN_BUDGET = int(os.getenv('DEFAULT_DAILY_TOKEN_BUDGET', '0'))
+
+
+def usage_day(now=None):
+    """The accounting day (UTC) a call belongs to"""
+    return (now or datetime.now(timezone.utc)).strftime("%Y-%m-%d")
+
+
+class UsageTracker:
+    """Aggregates model token usage per guild and channel and enforces daily budgets
+
+    Calls are aggregated in memory per (day, guild, channel, model) and
+    flushed to MongoDB every ``flush_interval`` seconds with ``$inc``
+    upserts, so any number of bot shards and workers can share the totals.
+    Each flush also reloads today's per-guild totals, which are combined
+    with the not-yet-flushed local usage to decide whether a guild has
+    used up its budget.
+    """
+
+    def __init__(self, db_client, budget_for=None, flush_interval=USAGE_FLUSH_INTERVAL,
+                 default_budget=DEFAULT_DAILY_TOKEN_BUDGET):
+        """Initialize the tracker
+
+        Args:
+            db_client: MongoDBClient used to persist usage
+            budget_for: Optional callable ``(guild_id) -> int | None`` with per-guild budgets
+            flush_interval: Seconds between flushes
+            default_budget: Daily token budget when ``budget_for`` has none (0 = unlimited)
+        """
+        self.db_client = db_client
+        self.budget_for = budget_for
+        self.flush_interval = flush_interval
+        self.default_budget = default_budget
+
+        self._lock = threading.Lock()
+        self._pending = defaultdict(lambda: {"calls": 0, "prompt_tokens": 0, "output_tokens": 0, "latency_ms": 0})
+        self._local_today = defaultdict(int)  # guild_id -> unflushed tokens for _day
+        self._stored_today = {}               # guild_id -> tokens already in MongoDB for _day
+        self._day = usage_day()
+        self._downgraded = set()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Start the background flush thread"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="usage-flush", daemon=True)
+            self._thread.start()
+
+    def close(self):
+        """Stop the flush thread and write what's left"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def record(self, guild_id, channel_id, model, prompt_tokens, output_tokens, latency):
+        """Record one model call
+
+        Args:
+            guild_id: Guild the message came from
+            channel_id: Channel the message came from
+            model (str): Model name
+            prompt_tokens (int): Input tokens
+            output_tokens (int): Output tokens
+            latency (float): Call latency in seconds
+        """
+        guild_id = str(guild_id or "")
+        day = usage_day()
+        with self._lock:
+            self._roll_day(day)
+            entry = self._pending[(day, guild_id, str(channel_id or ""), model)]
+            entry["calls"] += 1
+            entry["prompt_tokens"] += prompt_tokens
+            entry["output_tokens"] += output_tokens
+            entry["latency_ms"] += int(latency * 1000)
+            self._local_today[guild_id] += prompt_tokens + output_tokens
+
+    def tokens_today(self, guild_id):
+        """Tokens used by a guild today, across every process that has flushed"""
+        guild_id = str(guild_id or "")
+        with self._lock:
+            self._roll_day(usage_day())
+            return self._stored_today.get(guild_id, 0) + self._local_today.get(guild_id, 0)
+
+    def budget(self, guild_id):
+        """Daily token budget for a guild (0 = unlimited)"""
+        budget = self.budget_for(guild_id) if self.budget_for else None
+        return self.default_budget if budget is None else budget
+
+    def over_budget(self, guild_id):
+        """Check whether a guild has used up today's token budget"""
+        budget = self.budget(guild_id)
+        if not budget:
+            return False
+
+        used = self.tokens_today(guild_id)
+        if used < budget:
+            return False
+
+        key = (self._day, str(guild_id))
+        if key not in self._downgraded:
+            self._downgraded.add(key)
+            logger.warning(f"Guild {guild_id} used {used} of {budget} tokens today, switching to local extraction")
+        return True
+
+    def flush(self):
+        """Write aggregated usage to MongoDB and refresh today's guild totals"""
+        with self._lock:
+            pending = dict(self._pending)
+            self._pending.clear()
+            flushed_today = dict(self._local_today)
+            self._local_today.clear()
+            day = self._day
+
+        if pending:
+            rows = [
+                dict(counts, day=row_day, guild_id=guild_id, channel_id=channel_id, model=model)
+                for (row_day, guild_id, channel_id, model), counts in pending.items()
+            ]
+            if not self.db_client.record_token_usage(rows):
+                # Keep the usage for the next flush
+                with self._lock:
+                    for key, counts in pending.items():
+                        entry = self._pending[key]
+                        for name, value in counts.items():
+                            entry[name] += value
+                    if self._day == day:
+                        for guild_id, tokens in flushed_today.items():
+                            self._local_today[guild_id] += tokens
+                return
+
+        totals = self.db_client.get_daily_token_usage(day)
+        if totals is not None:
+            with self._lock:
+                if self._day == day:
+                    self._stored_today = totals
+        else:
+            # Couldn't reload, keep counting what was just flushed locally
+            with self._lock:
+                if self._day == day:
+                    for guild_id, tokens in flushed_today.items():
+                        self._stored_today[guild_id] = self._stored_today.get(guild_id, 0) + tokens
+
+    def _roll_day(self, day):
+        # Called with the lock held
+        if day != self._day:
+            self._day = day
+            self._local_today.clear()
+            self._stored_today = {}
+            self._downgraded.clear()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                logger.error(f"Failed to flush token usage: {e}")
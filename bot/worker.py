@@ -0,0 +1,242 @@
+"""Extraction worker for the durable job queue
+
+Usage:
+    python -m bot.worker [--concurrency 4]
+
+With ``EXTRACTION_MODE=queue`` the bot only enqueues an ``extract`` job per
+message. Any number of these workers, on any number of machines, claim the
+jobs from MongoDB, run extraction, save the deadline and enqueue a ``reply``
+job that the bot picks up and posts in Discord. Edited messages are queued
+the same way and update or remove their deadline. Jobs are leased rather than
+removed when claimed, so a worker that crashes mid-job only delays it until
+the lease runs out. While a job is being processed its lease is extended in
+the background, so slow extractions aren't handed to a second worker.
+"""
+import os
+import sys
+import socket
+import signal
+import argparse
+import logging
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+# Load environment variables before importing modules that read their config at import
+from shared.env import load_env
+load_env(os.path.dirname(os.path.abspath(__file__)))
+
+from database.mongodb_client import MongoDBClient, DatabaseUnavailableError, JOB_LEASE_SECONDS
+from bot.gemini_processor import init_gemini, extract_deadline_with_fallback, set_usage_tracker
+from bot.routing import RoutingTable
+from bot.usage import UsageTracker
+from bot.jobs import JOB_EXTRACT, JOB_REPLY, reply_job_id, confirmation_message, confirmation_summary
+from shared.dates import is_iso_date
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('deadline-bot.worker')
+
+# Number of jobs processed in parallel by one worker process
+WORKER_CONCURRENCY = int(os.getenv('WORKER_CONCURRENCY', '4'))
+
+# Seconds to wait before polling again when the queue is empty
+WORKER_POLL_INTERVAL = float(os.getenv('WORKER_POLL_INTERVAL', '1'))
+
+
+def process_extract_job(db_client, payload):
+    """Run extraction for one message and save any detected event
+
+    Args:
+        db_client (MongoDBClient): Database client
+        payload (dict): ``content``, ``message_info``, ``mode`` and ``reply``, plus
+            ``edit`` and ``content_hash`` for re-extractions of edited messages
+
+    Returns:
+        str: ID of the saved deadline, or a short reason it wasn't saved
+
+    Raises:
+        DatabaseUnavailableError: If MongoDB went away, so the job is retried
+    """
+    if payload.get("edit"):
+        return process_edit_job(db_client, payload)
+
+    message_info = payload["message_info"]
+    message_id = message_info["message_id"]
+
+    if db_client.check_exists_by_message_id(message_id):
+        logger.info(f"Skipping already processed message with ID: {message_id}")
+        return "duplicate"
+
+    event_found, event_data = extract_deadline_with_fallback(
+        payload["content"], message_info, payload.get("mode", "llm")
+    )
+    if not (event_found and event_data):
+        return "no_event"
+
+    db_result = db_client.save_deadline(event_data)
+    if not db_result:
+        if db_client.healthy is False:
+            raise DatabaseUnavailableError("Failed to save deadline, MongoDB is unavailable")
+        return "not_saved"
+
+    logger.info(f"Saved {event_data.get('category', 'event')} from message {message_id} as {db_result}")
+
+    if payload.get("reply") and is_iso_date(event_data.get("date_str", "")):
+        db_client.enqueue_job(
+            JOB_REPLY,
+            {
+                "channel_id": message_info["channel_id"],
+                "message_id": message_id,
+                "content": confirmation_message(event_data),
+                "summary": confirmation_summary(event_data),
+            },
+            job_id=reply_job_id(message_id)
+        )
+
+    return db_result
+
+
+def process_edit_job(db_client, payload):
+    """Re-extract an edited message and replace or remove its deadline
+
+    Args:
+        db_client (MongoDBClient): Database client
+        payload (dict): ``content``, ``message_info``, ``mode`` and the edited ``content_hash``
+
+    Returns:
+        str: ID of the updated deadline, or a short reason it wasn't updated
+
+    Raises:
+        DatabaseUnavailableError: If MongoDB went away, so the job is retried
+    """
+    message_info = payload["message_info"]
+    message_id = message_info["message_id"]
+    content_hash = payload.get("content_hash")
+
+    if content_hash and db_client.get_content_hash(message_id) == content_hash:
+        logger.info(f"Edit of message {message_id} was already applied")
+        return "unchanged"
+
+    event_found, event_data = extract_deadline_with_fallback(
+        payload["content"], message_info, payload.get("mode", "llm")
+    )
+    if event_found and event_data:
+        result = db_client.upsert_deadline(event_data)
+        if not result:
+            if db_client.healthy is False:
+                raise DatabaseUnavailableError("Failed to update deadline, MongoDB is unavailable")
+            # Keep the old hash so the next edit tries again
+            return "not_saved"
+        logger.info(f"Updated deadline {result} after message {message_id} was edited")
+    else:
+        # The edit removed the event
+        db_client.soft_delete_messages([message_id])
+        result = "deleted"
+
+    db_client.set_content_hash(message_id, content_hash)
+    return result
+
+
+class ExtractionWorker:
+    """Claims ``extract`` jobs and processes them on a pool of threads"""
+
+    def __init__(self, db_client, concurrency=WORKER_CONCURRENCY, poll_interval=WORKER_POLL_INTERVAL,
+                 lease_seconds=JOB_LEASE_SECONDS):
+        """Initialize the worker
+
+        Args:
+            db_client (MongoDBClient): Database client
+            concurrency (int): Number of jobs processed in parallel
+            poll_interval (float): Seconds to wait when the queue is empty
+            lease_seconds (float): Lease length, renewed every third of it while a job runs
+        """
+        self.db_client = db_client
+        self.concurrency = max(concurrency, 1)
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.worker_id = f"{socket.gethostname()}-{os.getpid()}"
+        self._stop = threading.Event()
+
+    def run(self):
+        """Process jobs until ``stop()`` is called"""
+        threads = [
+            threading.Thread(target=self._loop, name=f"extract-worker-{i}", daemon=True)
+            for i in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        logger.info(f"Worker {self.worker_id} started with {self.concurrency} threads")
+
+        for thread in threads:
+            thread.join()
+        logger.info(f"Worker {self.worker_id} stopped")
+
+    def stop(self):
+        """Stop claiming new jobs, jobs in progress are finished first"""
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                job = self.db_client.claim_job([JOB_EXTRACT], self.worker_id, self.lease_seconds)
+            except DatabaseUnavailableError as e:
+                logger.warning(f"Queue unavailable: {e}")
+                self._stop.wait(self.poll_interval * 5)
+                continue
+
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+
+            done = threading.Event()
+            keeper = threading.Thread(target=self._keep_leased, args=(job["_id"], done), daemon=True)
+            keeper.start()
+            try:
+                result = process_extract_job(self.db_client, job["payload"])
+                done.set()
+                self.db_client.ack_job(job["_id"], self.worker_id, result=str(result))
+            except Exception as e:
+                done.set()
+                logger.error(f"Job {job['_id']} failed (attempt {job.get('attempts', 1)}): {e}")
+                self.db_client.fail_job(job, self.worker_id, e)
+
+    def _keep_leased(self, job_id, done):
+        """Extend a job's lease until ``done`` is set"""
+        while not done.wait(max(self.lease_seconds / 3, 1)):
+            if not self.db_client.extend_lease(job_id, self.worker_id, self.lease_seconds):
+                logger.warning(f"Lost the lease on job {job_id}")
+                return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run deadline extraction jobs from the queue")
+    parser.add_argument("--concurrency", type=int, default=WORKER_CONCURRENCY)
+    args = parser.parse_args()
+
+    if not init_gemini():
+        logger.warning("Gemini AI is not available - LLM jobs will fall back to regex patterns")
+
+    db_client = MongoDBClient()
+    worker = ExtractionWorker(db_client, concurrency=args.concurrency)
+
+    # Token usage counts against the same per-guild budgets as the bot
+    usage_tracker = UsageTracker(db_client, RoutingTable().token_budget_for)
+    set_usage_tracker(usage_tracker)
+    usage_tracker.start()
+
+    def handle_signal(signum, frame):
+        logger.info("Shutting down after current jobs finish...")
+        worker.stop()
+
+    signal.signal(signal.SIGINT, handle_signal)
+    signal.signal(signal.SIGTERM, handle_signal)
+
+    try:
+        worker.run()
+    finally:
+        usage_tracker.close()
+        db_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,3 @@
-from database.mongodb_client import MongoDBClient
+from database.mongodb_client import MongoDBClient, DatabaseUnavailableError
 
-__all__ = ["MongoDBClient"] 
\ No newline at end of file
+__all__ = ["MongoDBClient", "DatabaseUnavailableError"]
@@ -0,0 +1,95 @@
+"""Move past deadlines out of the primary collection
+
+Usage:
+    python -m database.archive [--older-than-days 180] [--batch-size 500] [--dry-run]
+
+Deadlines whose ``due_at`` is more than ``--older-than-days`` in the past
+are copied to ``deadlines_archive`` and then removed from ``deadlines``,
+one batch at a time. Each batch is written with a single ``bulk_write``
+(upserts, so a batch interrupted between the copy and the delete is simply
+copied again on the next run) followed by one ``delete_many``. Run it from
+cron; lists, dedupe and the calendar feeds then only ever touch recent
+data. Archived deadlines are still readable with ``include_archived``.
+
+Keep the age above ``CALENDAR_PAST_DAYS`` so events don't disappear from
+calendar feeds before they would have aged out anyway.
+"""
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timedelta, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import ReplaceOne, ASCENDING
+
+from database.mongodb_client import MongoDBClient, ARCHIVE_AFTER_DAYS
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('deadline-bot.archive')
+
+
+def archive(db_client, older_than_days=ARCHIVE_AFTER_DAYS, batch_size=500, dry_run=False):
+    """Move deadlines due before the cutoff to the archive in batches
+
+    Args:
+        db_client (MongoDBClient): Connected database client
+        older_than_days (int): Archive deadlines due more than this many days ago
+        batch_size (int): Number of documents per batch
+        dry_run (bool): Only count what would be archived
+
+    Returns:
+        int: Number of deadlines archived (or that would be)
+    """
+    hot = db_client.db.deadlines
+    cold = db_client.db.deadlines_archive
+    cutoff = datetime.now(timezone.utc) - timedelta(days=older_than_days)
+    query = {"due_at": {"$lt": cutoff}}
+
+    if dry_run:
+        count = hot.count_documents(query)
+        logger.info(f"{count} deadlines are due before {cutoff.isoformat()} and would be archived")
+        return count
+
+    archived_at = datetime.now(timezone.utc)
+    archived = 0
+    while True:
+        # Walks the due_at index from the oldest end, so each batch is a short range scan
+        batch = list(hot.find(query).sort("due_at", ASCENDING).limit(batch_size))
+        if not batch:
+            break
+
+        operations = []
+        for doc in batch:
+            doc["archived_at"] = archived_at
+            operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+        cold.bulk_write(operations, ordered=False)
+
+        ids = [doc["_id"] for doc in batch]
+        result = hot.delete_many({"_id": {"$in": ids}})
+        archived += result.deleted_count
+
+        logger.info(f"Archived batch ending at due_at {batch[-1]['due_at'].isoformat()}: {archived} so far")
+
+    return archived
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Move past deadlines to the archive collection")
+    parser.add_argument("--older-than-days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--dry-run", action="store_true", help="Only count what would be archived")
+    args = parser.parse_args()
+
+    db_client = MongoDBClient()
+    try:
+        archived = archive(db_client, args.older_than_days, args.batch_size, args.dry_run)
+        if not args.dry_run:
+            logger.info(f"Archiving complete: {archived} deadlines moved to deadlines_archive")
+    finally:
+        db_client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Backfill the normalized ``due_at`` field on existing deadlines
+
+Usage:
+    python -m database.migrate_due_at [--batch-size 500] [--timezone America/Los_Angeles]
+
+Documents are processed in ``_id`` order in batches, each batch is written
+with a single ``bulk_write``. The migration only touches documents that
+don't have ``due_at`` yet, so it can be stopped and re-run safely. The
+upcoming view is rebuilt afterwards, which also repairs a view left stale
+or partial by an earlier crash.
+"""
+import os
+import sys
+import argparse
+import logging
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pymongo import UpdateOne, ASCENDING
+
+from database.mongodb_client import MongoDBClient
+from shared.dates import compute_due_at, parse_date, get_timezone, DEFAULT_TIMEZONE
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger('deadline-bot.migrate')
+
+
+def build_update(doc, tz_name):
+    """Build the ``$set`` for a single document
+
+    Args:
+        doc (dict): Deadline document
+        tz_name (str): Timezone to interpret the stored date in
+
+    Returns:
+        dict: Fields to set, or None if the document has no usable date
+    """
+    date_str = doc.get("date_str", "")
+    tz_name = doc.get("timezone") or tz_name
+
+    due_at, all_day = compute_due_at(date_str, doc.get("time"), tz_name)
+    if due_at is None and date_str:
+        # Older documents may hold a free-form date ("Friday", "Mar 3"), parse it
+        # relative to the local day the message was saved on. Without a timestamp
+        # or a parseable date the document is skipped rather than set to today.
+        timestamp = doc.get("timestamp")
+        if not isinstance(timestamp, datetime):
+            return None
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        parsed = parse_date(date_str, timestamp.astimezone(get_timezone(tz_name)).date())
+        if parsed is None:
+            return None
+        due_at, all_day = compute_due_at(parsed.strftime("%Y-%m-%d"), doc.get("time"), tz_name)
+
+    if due_at is None:
+        return None
+
+    return {"due_at": due_at, "all_day": all_day, "timezone": tz_name}
+
+
+def migrate(db_client, batch_size=500, tz_name=DEFAULT_TIMEZONE):
+    """Backfill ``due_at`` in batches
+
+    Args:
+        db_client (MongoDBClient): Connected database client
+        batch_size (int): Number of documents per bulk write
+        tz_name (str): Timezone for documents without one
+
+    Returns:
+        int: Number of documents updated
+    """
+    collection = db_client.db.deadlines
+    query = {"due_at": {"$exists": False}}
+    projection = {"date_str": 1, "time": 1, "timezone": 1, "timestamp": 1}
+
+    last_id = None
+    updated = 0
+    skipped = 0
+
+    while True:
+        batch_query = dict(query)
+        if last_id is not None:
+            batch_query["_id"] = {"$gt": last_id}
+
+        batch = list(collection.find(batch_query, projection).sort("_id", ASCENDING).limit(batch_size))
+        if not batch:
+            break
+        last_id = batch[-1]["_id"]
+
+        operations = []
+        for doc in batch:
+            fields = build_update(doc, tz_name)
+            if fields:
+                operations.append(UpdateOne({"_id": doc["_id"]}, {"$set": fields}))
+            else:
+                skipped += 1
+
+        if operations:
+            result = collection.bulk_write(operations, ordered=False)
+            updated += result.modified_count
+
+        logger.info(f"Migrated batch ending at {last_id}: {updated} updated, {skipped} skipped so far")
+
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill normalized due_at on deadlines")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--timezone", default=DEFAULT_TIMEZONE,
+                        help="Timezone for documents without one")
+    args = parser.parse_args()
+
+    db_client = MongoDBClient()
+    try:
+        updated = migrate(db_client, args.batch_size, args.timezone)
+        logger.info(f"Migration complete: {updated} documents updated")
+        db_client.rebuild_upcoming(args.batch_size)
+    finally:
+        db_client.close()
+
+
+if __name__ == "__main__":
+    main()
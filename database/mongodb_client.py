@@ -1,37 +1,422 @@
 import os
+import atexit
+import itertools
 import logging
-from pymongo import MongoClient
-from dotenv import load_dotenv
-import re
+import threading
 import time
+from collections import Counter
+from concurrent.futures import Future
+from datetime import datetime, timedelta, timezone
+
+from shared.dates import is_iso_date
+from shared.env import load_env
+from shared.fingerprint import event_fingerprint, hamming_distance, SIMHASH_MAX_DISTANCE
+from database.write_buffer import WriteBehindBuffer
 
 # Load environment variables
-load_dotenv()
+load_env(os.path.dirname(os.path.abspath(__file__)))
+
+# Sort directions (same values as pymongo.ASCENDING / DESCENDING, which is
+# imported lazily to keep module import fast)
+ASCENDING = 1
+DESCENDING = -1
 
 # Get database configuration from environment variables
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017')
 DATABASE_NAME = os.getenv('DATABASE_NAME', 'deadline_tracker')
 
+# Connection pool and timeout settings
+MONGODB_MAX_POOL_SIZE = int(os.getenv('MONGODB_MAX_POOL_SIZE', '50'))
+MONGODB_MIN_POOL_SIZE = int(os.getenv('MONGODB_MIN_POOL_SIZE', '0'))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv('MONGODB_MAX_IDLE_TIME_MS', '60000'))
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv('MONGODB_WAIT_QUEUE_TIMEOUT_MS', '2000'))
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGODB_SERVER_SELECTION_TIMEOUT_MS', '3000'))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv('MONGODB_CONNECT_TIMEOUT_MS', '5000'))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv('MONGODB_SOCKET_TIMEOUT_MS', '10000'))
+
+# Health checking and reconnect backoff (seconds)
+MONGODB_HEALTH_CHECK_INTERVAL = float(os.getenv('MONGODB_HEALTH_CHECK_INTERVAL', '15'))
+MONGODB_RECONNECT_MIN_DELAY = float(os.getenv('MONGODB_RECONNECT_MIN_DELAY', '1'))
+MONGODB_RECONNECT_MAX_DELAY = float(os.getenv('MONGODB_RECONNECT_MAX_DELAY', '30'))
+
+# Deadline fields users can subscribe to, mapped to the subscription field holding the values
+SUBSCRIPTION_FIELDS = {
+    "club": "clubs",
+    "guild_id": "guild_ids",
+    "category": "categories",
+}
+
+# How long processed-message claims are kept (replays never look back further)
+PROCESSED_MESSAGE_TTL_SECONDS = int(os.getenv('PROCESSED_MESSAGE_TTL_SECONDS', str(30 * 24 * 3600)))
+
+# Durable job queue: lease length, attempts before a job is parked as failed,
+# and how long finished jobs are kept
+JOB_LEASE_SECONDS = int(os.getenv('JOB_LEASE_SECONDS', '120'))
+JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', '5'))
+JOB_RETENTION_SECONDS = int(os.getenv('JOB_RETENTION_SECONDS', str(7 * 24 * 3600)))
+
+# Deadlines due longer ago than this are moved to the archive collection
+ARCHIVE_AFTER_DAYS = int(os.getenv('ARCHIVE_AFTER_DAYS', '180'))
+
+# Deadline fields a calendar feed can be built for
+CALENDAR_FIELDS = ("guild_id", "club")
+
+# Deadline fields loaded for reminders
+REMINDER_FIELDS = (
+    "title", "category", "date_str", "time", "all_day", "due_at",
+    "guild_id", "channel_id", "message_id", "link",
+)
+
+# Upper bound on near-duplicate candidates compared per deadline
+DEDUPE_MAX_CANDIDATES = int(os.getenv('DEDUPE_MAX_CANDIDATES', '20'))
+
+# Write-behind buffering of deadline saves
+WRITE_BEHIND_INTERVAL_MS = int(os.getenv('WRITE_BEHIND_INTERVAL_MS', '200'))
+WRITE_BEHIND_MAX_BATCH = int(os.getenv('WRITE_BEHIND_MAX_BATCH', '100'))
+WRITE_BEHIND_MAX_RETRIES = int(os.getenv('WRITE_BEHIND_MAX_RETRIES', '3'))
+
 logger = logging.getLogger('deadline-bot.database')
 
 
+def build_due_at_range(start=None, end=None):
+    """Build a ``due_at`` range condition for a query
+    
+    Args:
+        start (datetime): Inclusive lower bound, naive values are treated as UTC
+        end (datetime): Exclusive upper bound, naive values are treated as UTC
+    
+    Returns:
+        dict: Mongo range condition or None if neither bound is set
+    """
+    condition = {}
+    if start is not None:
+        condition["$gte"] = start if start.tzinfo else start.replace(tzinfo=timezone.utc)
+    if end is not None:
+        condition["$lt"] = end if end.tzinfo else end.replace(tzinfo=timezone.utc)
+    return condition or None
+
+
+class DatabaseUnavailableError(Exception):
+    """Raised when MongoDB is known to be unreachable
+    
+    Read paths raise this instead of waiting for a server-selection timeout,
+    so callers can fail fast (e.g. respond with 503) while the background
+    monitor reconnects.
+    """
+
+
+def is_connection_error(error):
+    """Check whether an exception means the database could not be reached"""
+    from pymongo.errors import ConnectionFailure
+    return isinstance(error, (ConnectionFailure, DatabaseUnavailableError))
+
+
 class MongoDBClient:
-    """Client for interacting with MongoDB"""
+    """Client for interacting with MongoDB
+    
+    The connection is created lazily on first use, so constructing the
+    client (e.g. at module import time) is cheap and never blocks. A
+    background monitor pings the server, tracks whether it is healthy and
+    reconnects with exponential backoff while it is down.
+    """
+    
+    def __init__(self, lazy=True):
+        """Initialize MongoDB client
+        
+        Args:
+            lazy (bool): Defer connecting until the database is first used
+        """
+        self._client = None
+        self._db = None
+        self._write_buffer = None
+        self._pool_stats = None
+        self._healthy = None  # None until the first health check completes
+        self._last_error = None
+        self._last_check = None
+        self._indexes_ready = False
+        self._monitor = None
+        self._stop_monitor = threading.Event()
+        self._lock = threading.Lock()
+        if not lazy:
+            self.connect()
+    
+    @property
+    def client(self):
+        """The underlying MongoClient, connecting on first access"""
+        if self._client is None:
+            self.connect()
+        return self._client
     
-    def __init__(self):
-        """Initialize MongoDB client"""
-        self.client = None
-        self.db = None
-        self.connect()
+    @property
+    def db(self):
+        """The application database, connecting on first access"""
+        if self._db is None:
+            self.connect()
+        return self._db
+    
+    @property
+    def healthy(self):
+        """Whether the last health check succeeded (None if not checked yet)"""
+        return self._healthy
     
     def connect(self):
-        """Connect to MongoDB"""
+        """Connect to MongoDB
+        
+        Creating the MongoClient doesn't perform any network I/O, the
+        background monitor checks reachability and creates indexes once
+        the server answers.
+        """
+        with self._lock:
+            if self._client is None:
+                try:
+                    from pymongo import MongoClient
+                    from database.pool_monitor import PoolStatsListener
+                    
+                    self._pool_stats = PoolStatsListener()
+                    self._client = MongoClient(
+                        MONGODB_URI,
+                        tz_aware=True,
+                        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+                        minPoolSize=MONGODB_MIN_POOL_SIZE,
+                        maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+                        waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+                        serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+                        connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+                        socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+                        event_listeners=[self._pool_stats],
+                    )
+                    self._db = self._client[DATABASE_NAME]
+                    logger.info(f"Connected to MongoDB: {DATABASE_NAME}")
+                except Exception as e:
+                    self._client = None
+                    self._db = None
+                    self._mark_unhealthy(e)
+                    logger.error(f"Failed to connect to MongoDB: {e}")
+            
+            if self._monitor is None:
+                self._stop_monitor.clear()
+                self._monitor = threading.Thread(target=self._monitor_loop, name="mongo-health", daemon=True)
+                self._monitor.start()
+    
+    def _mark_unhealthy(self, error):
+        if self._healthy is not False:
+            logger.error(f"MongoDB marked unavailable: {error}")
+        self._healthy = False
+        self._last_error = str(error)
+        self._last_check = datetime.now(timezone.utc)
+    
+    def _mark_healthy(self):
+        if self._healthy is False:
+            logger.info("MongoDB connection restored")
+        self._healthy = True
+        self._last_error = None
+        self._last_check = datetime.now(timezone.utc)
+    
+    def _check_health(self):
+        """Ping the server (creating the client if needed) and record the result"""
+        try:
+            if self._client is None:
+                self.connect()
+            if self._client is None:
+                return False
+            self._client.admin.command("ping")
+        except Exception as e:
+            self._mark_unhealthy(e)
+            return False
+        
+        self._mark_healthy()
+        if not self._indexes_ready:
+            self._indexes_ready = self.ensure_indexes()
+            if self._indexes_ready:
+                self._seed_upcoming()
+        return True
+    
+    def _monitor_loop(self):
+        """Background health checks, backing off exponentially while the server is down"""
+        backoff = MONGODB_RECONNECT_MIN_DELAY
+        while not self._stop_monitor.is_set():
+            if self._check_health():
+                backoff = MONGODB_RECONNECT_MIN_DELAY
+                delay = MONGODB_HEALTH_CHECK_INTERVAL
+            else:
+                delay = backoff
+                logger.info(f"Retrying MongoDB connection in {delay:.0f}s")
+                backoff = min(backoff * 2, MONGODB_RECONNECT_MAX_DELAY)
+            self._stop_monitor.wait(delay)
+    
+    def _require_available(self):
+        """Fail fast if the database is known to be down"""
+        if self._healthy is False:
+            raise DatabaseUnavailableError(f"MongoDB is unavailable: {self._last_error}")
+        if self.db is None:
+            raise DatabaseUnavailableError("MongoDB client is not connected")
+    
+    def _raise_if_unavailable(self, error):
+        """Re-raise connection errors as DatabaseUnavailableError (marking the client unhealthy)"""
+        if is_connection_error(error):
+            if not isinstance(error, DatabaseUnavailableError):
+                self._mark_unhealthy(error)
+            raise DatabaseUnavailableError(str(error)) from error
+    
+    def get_pool_stats(self):
+        """Get connection health and pool statistics for monitoring
+        
+        Returns:
+            dict: Health state, pool configuration and pool counters
+        """
+        return {
+            "healthy": self._healthy,
+            "last_error": self._last_error,
+            "last_check": self._last_check.isoformat() if self._last_check else None,
+            "max_pool_size": MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": MONGODB_MIN_POOL_SIZE,
+            "pool": self._pool_stats.snapshot() if self._pool_stats else None,
+        }
+    
+    def ensure_indexes(self):
+        """Create the indexes used by deduplication and date queries
+        
+        Returns:
+            bool: True if the indexes exist, False otherwise
+        """
         try:
-            self.client = MongoClient(MONGODB_URI)
-            self.db = self.client[DATABASE_NAME]
-            logger.info(f"Connected to MongoDB: {DATABASE_NAME}")
+            self.db.deadlines.create_index("message_id")
+            self.db.deadlines.create_index([("due_at", ASCENDING)])
+            self.db.deadlines.create_index([("guild_id", ASCENDING), ("due_at", ASCENDING)])
+            # Incremental calendar feed rebuilds
+            self.db.deadlines.create_index([("guild_id", ASCENDING), ("updated_at", ASCENDING)])
+            self.db.deadlines.create_index([("club", ASCENDING), ("updated_at", ASCENDING)])
+            self.db.deadlines.create_index([("timestamp", DESCENDING)])
+            self.db.deadlines.create_index([("date_str", ASCENDING), ("fp_bands", ASCENDING)])
+            
+            # Archive: only what archived reads filter and sort on
+            self.db.deadlines_archive.create_index([("due_at", ASCENDING)])
+            self.db.deadlines_archive.create_index([("guild_id", ASCENDING), ("due_at", ASCENDING)])
+            self.db.deadlines_archive.create_index([("timestamp", DESCENDING)])
+            
+            self._create_upcoming_indexes(self.db.upcoming_deadlines)
+            
+            # Message claims shared by every shard and process
+            self.db.processed_messages.create_index(
+                [("claimed_at", ASCENDING)], expireAfterSeconds=PROCESSED_MESSAGE_TTL_SECONDS
+            )
+            
+            # Job queue: claim scans pending jobs by kind, expired leases are reclaimed
+            self.db.jobs.create_index([("kind", ASCENDING), ("status", ASCENDING), ("available_at", ASCENDING)])
+            self.db.jobs.create_index([("status", ASCENDING), ("lease_until", ASCENDING)])
+            self.db.jobs.create_index([("finished_at", ASCENDING)], expireAfterSeconds=JOB_RETENTION_SECONDS)
+            
+            # Daily per-guild token totals
+            self.db.token_usage.create_index([("day", ASCENDING), ("guild_id", ASCENDING)])
+            
+            # Inverted index from club/guild/category to subscribers (multikey)
+            for field in SUBSCRIPTION_FIELDS.values():
+                self.db.subscriptions.create_index(field)
+            return True
         except Exception as e:
-            logger.error(f"Failed to connect to MongoDB: {e}")
+            logger.error(f"Failed to create indexes: {e}")
+            return False
+    
+    @staticmethod
+    def _create_upcoming_indexes(collection):
+        # Upcoming view: TTL on due_at drops entries once they're past
+        collection.create_index([("due_at", ASCENDING)], expireAfterSeconds=0)
+        collection.create_index([("guild_id", ASCENDING), ("due_at", ASCENDING)])
+        collection.create_index([("club", ASCENDING), ("due_at", ASCENDING)])
+        collection.create_index([("category", ASCENDING), ("due_at", ASCENDING)])
+    
+    def _prepare_deadline(self, deadline_data):
+        """Validate a deadline before saving and fill in a message_id if missing
+        
+        Args:
+            deadline_data (dict): Deadline information (modified in place)
+        
+        Returns:
+            bool: True if the deadline can be saved, False otherwise
+        """
+        # Check if date is properly formatted
+        date_str = deadline_data.get("date_str", "")
+        
+        # Ensure we have a properly formatted YYYY-MM-DD date
+        if not is_iso_date(date_str):
+            logger.warning(f"Skipping save for event without properly formatted date: {deadline_data.get('title')}. Date: {date_str}")
+            return False
+            
+        # Get message ID for deduplication
+        if not deadline_data.get("message_id", ""):
+            logger.warning("No message_id found in event data, generating one")
+            deadline_data["message_id"] = f"msg_{int(time.time())}"
+        
+        # Fingerprint for near-duplicate detection across guilds and channels
+        fingerprint, bands = event_fingerprint(deadline_data)
+        deadline_data["fingerprint"] = fingerprint
+        deadline_data["fp_bands"] = bands
+        deadline_data.setdefault("is_duplicate", False)
+        
+        # Lets calendar feeds pick up only what changed since they were built
+        deadline_data["updated_at"] = datetime.now(timezone.utc)
+        
+        return True
+    
+    @property
+    def write_behind_enabled(self):
+        """Whether deadline saves are being buffered"""
+        return self._write_buffer is not None
+    
+    def enable_write_behind(self, flush_interval_ms=WRITE_BEHIND_INTERVAL_MS, max_batch=WRITE_BEHIND_MAX_BATCH,
+                            max_retries=WRITE_BEHIND_MAX_RETRIES):
+        """Buffer deadline saves and flush them in batches
+        
+        Once enabled, ``queue_deadline`` collects upserts and a background
+        thread writes them with a single ``bulk_write`` every
+        ``flush_interval_ms`` or ``max_batch`` documents. The buffer is
+        flushed on ``close()`` and at interpreter exit.
+        
+        Args:
+            flush_interval_ms (int): Maximum time a deadline waits in the buffer
+            max_batch (int): Flush as soon as this many deadlines are waiting
+            max_retries (int): Retries for transient errors before a batch is dropped
+        """
+        if self._write_buffer is None:
+            self._write_buffer = WriteBehindBuffer(
+                lambda: self.db.deadlines, flush_interval_ms, max_batch, max_retries,
+                on_flush=self._after_write
+            )
+            atexit.register(self._close_write_buffer)
+            logger.info(f"Write-behind enabled: flushing every {flush_interval_ms}ms or {max_batch} deadlines")
+    
+    def queue_deadline(self, deadline_data):
+        """Save a deadline through the write-behind buffer
+        
+        Falls back to a direct ``save_deadline`` when write-behind is disabled.
+        
+        Args:
+            deadline_data (dict): Deadline information
+        
+        Returns:
+            Future: Resolves to the document ID (str) or None if the save failed
+        """
+        if self._write_buffer is None:
+            future = Future()
+            future.set_result(self.save_deadline(deadline_data))
+            return future
+        
+        if not self._prepare_deadline(deadline_data):
+            future = Future()
+            future.set_result(None)
+            return future
+        
+        return self._write_buffer.submit(deadline_data)
+    
+    def flush(self):
+        """Write any buffered deadlines now"""
+        if self._write_buffer is not None:
+            self._write_buffer.flush()
+    
+    def _close_write_buffer(self):
+        if self._write_buffer is not None:
+            buffer, self._write_buffer = self._write_buffer, None
+            buffer.close()
     
     def save_deadline(self, deadline_data):
         """Save a deadline to the database
@@ -42,21 +427,14 @@ class MongoDBClient:
         Returns:
             str: ID of the inserted document or None if failed
         """
+        if self._healthy is False:
+            logger.error(f"Not saving deadline, MongoDB is unavailable: {self._last_error}")
+            return None
+        
         try:
-            # Check if date is properly formatted
-            date_str = deadline_data.get("date_str", "")
-            
-            # Ensure we have a properly formatted YYYY-MM-DD date
-            if not date_str or not re.match(r'^\d{4}-\d{2}-\d{2}$', date_str):
-                logger.warning(f"Skipping save for event without properly formatted date: {deadline_data.get('title')}. Date: {date_str}")
+            if not self._prepare_deadline(deadline_data):
                 return None
-                
-            # Get message ID for deduplication
-            message_id = deadline_data.get("message_id", "")
-            if not message_id:
-                logger.warning("No message_id found in event data, generating one")
-                message_id = f"msg_{int(time.time())}"
-                deadline_data["message_id"] = message_id
+            message_id = deadline_data["message_id"]
             
             # Check for existing event with same message_id
             existing = self.db.deadlines.find_one({"message_id": message_id})
@@ -64,13 +442,14 @@ class MongoDBClient:
             if existing:
                 # Only update if the existing record doesn't have a properly formatted date
                 existing_date = existing.get("date_str", "")
-                if not re.match(r'^\d{4}-\d{2}-\d{2}$', existing_date):
+                if not is_iso_date(existing_date):
                     # Update existing document with properly formatted date
                     result = self.db.deadlines.update_one(
                         {"_id": existing["_id"]},
                         {"$set": deadline_data}
                     )
                     logger.info(f"Updated existing deadline with formatted date: {existing['_id']}")
+                    self._after_write([existing["_id"]])
                     return str(existing["_id"])
                 else:
                     # Already have a properly formatted date, skip
@@ -80,35 +459,106 @@ class MongoDBClient:
             # No existing document found, insert new one
             result = self.db.deadlines.insert_one(deadline_data)
             logger.info(f"Saved new deadline with ID: {result.inserted_id}")
+            self._after_write([result.inserted_id])
             return str(result.inserted_id)
         
         except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
             logger.error(f"Failed to save deadline: {e}")
             return None
     
-    def get_deadlines(self, limit=10, skip=0, filters=None):
+    def get_deadlines(self, limit=10, skip=0, filters=None, start=None, end=None, sort_by="timestamp",
+                      include_duplicates=False, include_archived=False):
         """Get deadlines from the database
         
         Args:
             limit (int): Maximum number of deadlines to return
             skip (int): Number of deadlines to skip
             filters (dict): Query filters to apply
+            start (datetime): Only include deadlines due at or after this time (UTC)
+            end (datetime): Only include deadlines due before this time (UTC)
+            sort_by (str): "timestamp" (newest scraped first) or "due_at" (soonest first)
+            include_duplicates (bool): Include deadlines linked to a canonical copy
+            include_archived (bool): Also search deadlines moved to the archive
         
         Returns:
             list: List of deadline documents
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
         """
+        self._require_available()
         try:
-            query = filters or {}
+            query = dict(filters or {})
+            date_range = build_due_at_range(start, end)
+            if date_range:
+                query["due_at"] = date_range
+            query["deleted"] = {"$ne": True}
+            if not include_duplicates:
+                query["is_duplicate"] = {"$ne": True}
+            
+            if sort_by == "due_at":
+                sort = [("due_at", ASCENDING)]
+            else:
+                sort = [("timestamp", DESCENDING)]
+            
+            if include_archived:
+                # Both collections are filtered by their own indexes before the union
+                pipeline = [
+                    {"$match": query},
+                    {"$unionWith": {"coll": "deadlines_archive", "pipeline": [{"$match": query}]}},
+                    {"$sort": dict(sort)},
+                    {"$skip": skip},
+                    {"$limit": limit},
+                ]
+                return list(self.db.deadlines.aggregate(pipeline, allowDiskUse=True))
+            
             cursor = self.db.deadlines.find(
                 query
-            ).sort("timestamp", -1).skip(skip).limit(limit)
+            ).sort(sort).skip(skip).limit(limit)
             
             return list(cursor)
         
         except Exception as e:
+            self._raise_if_unavailable(e)
             logger.error(f"Failed to get deadlines: {e}")
             return []
     
+    def iter_deadlines(self, filters=None, start=None, end=None, batch_size=500, include_archived=False):
+        """Iterate over deadlines without loading them all into memory
+        
+        Documents are streamed from a server-side cursor in ``due_at`` order,
+        so memory use stays flat regardless of the result size.
+        
+        Args:
+            filters (dict): Query filters to apply
+            start (datetime): Only include deadlines due at or after this time (UTC)
+            end (datetime): Only include deadlines due before this time (UTC)
+            batch_size (int): Number of documents fetched per round trip
+            include_archived (bool): Stream archived deadlines first, then the live ones
+        
+        Returns:
+            Iterator over the matching deadline documents
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB is known to be down
+        """
+        self._require_available()
+        query = dict(filters or {})
+        date_range = build_due_at_range(start, end)
+        if date_range:
+            query["due_at"] = date_range
+        query["deleted"] = {"$ne": True}
+        
+        cursor = self.db.deadlines.find(query).sort("due_at", ASCENDING).batch_size(batch_size)
+        if not include_archived:
+            return cursor
+        
+        # Archived deadlines are older than the live ones, so the stream stays (nearly) in due_at order
+        archived = self.db.deadlines_archive.find(query).sort("due_at", ASCENDING).batch_size(batch_size)
+        return itertools.chain(archived, cursor)
+    
     def get_deadline_by_id(self, deadline_id):
         """Get a deadline by its ID
         
@@ -117,20 +567,877 @@ class MongoDBClient:
         
         Returns:
             dict: Deadline document or None if not found
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
         """
+        self._require_available()
         try:
             from bson.objectid import ObjectId
-            return self.db.deadlines.find_one({"_id": ObjectId(deadline_id)})
+            # Old links keep working after a deadline has been archived
+            return (
+                self.db.deadlines.find_one({"_id": ObjectId(deadline_id)})
+                or self.db.deadlines_archive.find_one({"_id": ObjectId(deadline_id)})
+            )
         except Exception as e:
+            self._raise_if_unavailable(e)
             logger.error(f"Failed to get deadline by ID: {e}")
             return None
     
+    def upsert_deadline(self, deadline_data):
+        """Replace the deadline extracted from a message, e.g. after the message was edited
+        
+        Unlike ``save_deadline`` this always overwrites the stored fields and
+        restores the deadline if it had been soft-deleted. Buffered writes are
+        flushed first, so an insert for the same message that is still in the
+        write-behind buffer can't land after the update as a second copy.
+        Deadlines that were linked to this one as duplicates are linked again,
+        since the new content may no longer match them. If the guild, club or
+        category changed, the feeds of the old values are invalidated too.
+        
+        Args:
+            deadline_data (dict): Deadline information with a message_id
+        
+        Returns:
+            str: ID of the deadline or None if failed
+        """
+        if not self._prepare_deadline(deadline_data):
+            return None
+        try:
+            from pymongo import ReturnDocument
+            
+            self.flush()
+            
+            # The old values, so feeds the deadline moves out of are refreshed as
+            # well and the old canonical copy stops counting it as a duplicate
+            previous = self.db.deadlines.find_one(
+                {"message_id": deadline_data["message_id"]},
+                {"is_duplicate": 1, "canonical_id": 1, "deleted": 1, **{field: 1 for field in SUBSCRIPTION_FIELDS}}
+            )
+            
+            # Duplicate links are recomputed for the new content
+            deadline_data["is_duplicate"] = False
+            deadline_data["canonical_id"] = None
+            doc = self.db.deadlines.find_one_and_update(
+                {"message_id": deadline_data["message_id"]},
+                # The date may have moved, so a new reminder is due
+                {"$set": deadline_data, "$unset": {"deleted": "", "deleted_at": "", "reminder_sent_at": ""}},
+                projection={"_id": 1},
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+            logger.info(f"Updated deadline {doc['_id']} from message {deadline_data['message_id']}")
+            if previous:
+                self._uncount_duplicates([previous])
+            self._after_write([doc["_id"]], previous=[previous] if previous else None)
+            self._relink_duplicates_of([doc["_id"]])
+            return str(doc["_id"])
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to update deadline: {e}")
+            return None
+    
+    def soft_delete_messages(self, message_ids):
+        """Hide the deadlines extracted from deleted messages
+        
+        Deadlines are flagged ``deleted`` rather than removed, so they drop
+        out of lists, the upcoming view and feeds but can still be audited.
+        
+        Args:
+            message_ids (list): Discord message IDs (as strings)
+        
+        Returns:
+            int: Number of deadlines deleted
+        """
+        message_ids = [str(m) for m in message_ids]
+        try:
+            docs = list(self.db.deadlines.find(
+                {"message_id": {"$in": message_ids}, "deleted": {"$ne": True}},
+                {"is_duplicate": 1, "canonical_id": 1}
+            ))
+            if not docs:
+                return 0
+            ids = [doc["_id"] for doc in docs]
+            
+            now = datetime.now(timezone.utc)
+            self.db.deadlines.update_many(
+                {"_id": {"$in": ids}},
+                {"$set": {"deleted": True, "deleted_at": now, "updated_at": now}}
+            )
+            logger.info(f"Soft-deleted {len(ids)} deadlines for deleted messages")
+            self._uncount_duplicates(docs)
+            self._after_write(ids)
+            self._relink_duplicates_of(ids)
+            return len(ids)
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to delete deadlines for messages {message_ids}: {e}")
+            return 0
+    
+    def _after_write(self, deadline_ids, previous=None):
+        """Derived-data maintenance run after deadlines are written"""
+        self.link_near_duplicates(deadline_ids)
+        self.refresh_upcoming(deadline_ids)
+        self.notify_subscribers(deadline_ids, previous)
+        self.bump_calendar_versions(deadline_ids, previous)
+    
+    def _uncount_duplicates(self, docs):
+        """Decrement ``duplicate_count`` on the canonical copies of unlinked duplicates
+        
+        Args:
+            docs (list): Deadlines as they were before being edited or deleted
+        """
+        from bson.objectid import ObjectId
+        
+        counts = Counter(
+            doc["canonical_id"] for doc in docs
+            if doc.get("is_duplicate") and doc.get("canonical_id") and not doc.get("deleted")
+        )
+        for canonical_id, count in counts.items():
+            self.db.deadlines.update_one({"_id": ObjectId(canonical_id)}, {"$inc": {"duplicate_count": -count}})
+    
+    def _relink_duplicates_of(self, deadline_ids):
+        """Link the duplicates of edited or deleted deadlines again
+        
+        Args:
+            deadline_ids (list): ObjectIds of the deadlines that changed
+        """
+        dependents = [
+            doc["_id"] for doc in self.db.deadlines.find(
+                {"canonical_id": {"$in": [str(i) for i in deadline_ids]}, "deleted": {"$ne": True}},
+                {"_id": 1}
+            )
+        ]
+        if not dependents:
+            return
+        
+        self.db.deadlines.update_many(
+            {"_id": {"$in": dependents}},
+            {"$set": {"is_duplicate": False, "canonical_id": None, "updated_at": datetime.now(timezone.utc)}}
+        )
+        self.db.deadlines.update_many({"_id": {"$in": list(deadline_ids)}}, {"$set": {"duplicate_count": 0}})
+        logger.info(f"Relinking {len(dependents)} deadlines that were duplicates of changed deadlines")
+        self._after_write(dependents)
+    
+    def link_near_duplicates(self, deadline_ids):
+        """Link freshly written deadlines to an earlier copy of the same event
+        
+        Candidates are deadlines on the same date that share at least one
+        SimHash band, found through the ``(date_str, fp_bands)`` index, so
+        the lookup cost depends on how many events share a date rather than
+        on the size of the collection. A deadline within
+        ``SIMHASH_MAX_DISTANCE`` bits of an older canonical deadline is
+        marked ``is_duplicate`` and points at it through ``canonical_id`` (its
+        ID as a string).
+        Only older deadlines are considered, so links never form cycles.
+        
+        Args:
+            deadline_ids (list): ObjectIds of deadlines that were just written
+        
+        Returns:
+            int: Number of deadlines marked as duplicates
+        """
+        linked = 0
+        try:
+            docs = self.db.deadlines.find(
+                {"_id": {"$in": list(deadline_ids)}, "is_duplicate": {"$ne": True}},
+                {"date_str": 1, "fingerprint": 1, "fp_bands": 1}
+            )
+            for doc in docs:
+                fingerprint = doc.get("fingerprint")
+                if not fingerprint or not doc.get("fp_bands") or int(fingerprint, 16) == 0:
+                    continue
+                
+                candidates = self.db.deadlines.find(
+                    {
+                        "date_str": doc.get("date_str"),
+                        "fp_bands": {"$in": doc["fp_bands"]},
+                        "is_duplicate": {"$ne": True},
+                        "deleted": {"$ne": True},
+                        "_id": {"$lt": doc["_id"]},
+                    },
+                    {"fingerprint": 1}
+                ).sort("_id", ASCENDING).limit(DEDUPE_MAX_CANDIDATES)
+                
+                value = int(fingerprint, 16)
+                for candidate in candidates:
+                    other = candidate.get("fingerprint")
+                    if other and hamming_distance(value, int(other, 16)) <= SIMHASH_MAX_DISTANCE:
+                        self.db.deadlines.update_one(
+                            {"_id": doc["_id"]},
+                            {"$set": {
+                                "is_duplicate": True,
+                                "canonical_id": str(candidate["_id"]),
+                                "updated_at": datetime.now(timezone.utc),
+                            }}
+                        )
+                        self.db.deadlines.update_one(
+                            {"_id": candidate["_id"]},
+                            {"$inc": {"duplicate_count": 1}}
+                        )
+                        logger.info(f"Linked deadline {doc['_id']} as a duplicate of {candidate['_id']}")
+                        linked += 1
+                        break
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to link near-duplicate deadlines: {e}")
+        return linked
+    
+    def refresh_upcoming(self, deadline_ids):
+        """Sync entries in the upcoming view with their deadlines
+        
+        The ``upcoming_deadlines`` collection holds a copy of every deadline
+        that is still due, keyed by the deadline's ``_id``. It is refreshed
+        whenever deadlines are saved and a TTL index on ``due_at`` removes
+        entries once they are past, so reads never scan old events.
+        
+        Args:
+            deadline_ids (list): ObjectIds of deadlines that were just written
+        
+        Returns:
+            bool: True if the view was updated, False otherwise
+        """
+        if not deadline_ids:
+            return True
+        try:
+            from pymongo import DeleteOne, ReplaceOne
+            
+            now = datetime.now(timezone.utc)
+            operations = []
+            found = set()
+            for doc in self.db.deadlines.find({"_id": {"$in": list(deadline_ids)}}):
+                found.add(doc["_id"])
+                due_at = doc.get("due_at")
+                if due_at is not None and due_at >= now and not doc.get("is_duplicate") and not doc.get("deleted"):
+                    operations.append(ReplaceOne({"_id": doc["_id"]}, doc, upsert=True))
+                else:
+                    operations.append(DeleteOne({"_id": doc["_id"]}))
+            operations.extend(DeleteOne({"_id": _id}) for _id in deadline_ids if _id not in found)
+            
+            if operations:
+                self.db.upcoming_deadlines.bulk_write(operations, ordered=False)
+            return True
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to refresh upcoming deadlines: {e}")
+            return False
+    
+    def rebuild_upcoming(self, batch_size=500):
+        """Rebuild the upcoming view from the deadlines collection
+        
+        The view is built in a scratch collection that then replaces
+        ``upcoming_deadlines`` in a single rename, so entries for deadlines
+        that were deleted, archived or have passed don't survive a rebuild
+        and readers never see a half-built view. Deadlines written while the
+        copy was running are refreshed in the new view afterwards.
+        
+        Args:
+            batch_size (int): Number of deadlines copied per insert
+        
+        Returns:
+            int: Number of upcoming deadlines in the rebuilt view
+        """
+        from bson.objectid import ObjectId
+        
+        started = datetime.now(timezone.utc)
+        # Unique per rebuild, so processes seeding at the same time don't share one
+        scratch = self.db[f"upcoming_deadlines_rebuild_{ObjectId()}"]
+        try:
+            self._create_upcoming_indexes(scratch)
+            
+            copied = 0
+            batch = []
+            query = {"due_at": {"$gte": started}, "is_duplicate": {"$ne": True}, "deleted": {"$ne": True}}
+            for doc in self.db.deadlines.find(query).batch_size(batch_size):
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    scratch.insert_many(batch, ordered=False)
+                    copied += len(batch)
+                    batch = []
+            if batch:
+                scratch.insert_many(batch, ordered=False)
+                copied += len(batch)
+            
+            scratch.rename("upcoming_deadlines", dropTarget=True)
+        except Exception:
+            scratch.drop()
+            raise
+        
+        # Writes that went to the old view during the copy (with a margin for clock skew)
+        changed = [
+            doc["_id"] for doc in self.db.deadlines.find(
+                {"updated_at": {"$gte": started - timedelta(minutes=1)}}, {"_id": 1}
+            )
+        ]
+        self.refresh_upcoming(changed)
+        
+        logger.info(f"Rebuilt upcoming deadlines view with {copied} deadlines")
+        return copied
+    
+    def _seed_upcoming(self):
+        """Populate the upcoming view on first start against an existing database
+        
+        Only an empty view is rebuilt here. Run ``python -m database.migrate_due_at``
+        to rebuild one that is out of date.
+        """
+        try:
+            if self.db.upcoming_deadlines.estimated_document_count() == 0:
+                self.rebuild_upcoming()
+        except Exception as e:
+            logger.error(f"Failed to seed upcoming deadlines: {e}")
+    
+    def get_subscription(self, username):
+        """Get a user's feed subscriptions
+        
+        Args:
+            username (str): The user's name
+        
+        Returns:
+            dict: Subscription document (clubs, guild_ids, categories, feed_version)
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        try:
+            subscription = self.db.subscriptions.find_one({"_id": username})
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get subscriptions for {username}: {e}")
+            subscription = None
+        
+        if subscription is None:
+            subscription = {"_id": username, "feed_version": 0}
+        for field in SUBSCRIPTION_FIELDS.values():
+            subscription.setdefault(field, [])
+        return subscription
+    
+    def set_subscription(self, username, clubs=None, guild_ids=None, categories=None):
+        """Replace a user's feed subscriptions
+        
+        Args:
+            username (str): The user's name
+            clubs (list): Club names to follow
+            guild_ids (list): Discord guild IDs to follow
+            categories (list): Event categories to follow
+        
+        Returns:
+            dict: The updated subscription document, or None if the write failed
+        """
+        self._require_available()
+        try:
+            from pymongo import ReturnDocument
+            
+            return self.db.subscriptions.find_one_and_update(
+                {"_id": username},
+                {
+                    "$set": {
+                        "clubs": sorted(set(clubs or [])),
+                        "guild_ids": sorted({str(g) for g in guild_ids or []}),
+                        "categories": sorted(set(categories or [])),
+                        "updated_at": datetime.now(timezone.utc),
+                    },
+                    "$inc": {"feed_version": 1},
+                },
+                upsert=True,
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to save subscriptions for {username}: {e}")
+            return None
+    
+    def notify_subscribers(self, deadline_ids, previous=None):
+        """Bump the feed version of every user subscribed to the given deadlines
+        
+        Uses the multikey indexes on the subscriptions collection to find
+        only the affected users, so cached feeds of everyone else stay valid.
+        
+        Args:
+            deadline_ids (list): ObjectIds of deadlines that were just written
+            previous (list): Earlier versions of the deadlines, whose subscribers are notified too
+        
+        Returns:
+            int: Number of subscriptions whose feed was invalidated
+        """
+        try:
+            values = {field: set() for field in SUBSCRIPTION_FIELDS.values()}
+            docs = list(self.db.deadlines.find(
+                {"_id": {"$in": list(deadline_ids)}},
+                {field: 1 for field in SUBSCRIPTION_FIELDS}
+            ))
+            for doc in docs + list(previous or []):
+                for deadline_field, subscription_field in SUBSCRIPTION_FIELDS.items():
+                    if doc.get(deadline_field):
+                        values[subscription_field].add(str(doc[deadline_field]))
+            
+            clauses = [{field: {"$in": list(v)}} for field, v in values.items() if v]
+            if not clauses:
+                return 0
+            result = self.db.subscriptions.update_many({"$or": clauses}, {"$inc": {"feed_version": 1}})
+            return result.modified_count
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to notify feed subscribers: {e}")
+            return 0
+    
+    def bump_calendar_versions(self, deadline_ids, previous=None):
+        """Bump the version of every calendar feed the given deadlines appear in
+        
+        Feeds are keyed by ``"<field>:<value>"`` for each field in
+        ``CALENDAR_FIELDS``, so serving processes only rebuild the feeds of
+        guilds and clubs that actually changed.
+        
+        Args:
+            deadline_ids (list): ObjectIds of deadlines that were just written
+            previous (list): Earlier versions of the deadlines, whose feeds are bumped too
+        
+        Returns:
+            int: Number of feeds bumped
+        """
+        try:
+            from pymongo import UpdateOne
+            
+            keys = set()
+            docs = list(self.db.deadlines.find(
+                {"_id": {"$in": list(deadline_ids)}},
+                {field: 1 for field in CALENDAR_FIELDS}
+            ))
+            for doc in docs + list(previous or []):
+                for field in CALENDAR_FIELDS:
+                    if doc.get(field):
+                        keys.add(f"{field}:{doc[field]}")
+            if not keys:
+                return 0
+            
+            self.db.calendar_versions.bulk_write(
+                [UpdateOne({"_id": key}, {"$inc": {"version": 1}}, upsert=True) for key in keys],
+                ordered=False
+            )
+            return len(keys)
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to bump calendar versions: {e}")
+            return 0
+    
+    def get_calendar_version(self, field, value):
+        """Get the current version of a guild or club calendar feed
+        
+        Args:
+            field (str): "guild_id" or "club"
+            value (str): The guild ID or club name
+        
+        Returns:
+            int: Version (0 if nothing was written since versions were tracked)
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        try:
+            doc = self.db.calendar_versions.find_one({"_id": f"{field}:{value}"})
+            return doc.get("version", 0) if doc else 0
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get calendar version for {field} {value}: {e}")
+            return 0
+    
+    def get_calendar_events(self, field, value, since=None, horizon=None, cached_ids=None):
+        """Get the deadlines of a guild or club calendar feed
+        
+        Without ``since`` this returns the live deadlines due after
+        ``horizon``. With ``since`` it returns every deadline of the feed
+        written after that time, including deleted, duplicate and past ones,
+        so a cached feed can drop them (``horizon`` is ignored). Deadlines in
+        ``cached_ids`` are returned even if they moved to another guild or
+        club, so the feed can drop those as well.
+        
+        Args:
+            field (str): "guild_id" or "club"
+            value (str): The guild ID or club name
+            since (datetime): Only deadlines updated after this time
+            horizon (datetime): Only deadlines due at or after this time (full loads only)
+            cached_ids (list): IDs (as strings) of the deadlines the cached feed holds
+        
+        Returns:
+            list: Deadline documents
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        if field not in CALENDAR_FIELDS:
+            raise ValueError(f"Unknown calendar field: {field}")
+        
+        self._require_available()
+        try:
+            query = {field: str(value)}
+            if since is not None:
+                if cached_ids:
+                    from bson.objectid import ObjectId
+                    query = {"$or": [query, {"_id": {"$in": [ObjectId(i) for i in cached_ids]}}]}
+                query["updated_at"] = {"$gt": since}
+            else:
+                query["deleted"] = {"$ne": True}
+                query["is_duplicate"] = {"$ne": True}
+                if horizon is not None:
+                    query["due_at"] = {"$gte": horizon}
+            return list(self.db.deadlines.find(query))
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get calendar events for {field} {value}: {e}")
+            return []
+    
+    def get_feed(self, subscription, limit=10, skip=0):
+        """Get upcoming deadlines matching a user's subscriptions, soonest first
+        
+        Args:
+            subscription (dict): Subscription document from ``get_subscription``
+            limit (int): Maximum number of deadlines to return
+            skip (int): Number of deadlines to skip
+        
+        Returns:
+            list: Deadline documents ordered by ``due_at``
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        clauses = [
+            {deadline_field: {"$in": subscription[subscription_field]}}
+            for deadline_field, subscription_field in SUBSCRIPTION_FIELDS.items()
+            if subscription.get(subscription_field)
+        ]
+        if not clauses:
+            return []
+        
+        self._require_available()
+        try:
+            query = {"$or": clauses, "due_at": {"$gte": datetime.now(timezone.utc)}}
+            cursor = self.db.upcoming_deadlines.find(query).sort("due_at", ASCENDING).skip(skip).limit(limit)
+            return list(cursor)
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get feed: {e}")
+            return []
+    
+    def enqueue_job(self, kind, payload, job_id=None, delay=0):
+        """Add a job to the durable queue
+        
+        Jobs with an explicit ``job_id`` are only enqueued once, so the same
+        message can be submitted again (e.g. by a backfill) without creating
+        a second job.
+        
+        Args:
+            kind (str): Job type, workers claim jobs by kind
+            payload (dict): Job arguments
+            job_id (str): Optional idempotency key used as the job's ``_id``
+            delay (float): Seconds before the job becomes visible to workers
+        
+        Returns:
+            str: ID of the job
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        now = datetime.now(timezone.utc)
+        job = {
+            "kind": kind,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "available_at": now + timedelta(seconds=delay),
+            "lease_until": None,
+            "worker": None,
+            "created_at": now,
+        }
+        try:
+            if job_id is None:
+                return str(self.db.jobs.insert_one(job).inserted_id)
+            
+            self.db.jobs.update_one({"_id": job_id}, {"$setOnInsert": job}, upsert=True)
+            return job_id
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            raise
+    
+    def claim_job(self, kinds, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        """Lease the oldest available job of the given kinds
+        
+        A job is available when it is pending and due, or when the lease of
+        the worker that claimed it has run out (the worker crashed or hung).
+        Expired leases on a job's last attempt are parked as ``failed``
+        first, so they don't stay leased forever. The claim is a single
+        atomic ``find_one_and_update``, so any number of workers can poll
+        the same queue.
+        
+        Args:
+            kinds (list): Job kinds this worker handles
+            worker_id (str): Identifier of the claiming worker
+            lease_seconds (float): How long the job stays invisible to other workers
+        
+        Returns:
+            dict: The claimed job, or None if the queue is empty
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        from pymongo import ReturnDocument
+        
+        now = datetime.now(timezone.utc)
+        try:
+            self.db.jobs.update_many(
+                {
+                    "kind": {"$in": list(kinds)},
+                    "status": "leased",
+                    "lease_until": {"$lt": now},
+                    "attempts": {"$gte": JOB_MAX_ATTEMPTS},
+                },
+                {"$set": {
+                    "status": "failed",
+                    "finished_at": now,
+                    "lease_until": None,
+                    "error": "Lease expired on the last attempt",
+                }}
+            )
+            
+            return self.db.jobs.find_one_and_update(
+                {
+                    "kind": {"$in": list(kinds)},
+                    "$or": [
+                        {"status": "pending", "available_at": {"$lte": now}},
+                        {"status": "leased", "lease_until": {"$lt": now}, "attempts": {"$lt": JOB_MAX_ATTEMPTS}},
+                    ],
+                },
+                {
+                    "$set": {
+                        "status": "leased",
+                        "worker": worker_id,
+                        "lease_until": now + timedelta(seconds=lease_seconds),
+                    },
+                    "$inc": {"attempts": 1},
+                },
+                sort=[("available_at", ASCENDING)],
+                return_document=ReturnDocument.AFTER
+            )
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to claim job: {e}")
+            return None
+    
+    def extend_lease(self, job_id, worker_id, lease_seconds=JOB_LEASE_SECONDS):
+        """Keep a long-running job leased to this worker
+        
+        Returns:
+            bool: False if the lease was lost to another worker
+        """
+        try:
+            result = self.db.jobs.update_one(
+                {"_id": job_id, "status": "leased", "worker": worker_id},
+                {"$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)}}
+            )
+            return result.modified_count == 1
+        except Exception as e:
+            logger.error(f"Failed to extend lease on job {job_id}: {e}")
+            return False
+    
+    def ack_job(self, job_id, worker_id, result=None):
+        """Mark a leased job as done
+        
+        Args:
+            job_id: ID of the job
+            worker_id (str): Worker that holds the lease
+            result: Optional result to store on the job
+        
+        Returns:
+            bool: False if the lease had already expired and moved to another worker
+        """
+        try:
+            update = {"status": "done", "finished_at": datetime.now(timezone.utc), "lease_until": None}
+            if result is not None:
+                update["result"] = result
+            acked = self.db.jobs.update_one(
+                {"_id": job_id, "status": "leased", "worker": worker_id},
+                {"$set": update}
+            )
+            if acked.modified_count == 0:
+                logger.warning(f"Lease on job {job_id} was lost before it was acknowledged")
+            return acked.modified_count == 1
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to acknowledge job {job_id}: {e}")
+            return False
+    
+    def fail_job(self, job, worker_id, error, max_attempts=JOB_MAX_ATTEMPTS):
+        """Release a job after an error, retrying with exponential backoff
+        
+        Jobs that have used up ``max_attempts`` are parked with status
+        ``failed`` for inspection instead of being retried forever.
+        
+        Args:
+            job (dict): The claimed job
+            worker_id (str): Worker that holds the lease
+            error: The error that occurred
+            max_attempts (int): Attempts before the job is parked
+        
+        Returns:
+            bool: True if the job was released
+        """
+        now = datetime.now(timezone.utc)
+        attempts = job.get("attempts", 1)
+        if attempts >= max_attempts:
+            update = {"status": "failed", "finished_at": now, "lease_until": None, "error": str(error)}
+            logger.error(f"Job {job['_id']} failed after {attempts} attempts: {error}")
+        else:
+            delay = min(5 * (2 ** (attempts - 1)), 600)
+            update = {
+                "status": "pending",
+                "available_at": now + timedelta(seconds=delay),
+                "lease_until": None,
+                "error": str(error),
+            }
+        try:
+            released = self.db.jobs.update_one(
+                {"_id": job["_id"], "status": "leased", "worker": worker_id},
+                {"$set": update}
+            )
+            return released.modified_count == 1
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to release job {job['_id']}: {e}")
+            return False
+    
+    def get_upcoming(self, guild_id=None, limit=10, skip=0):
+        """Get the next deadlines that are still due, soonest first
+        
+        Served from the upcoming view with an index-ordered range scan, so
+        the cost is proportional to ``limit`` rather than to the history.
+        
+        Args:
+            guild_id (str): Only include deadlines from this Discord guild
+            limit (int): Maximum number of deadlines to return
+            skip (int): Number of deadlines to skip
+        
+        Returns:
+            list: Deadline documents ordered by ``due_at``
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        try:
+            # The TTL monitor only runs periodically, so filter out stragglers
+            query = {"due_at": {"$gte": datetime.now(timezone.utc)}}
+            if guild_id:
+                query["guild_id"] = str(guild_id)
+            
+            cursor = self.db.upcoming_deadlines.find(query).sort("due_at", ASCENDING).skip(skip).limit(limit)
+            return list(cursor)
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get upcoming deadlines: {e}")
+            return []
+    
+    def get_pending_reminders(self, start, end, limit, guild_ids=None):
+        """Get deadlines due in a window that haven't been reminded about yet
+        
+        Args:
+            start (datetime): Earliest ``due_at`` (inclusive)
+            end (datetime): Latest ``due_at`` (exclusive)
+            limit (int): Maximum number of deadlines to return
+            guild_ids (list): Only include deadlines from these guilds
+        
+        Returns:
+            list: Deadline documents (only the fields a reminder needs) ordered by ``due_at``
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        try:
+            query = {
+                "due_at": {"$gte": start, "$lt": end},
+                "reminder_sent_at": {"$exists": False},
+                "channel_id": {"$nin": [None, ""]},
+                "is_duplicate": {"$ne": True},
+                "deleted": {"$ne": True},
+            }
+            if guild_ids is not None:
+                query["guild_id"] = {"$in": [str(g) for g in guild_ids]}
+            
+            projection = {field: 1 for field in REMINDER_FIELDS}
+            cursor = self.db.deadlines.find(query, projection).sort("due_at", ASCENDING).limit(limit)
+            return list(cursor)
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get pending reminders: {e}")
+            return []
+    
+    def mark_reminder_sent(self, deadline_id):
+        """Atomically mark a deadline as reminded
+        
+        Only the first caller succeeds, so a reminder is sent once even with
+        several bot processes or after a restart. The current deadline is
+        returned, so the caller can check it wasn't edited since it was loaded.
+        
+        Args:
+            deadline_id: ObjectId of the deadline
+        
+        Returns:
+            dict: The deadline (reminder fields) if this caller marked it and
+                should send the reminder, None otherwise
+        """
+        try:
+            return self.db.deadlines.find_one_and_update(
+                {"_id": deadline_id, "reminder_sent_at": {"$exists": False}, "deleted": {"$ne": True}},
+                {"$set": {"reminder_sent_at": datetime.now(timezone.utc)}},
+                projection={field: 1 for field in REMINDER_FIELDS}
+            )
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to mark reminder for deadline {deadline_id}: {e}")
+            return None
+    
+    def clear_reminder_sent(self, deadline_id):
+        """Undo ``mark_reminder_sent`` after a failed send so it's retried"""
+        try:
+            self.db.deadlines.update_one({"_id": deadline_id}, {"$unset": {"reminder_sent_at": ""}})
+        except Exception as e:
+            logger.error(f"Failed to clear reminder for deadline {deadline_id}: {e}")
+    
     def close(self):
-        """Close the MongoDB connection"""
-        if self.client:
-            self.client.close()
+        """Close the MongoDB connection (flushing any buffered writes first)"""
+        self._close_write_buffer()
+        self._stop_monitor.set()
+        if self._monitor is not None:
+            self._monitor.join(timeout=5)
+            self._monitor = None
+        if self._client:
+            self._client.close()
+            self._client = None
+            self._db = None
             logger.info("Closed MongoDB connection")
     
+    def ping(self):
+        """Check that the database is reachable
+        
+        Returns:
+            bool: True if the server answered a ping, False otherwise
+        """
+        if self._check_health():
+            return True
+        logger.warning(f"MongoDB ping failed: {self._last_error}")
+        return False
+    
     def test_connection(self):
         """Test connection to MongoDB and return server info"""
         try:
@@ -147,7 +1454,12 @@ class MongoDBClient:
         
         Returns:
             bool: True if the message has already been processed, False otherwise
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached, so callers
+                don't mistake an outage for "not processed yet"
         """
+        self._require_available()
         try:
             if not message_id:
                 return False
@@ -157,5 +1469,218 @@ class MongoDBClient:
             return existing is not None
             
         except Exception as e:
+            self._raise_if_unavailable(e)
             logger.error(f"Error checking if message exists: {e}")
+            return False
+
+    def record_token_usage(self, rows):
+        """Add aggregated model usage to the daily totals
+        
+        Args:
+            rows (list): Dicts with day, guild_id, channel_id, model, calls,
+                prompt_tokens, output_tokens and latency_ms
+        
+        Returns:
+            bool: True if the usage was written
+        """
+        if not rows:
+            return True
+        if self._healthy is False:
+            return False
+        try:
+            from pymongo import UpdateOne
+            
+            now = datetime.now(timezone.utc)
+            operations = []
+            for row in rows:
+                key = f"{row['day']}:{row['guild_id']}:{row['channel_id']}:{row['model']}"
+                operations.append(UpdateOne(
+                    {"_id": key},
+                    {
+                        "$inc": {
+                            "calls": row["calls"],
+                            "prompt_tokens": row["prompt_tokens"],
+                            "output_tokens": row["output_tokens"],
+                            "total_tokens": row["prompt_tokens"] + row["output_tokens"],
+                            "latency_ms": row["latency_ms"],
+                        },
+                        "$set": {"updated_at": now},
+                        "$setOnInsert": {
+                            "day": row["day"],
+                            "guild_id": row["guild_id"],
+                            "channel_id": row["channel_id"],
+                            "model": row["model"],
+                        },
+                    },
+                    upsert=True
+                ))
+            self.db.token_usage.bulk_write(operations, ordered=False)
+            return True
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to record token usage: {e}")
+            return False
+    
+    def get_daily_token_usage(self, day):
+        """Get the total tokens used per guild on a day
+        
+        Args:
+            day (str): Day in YYYY-MM-DD format (UTC)
+        
+        Returns:
+            dict: guild_id -> total tokens, or None if the query failed
+        """
+        if self._healthy is False:
+            return None
+        try:
+            totals = self.db.token_usage.aggregate([
+                {"$match": {"day": day}},
+                {"$group": {"_id": "$guild_id", "tokens": {"$sum": "$total_tokens"}}},
+            ])
+            return {row["_id"]: row["tokens"] for row in totals}
+        except Exception as e:
+            if is_connection_error(e):
+                self._mark_unhealthy(e)
+            logger.error(f"Failed to get token usage for {day}: {e}")
+            return None
+    
+    def claim_message(self, message_id, owner=None, content_hash=None):
+        """Atomically claim a message for processing
+        
+        The claim is an insert keyed by the message ID, so exactly one shard,
+        process or replay wins no matter how many see the same message.
+        
+        Args:
+            message_id (str): The Discord message ID
+            owner (str): Who claimed it (e.g. the shard range), for debugging
+            content_hash (str): Hash of the content extraction depends on, used to
+                decide whether an edit needs a re-extraction
+        
+        Returns:
+            bool: True if this caller claimed the message, False if it was already claimed
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        from pymongo.errors import DuplicateKeyError
+        
+        try:
+            self.db.processed_messages.insert_one({
+                "_id": str(message_id),
+                "owner": owner,
+                "content_hash": content_hash,
+                "claimed_at": datetime.now(timezone.utc),
+            })
+            return True
+        except DuplicateKeyError:
+            return False
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            # Fall back to processing, saves are still deduplicated by message_id
+            logger.error(f"Failed to claim message {message_id}: {e}")
+            return True
+    
+    def get_content_hash(self, message_id):
+        """Get the content hash stored when a message was last extracted
+        
+        Returns:
+            str: The hash, or None if the message was never claimed or has no hash
+        
+        Raises:
+            DatabaseUnavailableError: If MongoDB can't be reached
+        """
+        self._require_available()
+        try:
+            claim = self.db.processed_messages.find_one({"_id": str(message_id)}, {"content_hash": 1})
+            return claim.get("content_hash") if claim else None
+        except Exception as e:
+            self._raise_if_unavailable(e)
+            logger.error(f"Failed to get content hash for message {message_id}: {e}")
+            return None
+    
+    def set_content_hash(self, message_id, content_hash):
+        """Store the content hash of a (re-)extracted message
+        
+        Returns:
+            bool: True if the hash was written
+        """
+        try:
+            self.db.processed_messages.update_one(
+                {"_id": str(message_id)},
+                {
+                    "$set": {"content_hash": content_hash},
+                    "$setOnInsert": {"claimed_at": datetime.now(timezone.utc)},
+                },
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to set content hash for message {message_id}: {e}")
+            return False
+    
+    def release_message(self, message_id):
+        """Drop the claim on a message so it can be processed again
+        
+        Returns:
+            bool: True if the claim was removed
+        """
+        try:
+            self.db.processed_messages.delete_one({"_id": str(message_id)})
+            return True
+        except Exception as e:
+            logger.error(f"Failed to release claim on message {message_id}: {e}")
+            return False
+
+    def get_channel_checkpoint(self, channel_id):
+        """Get the last processed message ID for a channel
+
+        Args:
+            channel_id (str): The Discord channel ID
+
+        Returns:
+            int: ID of the last processed message or None if no checkpoint exists
+        """
+        try:
+            checkpoint = self.db.channel_checkpoints.find_one({"_id": str(channel_id)})
+            if checkpoint:
+                return checkpoint.get("last_message_id")
+            return None
+        except Exception as e:
+            logger.error(f"Failed to get checkpoint for channel {channel_id}: {e}")
+            return None
+
+    def update_channel_checkpoint(self, channel_id, message_id, guild_id=None):
+        """Advance the high-water mark for a channel
+
+        The checkpoint only ever moves forward, so out-of-order or repeated
+        updates are harmless.
+
+        Args:
+            channel_id (str): The Discord channel ID
+            message_id (int): ID of the message that was just processed
+            guild_id (str): The Discord guild ID the channel belongs to
+
+        Returns:
+            bool: True if the checkpoint was written, False otherwise
+        """
+        if self._healthy is False:
+            return False
+        try:
+            update = {
+                "$max": {"last_message_id": int(message_id)},
+                "$set": {"updated_at": datetime.utcnow()},
+            }
+            if guild_id is not None:
+                update["$set"]["guild_id"] = str(guild_id)
+
+            self.db.channel_checkpoints.update_one(
+                {"_id": str(channel_id)},
+                update,
+                upsert=True
+            )
+            return True
+        except Exception as e:
+            logger.error(f"Failed to update checkpoint for channel {channel_id}: {e}")
             return False 
\ No newline at end of file
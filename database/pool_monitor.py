@@ -0,0 +1,67 @@
+import threading
+
+from pymongo import monitoring
+
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events so pool usage can be exposed for monitoring
+
+    Registered on the MongoClient via ``event_listeners``. Counters are
+    cumulative since the client was created, except ``checked_out`` and
+    ``open`` which reflect the current state.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = {
+            "open": 0,
+            "created": 0,
+            "closed": 0,
+            "checked_out": 0,
+            "checkouts": 0,
+            "checkout_failures": 0,
+            "pool_cleared": 0,
+        }
+
+    def _update(self, **changes):
+        with self._lock:
+            for key, delta in changes.items():
+                self._stats[key] += delta
+
+    def snapshot(self):
+        """Get a copy of the current counters"""
+        with self._lock:
+            return dict(self._stats)
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._update(pool_cleared=1)
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._update(open=1, created=1)
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._update(open=-1, closed=1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._update(checkout_failures=1)
+
+    def connection_checked_out(self, event):
+        self._update(checked_out=1, checkouts=1)
+
+    def connection_checked_in(self, event):
+        self._update(checked_out=-1)
@@ -0,0 +1,208 @@
+import time
+import logging
+import threading
+from concurrent.futures import Future
+
+logger = logging.getLogger('deadline-bot.database.write_buffer')
+
+# Matches documents whose date_str is missing or not in YYYY-MM-DD format
+_UNFORMATTED_DATE = {"$not": {"$regex": r"^\d{4}-\d{2}-\d{2}$"}}
+
+
+class WriteBehindBuffer:
+    """Collects deadline upserts and flushes them as one ``bulk_write``
+
+    A background thread flushes the buffer every ``flush_interval_ms`` or as
+    soon as ``max_batch`` documents are waiting, whichever comes first. Each
+    queued document gets a Future that resolves to the document's ID once
+    its batch has been written (or None if the write failed), so callers
+    can choose between fire-and-forget and waiting for durability.
+
+    Writes are upserts keyed by ``message_id`` with the same semantics as
+    ``MongoDBClient.save_deadline``: new messages are inserted, existing
+    ones are only overwritten if their stored date isn't properly
+    formatted. That makes retries after transient errors safe.
+    """
+
+    def __init__(self, get_collection, flush_interval_ms=200, max_batch=100, max_retries=3, on_flush=None):
+        """Initialize the buffer
+
+        Args:
+            get_collection: Callable returning the deadlines collection
+            flush_interval_ms (int): Maximum time a document waits before being flushed
+            max_batch (int): Flush as soon as this many documents are waiting
+            max_retries (int): Retries for transient errors before giving up on a batch
+            on_flush: Optional callable receiving the list of document IDs written by each flush
+        """
+        self._get_collection = get_collection
+        self._on_flush = on_flush
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_batch = max(max_batch, 1)
+        self.max_retries = max_retries
+
+        self._pending = []
+        self._oldest = None
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._in_flight = 0  # batches taken from the buffer but not written yet
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="mongo-write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, deadline_data):
+        """Queue a deadline for the next flush
+
+        Args:
+            deadline_data (dict): Validated deadline document with a message_id
+
+        Returns:
+            Future: Resolves to the document ID (str) or None if the write failed
+        """
+        future = Future()
+        with self._condition:
+            if self._stopped:
+                future.set_result(None)
+                logger.error("Write-behind buffer is closed, dropping deadline")
+                return future
+
+            first = not self._pending
+            if first:
+                self._oldest = time.monotonic()
+            self._pending.append((deadline_data, future))
+            # Wake the flusher to start the interval timer, or to flush a full batch
+            if first or len(self._pending) >= self.max_batch:
+                self._condition.notify_all()
+        return future
+
+    def flush(self):
+        """Write everything that is currently buffered and wait for it
+
+        Also waits for a batch the background thread is still writing, so
+        every document submitted before the call is in MongoDB afterwards.
+        """
+        with self._condition:
+            batch = self._take()
+        self._write_taken(batch)
+        with self._condition:
+            while self._in_flight:
+                self._condition.wait()
+
+    def close(self):
+        """Flush remaining documents and stop the background thread"""
+        with self._condition:
+            self._stopped = True
+            self._condition.notify_all()
+        self._thread.join(timeout=max(self.flush_interval * 10, 5))
+        self.flush()
+
+    def _take(self):
+        # Called with the condition held
+        batch = self._pending
+        self._pending = []
+        self._oldest = None
+        if batch:
+            self._in_flight += 1
+        return batch
+
+    def _write_taken(self, batch):
+        try:
+            self._write(batch)
+        finally:
+            if batch:
+                with self._condition:
+                    self._in_flight -= 1
+                    self._condition.notify_all()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while not self._stopped:
+                    if len(self._pending) >= self.max_batch:
+                        break
+                    if self._pending:
+                        remaining = self._oldest + self.flush_interval - time.monotonic()
+                        if remaining <= 0:
+                            break
+                        self._condition.wait(remaining)
+                    else:
+                        self._condition.wait()
+                batch = self._take()
+                stopped = self._stopped
+
+            self._write_taken(batch)
+            if stopped:
+                return
+
+    def _write(self, batch):
+        """Write a batch with retries and resolve its futures"""
+        if not batch:
+            return
+
+        from pymongo import UpdateOne
+        from pymongo.errors import AutoReconnect, BulkWriteError, ConnectionFailure, NetworkTimeout
+
+        operations = []
+        for deadline_data, _ in batch:
+            message_id = deadline_data["message_id"]
+            operations.append(UpdateOne(
+                {"message_id": message_id, "date_str": _UNFORMATTED_DATE},
+                {"$set": deadline_data}
+            ))
+            operations.append(UpdateOne(
+                {"message_id": message_id},
+                {"$setOnInsert": deadline_data},
+                upsert=True
+            ))
+
+        # Serialize flushes so documents are written in the order they were queued
+        with self._flush_lock:
+            failed_indexes = set()
+            for attempt in range(self.max_retries + 1):
+                try:
+                    collection = self._get_collection()
+                    collection.bulk_write(operations, ordered=False)
+                    break
+                except BulkWriteError as e:
+                    failed_indexes = {error["index"] // 2 for error in e.details.get("writeErrors", [])}
+                    logger.error(f"Bulk write partially failed: {len(failed_indexes)} of {len(batch)} deadlines")
+                    break
+                except (AutoReconnect, ConnectionFailure, NetworkTimeout) as e:
+                    if attempt >= self.max_retries:
+                        logger.error(f"Giving up on {len(batch)} buffered deadlines after {attempt + 1} attempts: {e}")
+                        self._resolve(batch, {}, set(range(len(batch))))
+                        return
+                    delay = min(0.5 * (2 ** attempt), 10)
+                    logger.warning(f"Transient error flushing deadlines, retrying in {delay:.1f}s: {e}")
+                    time.sleep(delay)
+                except Exception as e:
+                    logger.error(f"Failed to flush {len(batch)} buffered deadlines: {e}")
+                    self._resolve(batch, {}, set(range(len(batch))))
+                    return
+
+            # Look up IDs for both inserted and pre-existing documents in one round trip
+            ids = {}
+            object_ids = []
+            try:
+                message_ids = [deadline_data["message_id"] for deadline_data, _ in batch]
+                for doc in self._get_collection().find({"message_id": {"$in": message_ids}}, {"message_id": 1}):
+                    ids[doc["message_id"]] = str(doc["_id"])
+                    object_ids.append(doc["_id"])
+            except Exception as e:
+                logger.error(f"Failed to look up IDs for flushed deadlines: {e}")
+
+            logger.info(f"Flushed {len(batch) - len(failed_indexes)} buffered deadlines")
+            self._resolve(batch, ids, failed_indexes)
+
+            if self._on_flush is not None and object_ids:
+                try:
+                    self._on_flush(object_ids)
+                except Exception as e:
+                    logger.error(f"Post-flush hook failed: {e}")
+
+    @staticmethod
+    def _resolve(batch, ids, failed_indexes):
+        for index, (deadline_data, future) in enumerate(batch):
+            if index in failed_indexes:
+                future.set_result(None)
+            else:
+                future.set_result(ids.get(deadline_data["message_id"]))
@@ -63,7 +63,7 @@ const formatDateString = (dateStr) => {
 
   const year = dateObj.getFullYear();
   const month = String(dateObj.getMonth() + 1).padStart(2, '0'); 
-  const day = String(dateObj.getDate() +1).padStart(2, '0');
+  const day = String(dateObj.getDate()).padStart(2, '0');
   
   return `${year}-${month}-${day}`;
 };
@@ -0,0 +1,27 @@
+from shared.dates import (
+    ISO_DATE_RE,
+    DEFAULT_TIMEZONE,
+    is_iso_date,
+    parse_date,
+    normalize_date,
+    parse_time,
+    compute_due_at,
+    local_today,
+)
+from shared.env import load_env
+from shared.fingerprint import simhash, hamming_distance, event_fingerprint
+
+__all__ = [
+    "ISO_DATE_RE",
+    "DEFAULT_TIMEZONE",
+    "is_iso_date",
+    "parse_date",
+    "normalize_date",
+    "parse_time",
+    "compute_due_at",
+    "local_today",
+    "load_env",
+    "simhash",
+    "hamming_distance",
+    "event_fingerprint",
+]
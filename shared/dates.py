@@ -0,0 +1,305 @@
+import os
+import re
+import logging
+from datetime import datetime, date, time, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+logger = logging.getLogger('deadline-bot.dates')
+
+# Timezone used for guilds without an explicit timezone
+DEFAULT_TIMEZONE = os.getenv('DEFAULT_TIMEZONE', 'America/Los_Angeles')
+
+# Precompiled patterns shared by the bot, the database client and the API
+ISO_DATE_RE = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+TODAY_RE = re.compile(r'\b(?:today|tonight)\b')
+TOMORROW_RE = re.compile(r'\btomorrow\b')
+YEAR_RE = re.compile(r'\b\d{4}\b')
+
+_ORDINAL_RE = re.compile(r'\b(\d{1,2})(?:st|nd|rd|th)\b')
+_WHITESPACE_RE = re.compile(r'\s+')
+_PREFIX_RE = re.compile(r'^(?:on|by|due|before|until)\s+')
+_TIME = r'(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)?|noon|midnight)'
+_TIME_STRICT = r'(?:\d{1,2}(?::\d{2})?\s*(?:am|pm|a\.m\.|p\.m\.)|\d{1,2}:\d{2}|noon|midnight)'
+_TIME_SUFFIX_RE = re.compile(
+    r'(?:\s*(?:,|@|\bat\b|\bfrom\b)\s*' + _TIME + r'|\s+' + _TIME_STRICT +
+    r'|\s+\d{1,2}(?::\d{2})?\s*(?:-|to)\s*' + _TIME_STRICT + r')'
+    r'(?:\s*(?:-|to)\s*' + _TIME + r')?(?:\s*(?:pst|pdt|pt))?$'
+)
+
+_MONTHS = {
+    'jan': 1, 'feb': 2, 'mar': 3, 'apr': 4, 'may': 5, 'jun': 6,
+    'jul': 7, 'aug': 8, 'sep': 9, 'sept': 9, 'oct': 10, 'nov': 11, 'dec': 12,
+}
+_WEEKDAYS = {
+    'mon': 0, 'tue': 1, 'tues': 1, 'wed': 2, 'thu': 3, 'thur': 3, 'thurs': 3,
+    'fri': 4, 'sat': 5, 'sun': 6,
+}
+_NUMBER_WORDS = {
+    'a': 1, 'an': 1, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+}
+
+_MONTH_NAME = r'(?P<month>jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?'
+_WEEKDAY_NAME = r'(?P<weekday>mon|tue|tues|wed|thu|thur|thurs|fri|sat|sun)[a-z]*\.?'
+
+_ISO_PREFIX_RE = re.compile(r'^(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})(?!\d)')
+_SLASH_RE = re.compile(r'^(?:' + _WEEKDAY_NAME + r',?\s+)?(?P<month>\d{1,2})/(?P<day>\d{1,2})(?:/(?P<year>\d{2}|\d{4}))?$')
+_MONTH_DAY_RE = re.compile(
+    r'^(?:' + _WEEKDAY_NAME + r',?\s+)?' + _MONTH_NAME + r'\s+(?P<day>\d{1,2}),?(?:\s+(?P<year>\d{4}))?$'
+)
+_DAY_MONTH_RE = re.compile(
+    r'^(?:' + _WEEKDAY_NAME + r',?\s+)?(?:the\s+)?(?P<day>\d{1,2})\s+(?:of\s+)?' + _MONTH_NAME + r',?(?:\s+(?P<year>\d{4}))?$'
+)
+_RELATIVE_RE = re.compile(
+    r'^in\s+(?P<count>\d+|a|an|one|two|three|four|five|six|seven|eight|nine|ten)\s+(?P<unit>day|week)s?$'
+)
+_CLOCK_RE = re.compile(
+    r'\b(?P<hour>\d{1,2})(?::(?P<minute>\d{2}))?\s*(?P<meridiem>am|pm|a\.m\.|p\.m\.)?'
+    r'(?:\s*(?:-|to)\s*\d{1,2}(?::\d{2})?\s*(?P<end_meridiem>am|pm|a\.m\.|p\.m\.)?)?'
+)
+_NEXT_WEEK_RE = re.compile(r'^next\s+week$')
+_WEEKDAY_RE = re.compile(r'^(?P<modifier>next|this|coming|this\s+coming)?\s*' + _WEEKDAY_NAME + r'$')
+
+_dateutil_parser = None
+
+
+def _get_dateutil_parser():
+    """Import dateutil's parser once, on first use"""
+    global _dateutil_parser
+    if _dateutil_parser is None:
+        from dateutil import parser
+        _dateutil_parser = parser
+    return _dateutil_parser
+
+
+def is_iso_date(date_str) -> bool:
+    """Check whether a value is a YYYY-MM-DD date string"""
+    return bool(date_str) and isinstance(date_str, str) and ISO_DATE_RE.match(date_str) is not None
+
+
+def _clean(date_str: str) -> str:
+    """Lower-case, strip ordinals, leading prepositions and trailing times"""
+    text = _WHITESPACE_RE.sub(' ', date_str.strip().lower())
+    text = _ORDINAL_RE.sub(r'\1', text)
+    text = _PREFIX_RE.sub('', text)
+    text = _TIME_SUFFIX_RE.sub('', text)
+    return text.strip(' ,.')
+
+
+def _build_date(year, month, day) -> Optional[date]:
+    try:
+        return date(int(year), int(month), int(day))
+    except (TypeError, ValueError):
+        return None
+
+
+def _next_weekday(today: date, weekday: int, strictly_after: bool) -> date:
+    """Get the next date falling on ``weekday`` counting from ``today``"""
+    days_ahead = (weekday - today.weekday()) % 7
+    if days_ahead == 0 and strictly_after:
+        days_ahead = 7
+    return today + timedelta(days=days_ahead)
+
+
+def _parse_fast(text: str, today: date) -> Optional[date]:
+    """Parse the common formats without dateutil
+
+    Returns None when the text doesn't match any known format.
+    """
+    if TODAY_RE.search(text):
+        return today
+    if TOMORROW_RE.search(text):
+        return today + timedelta(days=1)
+
+    match = _ISO_PREFIX_RE.match(text)
+    if match:
+        return _build_date(match.group('year'), match.group('month'), match.group('day'))
+
+    match = _MONTH_DAY_RE.match(text) or _DAY_MONTH_RE.match(text)
+    if match:
+        year = match.group('year') or today.year
+        return _build_date(year, _MONTHS[match.group('month')], match.group('day'))
+
+    match = _SLASH_RE.match(text)
+    if match:
+        year = match.group('year')
+        if not year:
+            year = today.year
+        elif len(year) == 2:
+            year = 2000 + int(year)
+        return _build_date(year, match.group('month'), match.group('day'))
+
+    match = _RELATIVE_RE.match(text)
+    if match:
+        count = match.group('count')
+        count = int(count) if count.isdigit() else _NUMBER_WORDS[count]
+        days = count * 7 if match.group('unit') == 'week' else count
+        return today + timedelta(days=days)
+
+    if _NEXT_WEEK_RE.match(text):
+        return today + timedelta(days=7)
+
+    match = _WEEKDAY_RE.match(text)
+    if match:
+        weekday = _WEEKDAYS[match.group('weekday')]
+        return _next_weekday(today, weekday, strictly_after=match.group('modifier') == 'next')
+
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _parse_cached(date_str: str, today: date) -> Optional[date]:
+    """Parse a date string relative to ``today`` (memoized)"""
+    text = _clean(date_str)
+    if not text:
+        return None
+
+    parsed = _parse_fast(text, today)
+    if parsed:
+        return parsed
+
+    # Slow path: let dateutil have a go at anything unusual
+    try:
+        parser = _get_dateutil_parser()
+        if not YEAR_RE.search(text):
+            try:
+                return parser.parse(f"{text}, {today.year}").date()
+            except (ValueError, OverflowError):
+                pass
+        return parser.parse(text).date()
+    except Exception:
+        return None
+
+
+def parse_date(date_str: str, today: Optional[date] = None) -> Optional[date]:
+    """Parse a free-form date expression into a date
+
+    Handles ISO dates, "April 15th", "15 April 2025", "4/15", "today",
+    "tomorrow", "Friday", "next Friday", "in 2 days", "in a week" and
+    "next week" without dateutil. Anything else falls back to dateutil.
+    Dates without a year are assumed to be in the current year, and
+    "next <weekday>" means the first such day strictly after today.
+    Results are memoized per (string, reference date).
+
+    Args:
+        date_str: The date expression to parse
+        today: Reference date for relative expressions (defaults to today)
+
+    Returns:
+        date: The parsed date or None if it couldn't be parsed
+    """
+    if not date_str:
+        return None
+    if today is None:
+        today = date.today()
+    elif isinstance(today, datetime):
+        today = today.date()
+    return _parse_cached(date_str, today)
+
+
+def normalize_date(date_str: str, today: Optional[date] = None) -> Tuple[datetime, str]:
+    """Parse a date expression, falling back to today when it can't be parsed
+
+    Args:
+        date_str: The date expression to parse
+        today: Reference date for relative expressions (defaults to today)
+
+    Returns:
+        Tuple with (due_date, standardized YYYY-MM-DD string)
+    """
+    if today is None:
+        today = date.today()
+    elif isinstance(today, datetime):
+        today = today.date()
+
+    parsed = parse_date(date_str, today) or today
+    return datetime(parsed.year, parsed.month, parsed.day), parsed.strftime("%Y-%m-%d")
+
+
+@lru_cache(maxsize=64)
+def get_timezone(tz_name: Optional[str] = None) -> ZoneInfo:
+    """Look up a timezone by IANA name, falling back to DEFAULT_TIMEZONE"""
+    try:
+        return ZoneInfo(tz_name or DEFAULT_TIMEZONE)
+    except (ZoneInfoNotFoundError, ValueError):
+        logger.warning(f"Unknown timezone '{tz_name}', using {DEFAULT_TIMEZONE}")
+        return ZoneInfo(DEFAULT_TIMEZONE)
+
+
+def local_today(tz_name: Optional[str] = None) -> date:
+    """Get the current date in the given timezone"""
+    return datetime.now(get_timezone(tz_name)).date()
+
+
+@lru_cache(maxsize=1024)
+def parse_time(time_str: str) -> Optional[time]:
+    """Parse a time of day such as "6pm", "6:30 PM", "18:00" or "6-8pm"
+
+    For ranges the start time is returned, borrowing the meridiem from the
+    end of the range when the start has none. Bare hours without am/pm
+    are ignored since they are too ambiguous.
+
+    Args:
+        time_str: The time expression to parse
+
+    Returns:
+        time: The parsed time or None if no time was found
+    """
+    if not time_str:
+        return None
+
+    text = time_str.strip().lower()
+    if 'noon' in text:
+        return time(12, 0)
+    if 'midnight' in text:
+        return time(0, 0)
+
+    for match in _CLOCK_RE.finditer(text):
+        hour = int(match.group('hour'))
+        minute = int(match.group('minute') or 0)
+        meridiem = match.group('meridiem') or match.group('end_meridiem')
+
+        if meridiem:
+            if not 1 <= hour <= 12:
+                continue
+            hour = hour % 12 + (12 if meridiem.startswith('p') else 0)
+        elif match.group('minute') is None:
+            continue
+
+        if hour < 24 and minute < 60:
+            return time(hour, minute)
+    return None
+
+
+def compute_due_at(date_str: str, time_str: Optional[str] = None,
+                   tz_name: Optional[str] = None) -> Tuple[Optional[datetime], bool]:
+    """Convert a local date (and optional time) into a UTC due timestamp
+
+    Events without a time are treated as all-day and fall due at the end
+    of the local day, so they stay "upcoming" until the day is over.
+
+    Args:
+        date_str: Date in YYYY-MM-DD format
+        time_str: Optional time of day expression
+        tz_name: IANA timezone the date and time are expressed in
+
+    Returns:
+        Tuple with (due_at in UTC or None if the date is invalid, all_day)
+    """
+    if not is_iso_date(date_str):
+        return None, True
+
+    try:
+        day = date.fromisoformat(date_str)
+    except ValueError:
+        return None, True
+
+    at = parse_time(time_str) if time_str else None
+    all_day = at is None
+    if all_day:
+        at = time(23, 59, 59)
+
+    local = datetime.combine(day, at, tzinfo=get_timezone(tz_name))
+    return local.astimezone(timezone.utc), all_day
@@ -0,0 +1,41 @@
+import os
+from functools import lru_cache
+from typing import Optional
+
+
+def find_env_file(start_dir: str) -> Optional[str]:
+    """Find the nearest .env file walking up from ``start_dir``"""
+    current = os.path.abspath(start_dir)
+    while True:
+        candidate = os.path.join(current, '.env')
+        if os.path.isfile(candidate):
+            return candidate
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+
+@lru_cache(maxsize=None)
+def _load_file(path: str) -> bool:
+    from dotenv import load_dotenv
+    return load_dotenv(path)
+
+
+def load_env(start_dir: str) -> Optional[str]:
+    """Load the nearest .env file for a module, at most once per process
+
+    Mirrors ``load_dotenv()`` called from a module in ``start_dir`` (existing
+    environment variables win), but each .env file is only read and parsed
+    once no matter how many modules ask for it.
+
+    Args:
+        start_dir: Directory to start searching from, usually the caller's directory
+
+    Returns:
+        str: Path of the loaded .env file, or None if none was found
+    """
+    path = find_env_file(start_dir)
+    if path:
+        _load_file(path)
+    return path
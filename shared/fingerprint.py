@@ -0,0 +1,118 @@
+import os
+import re
+import hashlib
+from functools import lru_cache
+
+# SimHash width and how it is split into bands for the index. Fingerprints
+# that differ in fewer bits than there are bands always share a band, and
+# larger distances still share one with high probability. Announcements are
+# short, so rewordings of the same event typically land 5-12 bits apart
+# while unrelated events sit around 32.
+SIMHASH_BITS = 64
+SIMHASH_BANDS = 8
+SIMHASH_MAX_DISTANCE = int(os.getenv('SIMHASH_MAX_DISTANCE', '10'))
+
+_BAND_BITS = SIMHASH_BITS // SIMHASH_BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+_MASK = (1 << SIMHASH_BITS) - 1
+
+_URL_RE = re.compile(r'https?://\S+|<[@#!&]?\d+>')
+_TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Words that carry no information about which event an announcement is for
+_STOPWORDS = frozenset(
+    "a an and are at be by for from has have in is it its of on or our the this to "
+    "we will with you your us all come join hey everyone here".split()
+)
+
+
+def normalize_text(text):
+    """Lowercase, drop links/mentions and stopwords, and tokenize
+
+    Args:
+        text (str): Raw text
+
+    Returns:
+        list: Normalized tokens
+    """
+    text = _URL_RE.sub(" ", (text or "").lower())
+    return [t for t in _TOKEN_RE.findall(text) if t not in _STOPWORDS]
+
+
+def _features(tokens):
+    """Unigrams plus bigrams so small rewordings only change a few features"""
+    features = list(tokens)
+    features.extend(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return features
+
+
+@lru_cache(maxsize=16384)
+def _feature_hash(feature):
+    return int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+
+
+def simhash(text):
+    """Compute the 64-bit SimHash of a piece of text
+
+    Args:
+        text (str): Text to fingerprint
+
+    Returns:
+        int: Fingerprint (0 for text without any tokens)
+    """
+    features = _features(normalize_text(text))
+    if not features:
+        return 0
+
+    weights = [0] * SIMHASH_BITS
+    for feature in features:
+        h = _feature_hash(feature)
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if (h >> bit) & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def simhash_bands(fingerprint):
+    """Split a fingerprint into band keys for the index
+
+    Each key encodes the band position as well as its value, so one
+    multikey index can serve every band.
+
+    Args:
+        fingerprint (int): SimHash fingerprint
+
+    Returns:
+        list: One integer key per band
+    """
+    return [
+        (band << _BAND_BITS) | ((fingerprint >> (band * _BAND_BITS)) & _BAND_MASK)
+        for band in range(SIMHASH_BANDS)
+    ]
+
+
+def hamming_distance(a, b):
+    """Number of differing bits between two fingerprints"""
+    return bin((a ^ b) & _MASK).count("1")
+
+
+def event_fingerprint(deadline_data):
+    """Fingerprint an event from its club, title and description
+
+    The date is not hashed, it's matched exactly when looking up candidates.
+
+    Args:
+        deadline_data (dict): Deadline document
+
+    Returns:
+        tuple: (fingerprint as a hex string, list of band keys)
+    """
+    text = " ".join(
+        str(deadline_data.get(field) or "") for field in ("club", "title", "description")
+    )
+    fingerprint = simhash(text)
+    return format(fingerprint, "016x"), simhash_bands(fingerprint)
@@ -0,0 +1,89 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from starlette.testclient import TestClient
+
+import backend.main as api
+from backend.ics import CalendarFeedCache
+
+
+class FakeCalendarDB:
+    """Just enough of MongoDBClient for the calendar endpoints"""
+
+    def __init__(self, events):
+        self.events = events
+
+    def get_calendar_version(self, field, value):
+        return 1
+
+    def get_calendar_events(self, field, value, since=None, horizon=None, cached_ids=None):
+        return [doc for doc in self.events if doc.get(field) == value]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    now = datetime.now(timezone.utc)
+    events = [
+        {
+            "_id": f"64b000000000000000000{i:03d}",
+            "club": "Chess",
+            "title": f"Tournament round {i}",
+            "description": "Bring your own board and clock",
+            "due_at": now + timedelta(days=i + 1),
+            "updated_at": now,
+        }
+        for i in range(20)
+    ]
+    monkeypatch.setattr(api, "db_client", FakeCalendarDB(events))
+    monkeypatch.setattr(api, "calendar_cache", CalendarFeedCache(check_interval=0))
+    return TestClient(api.app)
+
+
+@pytest.mark.parametrize("header, etag, expected", [
+    ('"abc"', '"abc"', True),
+    ('W/"abc"', '"abc"', True),
+    ('"abc"', 'W/"abc"', True),
+    ('"x", W/"abc"', '"abc"', True),
+    ('*', '"abc"', True),
+    ('"abd"', '"abc"', False),
+    ('', '"abc"', False),
+])
+def test_etag_matches_compares_weakly(header, etag, expected):
+    assert api._etag_matches(header, etag) is expected
+
+
+def test_uncompressed_conditional_get(client):
+    first = client.get("/calendar/club/Chess.ics", headers={"Accept-Encoding": "identity"})
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert not etag.startswith("W/")
+
+    second = client.get(
+        "/calendar/club/Chess.ics", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+
+def test_compressed_conditional_get(client):
+    first = client.get("/calendar/club/Chess.ics", headers={"Accept-Encoding": "gzip"})
+    assert first.status_code == 200
+    assert first.headers["content-encoding"] == "gzip"
+    etag = first.headers["etag"]
+    assert etag.startswith("W/")
+    assert b"BEGIN:VCALENDAR" in first.content
+
+    second = client.get(
+        "/calendar/club/Chess.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+    )
+    assert second.status_code == 304
+    assert second.headers["etag"] == etag
+
+
+def test_changed_feed_is_sent_again(client):
+    etag = client.get("/calendar/club/Chess.ics", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get(
+        "/calendar/club/Chess.ics", headers={"Accept-Encoding": "gzip", "If-None-Match": 'W/"stale"'}
+    )
+    assert response.status_code == 200
+    assert response.headers["etag"] == etag
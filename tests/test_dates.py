@@ -0,0 +1,96 @@
+from datetime import date, datetime, time, timezone
+
+import pytest
+
+from shared.dates import compute_due_at, is_iso_date, normalize_date, parse_date, parse_time
+
+# A Wednesday
+TODAY = date(2025, 3, 5)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2025-04-15", date(2025, 4, 15)),
+    ("April 15th", date(2025, 4, 15)),
+    ("Apr 15, 2026", date(2026, 4, 15)),
+    ("15 April 2025", date(2025, 4, 15)),
+    ("the 15th of April", date(2025, 4, 15)),
+    ("4/15", date(2025, 4, 15)),
+    ("4/15/26", date(2026, 4, 15)),
+    ("Friday, 4/18", date(2025, 4, 18)),
+    ("today", TODAY),
+    ("tonight at 7pm", TODAY),
+    ("tomorrow", date(2025, 3, 6)),
+    ("Friday", date(2025, 3, 7)),
+    ("Wednesday", TODAY),
+    ("next Wednesday", date(2025, 3, 12)),
+    ("this coming Monday", date(2025, 3, 10)),
+    ("in 2 days", date(2025, 3, 7)),
+    ("in a week", date(2025, 3, 12)),
+    ("next week", date(2025, 3, 12)),
+    ("by March 20th at 6pm", date(2025, 3, 20)),
+    ("March 20 6-8pm PST", date(2025, 3, 20)),
+])
+def test_parse_date(text, expected):
+    assert parse_date(text, TODAY) == expected
+
+
+@pytest.mark.parametrize("text", ["", "sometime soon", "2025-02-30"])
+def test_parse_date_rejects(text):
+    assert parse_date(text, TODAY) is None
+
+
+def test_parse_date_accepts_datetime_reference():
+    assert parse_date("tomorrow", datetime(2025, 3, 5, 23, 0)) == date(2025, 3, 6)
+
+
+def test_normalize_date_falls_back_to_today():
+    assert normalize_date("whenever", TODAY) == (datetime(2025, 3, 5), "2025-03-05")
+    assert normalize_date("Friday", TODAY)[1] == "2025-03-07"
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("2025-03-05", True),
+    ("2025-3-5", False),
+    ("March 5", False),
+    (None, False),
+    (20250305, False),
+])
+def test_is_iso_date(value, expected):
+    assert is_iso_date(value) is expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("6pm", time(18, 0)),
+    ("6:30 PM", time(18, 30)),
+    ("18:00", time(18, 0)),
+    ("6-8pm", time(18, 0)),
+    ("12am", time(0, 0)),
+    ("noon", time(12, 0)),
+    ("midnight", time(0, 0)),
+    ("6", None),
+    ("13pm", None),
+    ("", None),
+])
+def test_parse_time(text, expected):
+    assert parse_time(text) == expected
+
+
+def test_compute_due_at_with_time():
+    due_at, all_day = compute_due_at("2025-07-04", "6pm", "America/New_York")
+    assert due_at == datetime(2025, 7, 4, 22, 0, tzinfo=timezone.utc)
+    assert all_day is False
+
+
+def test_compute_due_at_all_day_ends_with_the_local_day():
+    due_at, all_day = compute_due_at("2025-01-15", None, "America/Los_Angeles")
+    assert due_at == datetime(2025, 1, 16, 7, 59, 59, tzinfo=timezone.utc)
+    assert all_day is True
+
+
+def test_compute_due_at_unknown_timezone_uses_default():
+    assert compute_due_at("2025-01-15", None, "Not/AZone") == compute_due_at("2025-01-15", None, None)
+
+
+@pytest.mark.parametrize("date_str", ["", "tomorrow", "2025-02-30"])
+def test_compute_due_at_invalid_date(date_str):
+    assert compute_due_at(date_str) == (None, True)
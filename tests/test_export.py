@@ -0,0 +1,67 @@
+import gzip
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from backend.export import prefetch, stream_deadlines
+
+
+def deadlines(count, fail_after=None):
+    for i in range(count):
+        if fail_after is not None and i == fail_after:
+            raise RuntimeError("cursor died")
+        yield {
+            "_id": f"id{i}",
+            "title": f"Event {i}",
+            "due_at": datetime(2030, 1, 1, tzinfo=timezone.utc),
+        }
+
+
+def ndjson_records(chunks, compressed=False):
+    body = b"".join(chunks)
+    if compressed:
+        body = gzip.decompress(body)
+    return [json.loads(line) for line in body.splitlines()]
+
+
+def test_ndjson_export():
+    records = ndjson_records(stream_deadlines(deadlines(3)))
+    assert [r["id"] for r in records] == ["id0", "id1", "id2"]
+    assert records[0]["due_at"] == "2030-01-01T00:00:00+00:00"
+
+
+def test_gzip_export():
+    records = ndjson_records(stream_deadlines(deadlines(3), compress=True), compressed=True)
+    assert len(records) == 3
+
+
+def test_failure_ends_ndjson_with_error_record():
+    records = ndjson_records(stream_deadlines(deadlines(5, fail_after=2)))
+    assert [r.get("id") for r in records[:2]] == ["id0", "id1"]
+    assert "cursor died" in records[-1]["error"]
+
+
+def test_failure_ends_gzip_stream_with_error_record():
+    records = ndjson_records(stream_deadlines(deadlines(5, fail_after=2), compress=True), compressed=True)
+    assert "error" in records[-1]
+
+
+def test_failure_ends_msgpack_with_error_record():
+    msgpack = pytest.importorskip("msgpack")
+    body = b"".join(stream_deadlines(deadlines(5, fail_after=1), fmt="msgpack"))
+    unpacker = msgpack.Unpacker(raw=False)
+    unpacker.feed(body)
+    records = list(unpacker)
+    assert records[0]["id"] == "id0"
+    assert "error" in records[-1]
+
+
+def test_prefetch_raises_query_errors_up_front():
+    with pytest.raises(RuntimeError):
+        prefetch(deadlines(3, fail_after=0))
+
+
+def test_prefetch_keeps_every_document():
+    assert [doc["_id"] for doc in prefetch(deadlines(3))] == ["id0", "id1", "id2"]
+    assert list(prefetch(iter([]))) == []
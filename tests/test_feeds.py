@@ -0,0 +1,54 @@
+from backend.feeds import FeedCache
+
+
+def test_hit_for_the_same_version():
+    cache = FeedCache(maxsize=4, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"page")
+    assert cache.get(("alice", 0, 10), 1) == b"page"
+
+
+def test_version_bump_invalidates():
+    cache = FeedCache(maxsize=4, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"page")
+    assert cache.get(("alice", 0, 10), 2) is None
+    # The stale entry is dropped, not served again for the old version
+    assert cache.get(("alice", 0, 10), 1) is None
+
+
+def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("backend.feeds.time.monotonic", lambda: now[0])
+    cache = FeedCache(maxsize=4, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"page")
+    now[0] += 59
+    assert cache.get(("alice", 0, 10), 1) == b"page"
+    now[0] += 2
+    assert cache.get(("alice", 0, 10), 1) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FeedCache(maxsize=2, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"a")
+    cache.put(("bob", 0, 10), 1, b"b")
+    cache.get(("alice", 0, 10), 1)
+    cache.put(("carol", 0, 10), 1, b"c")
+    assert cache.get(("bob", 0, 10), 1) is None
+    assert cache.get(("alice", 0, 10), 1) == b"a"
+    assert cache.get(("carol", 0, 10), 1) == b"c"
+
+
+def test_invalidate_drops_every_page_of_a_user():
+    cache = FeedCache(maxsize=8, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"a1")
+    cache.put(("alice", 10, 10), 1, b"a2")
+    cache.put(("bob", 0, 10), 1, b"b")
+    cache.invalidate("alice")
+    assert cache.get(("alice", 0, 10), 1) is None
+    assert cache.get(("alice", 10, 10), 1) is None
+    assert cache.get(("bob", 0, 10), 1) == b"b"
+
+
+def test_disabled_cache_stores_nothing():
+    cache = FeedCache(maxsize=0, ttl=60)
+    cache.put(("alice", 0, 10), 1, b"page")
+    assert cache.get(("alice", 0, 10), 1) is None
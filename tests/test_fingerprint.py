@@ -0,0 +1,50 @@
+from shared.fingerprint import (
+    SIMHASH_BANDS, SIMHASH_MAX_DISTANCE, event_fingerprint, hamming_distance, normalize_text, simhash, simhash_bands
+)
+
+ANNOUNCEMENT = "Chess club tournament this Friday in the student union, bring your own board"
+REWORDED = "Reminder: chess club tournament this Friday at the student union! Bring your own board"
+UNRELATED = "Robotics team bake sale fundraiser on Tuesday outside the library"
+
+
+def test_normalize_text_drops_links_mentions_and_stopwords():
+    tokens = normalize_text("Hey everyone, join us at <@123> https://example.com/x for the Chess Night!")
+    assert tokens == ["chess", "night"]
+
+
+def test_simhash_is_stable_and_empty_text_is_zero():
+    assert simhash(ANNOUNCEMENT) == simhash(ANNOUNCEMENT.upper())
+    assert simhash("") == 0
+    assert simhash("the and of") == 0
+
+
+def test_rewording_stays_within_the_duplicate_distance():
+    assert hamming_distance(simhash(ANNOUNCEMENT), simhash(REWORDED)) <= SIMHASH_MAX_DISTANCE
+    assert hamming_distance(simhash(ANNOUNCEMENT), simhash(UNRELATED)) > SIMHASH_MAX_DISTANCE
+
+
+def test_close_fingerprints_share_a_band():
+    fingerprint = simhash(ANNOUNCEMENT)
+    # Flip one bit in every band but the last
+    other = fingerprint
+    for band in range(SIMHASH_BANDS - 1):
+        other ^= 1 << (band * 8)
+    assert hamming_distance(fingerprint, other) == SIMHASH_BANDS - 1
+    assert set(simhash_bands(fingerprint)) & set(simhash_bands(other))
+
+
+def test_band_keys_encode_their_position():
+    assert len(set(simhash_bands(0))) == SIMHASH_BANDS
+
+
+def test_hamming_distance():
+    assert hamming_distance(0b1011, 0b0001) == 2
+    assert hamming_distance(-1, 0) == 64
+
+
+def test_event_fingerprint_ignores_the_date():
+    base = {"club": "Chess", "title": "Tournament", "description": ANNOUNCEMENT}
+    fingerprint, bands = event_fingerprint(base)
+    assert len(fingerprint) == 16
+    assert bands == simhash_bands(int(fingerprint, 16))
+    assert event_fingerprint(dict(base, date_str="2030-01-01"))[0] == fingerprint
@@ -0,0 +1,161 @@
+from datetime import datetime, timedelta, timezone
+
+from backend.ics import CalendarFeedCache, _escape, _fold, render_event
+
+
+def unfold(text):
+    return text.replace("\r\n ", "")
+
+
+def test_short_lines_are_not_folded():
+    assert _fold("SUMMARY:Chess") == "SUMMARY:Chess"
+
+
+def test_fold_limits_lines_to_75_octets():
+    line = "DESCRIPTION:" + "a" * 200
+    folded = _fold(line)
+    parts = folded.split("\r\n")
+    assert len(parts[0].encode("utf-8")) == 75
+    assert all(part.startswith(" ") and len(part.encode("utf-8")) <= 75 for part in parts[1:])
+    assert unfold(folded) == line
+
+
+def test_fold_never_splits_multibyte_characters():
+    line = "SUMMARY:" + "🎉é" * 40
+    folded = _fold(line)
+    for part in folded.split("\r\n"):
+        assert len(part.encode("utf-8")) <= 75
+    assert unfold(folded) == line
+
+
+def test_escape():
+    assert _escape("a,b;c\\d\ne") == r"a\,b\;c\\d\ne"
+
+
+def test_render_timed_event():
+    doc = {
+        "_id": "abc",
+        "title": "Chess, finals",
+        "due_at": datetime(2030, 1, 2, 18, 30, tzinfo=timezone.utc),
+        "updated_at": datetime(2029, 12, 1, tzinfo=timezone.utc),
+        "club": "Chess",
+        "location": "Room 101",
+        "link": "https://discord.com/channels/1/2/3",
+        "category": "event",
+    }
+    lines = render_event(doc).split("\r\n")
+    assert lines[0] == "BEGIN:VEVENT"
+    assert lines[-2:] == ["END:VEVENT", ""]
+    assert "UID:abc@deadline-tracker" in lines
+    assert "DTSTAMP:20291201T000000Z" in lines
+    assert "DTSTART:20300102T183000Z" in lines
+    assert "SUMMARY:Chess\\, finals" in lines
+    assert "LOCATION:Room 101" in lines
+    assert "CATEGORIES:event" in lines
+    description = next(line for line in lines if line.startswith("DESCRIPTION:"))
+    assert description == "DESCRIPTION:Club: Chess\\n\\nhttps://discord.com/channels/1/2/3"
+
+
+def test_render_all_day_event():
+    doc = {
+        "_id": "abc",
+        "date_str": "2030-01-02",
+        "all_day": True,
+        "due_at": datetime(2030, 1, 3, 7, 59, 59, tzinfo=timezone.utc),
+    }
+    lines = render_event(doc).split("\r\n")
+    assert "DTSTART;VALUE=DATE:20300102" in lines
+    assert "DTEND;VALUE=DATE:20300103" in lines
+    assert "SUMMARY:Untitled Event" in lines
+
+
+class FakeCalendarDB:
+    """Deadlines in memory, with the query semantics of get_calendar_events"""
+
+    def __init__(self):
+        self.docs = {}
+        self.versions = {}
+        self.full_loads = 0
+
+    def write(self, doc):
+        doc = dict(doc, updated_at=datetime.now(timezone.utc))
+        previous = self.docs.get(doc["_id"])
+        self.docs[doc["_id"]] = doc
+        for old in (previous, doc):
+            if old:
+                key = ("club", old.get("club"))
+                self.versions[key] = self.versions.get(key, 0) + 1
+
+    def get_calendar_version(self, field, value):
+        return self.versions.get((field, value), 0)
+
+    def get_calendar_events(self, field, value, since=None, horizon=None, cached_ids=None):
+        if since is None:
+            self.full_loads += 1
+            return [
+                doc for doc in self.docs.values()
+                if doc.get(field) == value and not doc.get("deleted") and doc["due_at"] >= horizon
+            ]
+        return [
+            doc for doc in self.docs.values()
+            if (doc.get(field) == value or doc["_id"] in (cached_ids or [])) and doc["updated_at"] > since
+        ]
+
+
+def event(_id, club="Chess", days=1, **fields):
+    due_at = datetime.now(timezone.utc) + timedelta(days=days)
+    return dict({"_id": _id, "club": club, "title": f"Event {_id}", "due_at": due_at}, **fields)
+
+
+def uids(body):
+    return [line[4:].split("@")[0] for line in body.decode("utf-8").split("\r\n") if line.startswith("UID:")]
+
+
+def test_feed_is_cached_until_the_version_moves():
+    db = FakeCalendarDB()
+    db.write(event("a"))
+    cache = CalendarFeedCache(check_interval=0)
+
+    body, etag = cache.get(db, "club", "Chess")
+    assert uids(body) == ["a"]
+    assert body.startswith(b"BEGIN:VCALENDAR\r\n") and body.endswith(b"END:VCALENDAR\r\n")
+    assert cache.get(db, "club", "Chess") == (body, etag)
+
+    db.write(event("b", days=0.5))
+    body2, etag2 = cache.get(db, "club", "Chess")
+    assert uids(body2) == ["b", "a"]
+    assert etag2 != etag
+    assert db.full_loads == 1
+
+
+def test_deleted_duplicate_and_past_events_are_dropped():
+    db = FakeCalendarDB()
+    for _id in "abcd":
+        db.write(event(_id))
+    cache = CalendarFeedCache(check_interval=0, past_days=30)
+    assert uids(cache.get(db, "club", "Chess")[0]) == ["a", "b", "c", "d"]
+
+    db.write(event("a", deleted=True))
+    db.write(event("b", is_duplicate=True))
+    db.write(event("c", days=-60))
+    assert uids(cache.get(db, "club", "Chess")[0]) == ["d"]
+
+
+def test_event_moved_to_another_club_leaves_the_old_feed():
+    db = FakeCalendarDB()
+    db.write(event("a"))
+    cache = CalendarFeedCache(check_interval=0)
+    assert uids(cache.get(db, "club", "Chess")[0]) == ["a"]
+
+    db.write(event("a", club="Go"))
+    assert uids(cache.get(db, "club", "Chess")[0]) == []
+    assert uids(cache.get(db, "club", "Go")[0]) == ["a"]
+
+
+def test_lru_evicts_the_oldest_feed():
+    db = FakeCalendarDB()
+    cache = CalendarFeedCache(maxsize=1, check_interval=0)
+    cache.get(db, "club", "Chess")
+    cache.get(db, "club", "Go")
+    cache.get(db, "club", "Chess")
+    assert db.full_loads == 3
@@ -0,0 +1,89 @@
+import gzip
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from backend.middleware import CompressionMiddleware, _accepted_encodings
+
+BODY = b'{"items": [' + b'{"title": "Chess club"},' * 200 + b'{}]}'
+
+
+def big_json(request):
+    return Response(BODY, media_type="application/json", headers={"ETag": '"v1"'})
+
+
+def small_json(request):
+    return Response(b'{"ok": true}', media_type="application/json")
+
+
+def image(request):
+    return Response(b"\x89PNG" + b"\0" * 4096, media_type="image/png")
+
+
+def pre_encoded(request):
+    return Response(gzip.compress(BODY), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+def streamed(request):
+    def chunks():
+        for _ in range(5):
+            yield BODY
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@pytest.fixture
+def client():
+    app = Starlette(routes=[
+        Route("/big", big_json), Route("/small", small_json), Route("/image", image),
+        Route("/encoded", pre_encoded), Route("/stream", streamed),
+    ])
+    app.add_middleware(CompressionMiddleware, minimum_size=1024, enable_brotli=True)
+    return TestClient(app)
+
+
+def test_accepted_encodings():
+    assert _accepted_encodings("gzip, br;q=0.5, deflate;q=0, *;q=bogus") == {"gzip", "br"}
+    assert _accepted_encodings("") == set()
+
+
+def test_gzip_response_weakens_etag(client):
+    response = client.get("/big", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == 'W/"v1"'
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.content == BODY
+
+
+def test_brotli_is_preferred(client):
+    pytest.importorskip("brotli")
+    response = client.get("/big", headers={"Accept-Encoding": "gzip, br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == BODY
+
+
+def test_identity_is_untouched(client):
+    response = client.get("/big", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == '"v1"'
+
+
+@pytest.mark.parametrize("path", ["/small", "/image"])
+def test_small_and_binary_responses_pass_through(client, path):
+    response = client.get(path, headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in response.headers
+
+
+def test_already_encoded_response_passes_through(client):
+    response = client.get("/encoded", headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BODY
+
+
+def test_streaming_response_is_compressed_incrementally(client):
+    response = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == BODY * 5
@@ -0,0 +1,34 @@
+from datetime import datetime, timezone
+
+from database.migrate_due_at import build_update
+
+TZ = "America/Los_Angeles"
+
+
+def test_iso_date_needs_no_timestamp():
+    fields = build_update({"date_str": "2025-03-07"}, TZ)
+    assert fields["due_at"] == datetime(2025, 3, 8, 7, 59, 59, tzinfo=timezone.utc)
+    assert fields["all_day"] is True
+    assert fields["timezone"] == TZ
+
+
+def test_free_form_date_is_relative_to_the_saved_day():
+    # Monday evening in Los Angeles (already Tuesday in UTC)
+    saved = datetime(2025, 3, 4, 3, 0, tzinfo=timezone.utc)
+    fields = build_update({"date_str": "Friday", "timestamp": saved}, TZ)
+    assert fields["due_at"] == datetime(2025, 3, 8, 7, 59, 59, tzinfo=timezone.utc)
+
+
+def test_free_form_date_without_timestamp_is_skipped():
+    assert build_update({"date_str": "Friday"}, TZ) is None
+
+
+def test_unparseable_date_is_skipped():
+    saved = datetime(2025, 3, 4, tzinfo=timezone.utc)
+    assert build_update({"date_str": "sometime soon", "timestamp": saved}, TZ) is None
+
+
+def test_document_timezone_wins():
+    fields = build_update({"date_str": "2025-03-07", "timezone": "Europe/Berlin"}, TZ)
+    assert fields["timezone"] == "Europe/Berlin"
+    assert fields["due_at"] == datetime(2025, 3, 7, 22, 59, 59, tzinfo=timezone.utc)
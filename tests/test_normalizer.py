@@ -0,0 +1,78 @@
+from bot.normalizer import estimate_tokens, normalize_message, restore_links, salient_hash
+
+
+def test_mentions_and_custom_emoji_are_shortened():
+    text = normalize_message("<@123> <@!456> <@&789> see <#42> <:party:1234> <a:wave:99>").text
+    assert text == "@user @user @role see #channel :party: :wave:"
+
+
+def test_long_urls_become_placeholders_and_are_restored():
+    url = "https://example.com/forms/d/e/" + "x" * 80 + "/viewform"
+    result = normalize_message(f"Sign up: {url}\nAgain: {url}\nShort: https://ex.co/a")
+    assert result.text == "Sign up: [link1]\nAgain: [link1]\nShort: https://ex.co/a"
+    assert result.links == {"[link1]": url}
+    restored = restore_links({"link": "[link1]", "notes": ["see [link1]", 3]}, result.links)
+    assert restored == {"link": url, "notes": [f"see {url}", 3]}
+
+
+def test_restore_links_without_placeholders_is_a_no_op():
+    value = {"title": "Meeting"}
+    assert restore_links(value, {}) is value
+
+
+def test_repeated_symbols_letters_and_words_are_collapsed():
+    text = normalize_message("Party!!!!!!!! 🎉🎉🎉🎉🎉🎉 sooooooo fun fun fun fun").text
+    assert text == "Party!!! 🎉🎉🎉 sooo fun fun"
+
+
+def test_digits_are_not_collapsed():
+    assert normalize_message("Room 11111 at 10000").text == "Room 11111 at 10000"
+
+
+def test_repeated_tokens_are_not_merged_across_lines():
+    assert normalize_message("go go go team\nteam team team").text == "go go team\nteam team"
+
+
+def test_code_blocks_keep_only_date_lines():
+    content = "Schedule:\n```\nsetup()\nMarch 3 kickoff\nrun()\n```"
+    assert normalize_message(content).text == "Schedule:\n[code block: 3 lines]\nMarch 3 kickoff"
+
+
+def test_whitespace_and_blank_lines_are_squeezed():
+    assert normalize_message("  Title  \t here \n\n\n\n\nBody​ text ").text == "Title here\n\nBody text"
+
+
+def test_trimming_keeps_title_and_date_lines():
+    filler = [f"Filler line number {i} with nothing useful in it at all" for i in range(200)]
+    content = "\n".join(["Hackathon kickoff"] + filler[:100] + ["Due March 3 at 5pm"] + filler[100:])
+    result = normalize_message(content, budget=100)
+    assert result.tokens <= 100 + 10
+    assert result.text.startswith("Hackathon kickoff")
+    assert "Due March 3 at 5pm" in result.text
+    assert "[...]" in result.text
+    assert result.tokens_saved > 0
+
+
+def test_single_huge_line_is_cut():
+    line = "abcdefghij" * 1000
+    result = normalize_message(line, budget=10)
+    assert result.text == line[:40] + " [...]"
+
+
+def test_estimate_tokens():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("abcd") == 1
+    assert estimate_tokens("abcde") == 2
+
+
+def test_salient_hash_ignores_cosmetic_edits():
+    original = "Chess club meeting\nMarch 3 at 5pm in Room 101\nBring snacks"
+    assert salient_hash(original) == salient_hash(original.replace("Bring snacks", "Bring snacks!! 🎉"))
+    assert salient_hash(original) == salient_hash(original.upper().replace("BRING SNACKS", "bring snacks"))
+
+
+def test_salient_hash_tracks_dates_titles_and_locations():
+    original = "Chess club meeting\nMarch 3 at 5pm\nLocation: Room 101"
+    assert salient_hash(original) != salient_hash(original.replace("March 3", "March 4"))
+    assert salient_hash(original) != salient_hash(original.replace("Chess", "Go"))
+    assert salient_hash(original) != salient_hash(original.replace("101", "202"))
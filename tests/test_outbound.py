@@ -0,0 +1,96 @@
+import asyncio
+
+import discord
+import pytest
+
+from bot.outbound import FAILED, MAX_MESSAGE_LENGTH, SENT, UNDELIVERABLE, OutboundSender, _chunk_lines, _Outgoing
+
+
+class NoLimit:
+    async def acquire(self):
+        pass
+
+
+class FakeResponse:
+    status = 500
+    reason = "Server Error"
+
+
+class FakeChannel:
+    """Records sends, failing the calls listed in ``failures``"""
+
+    def __init__(self, failures=None):
+        self.failures = failures or {}
+        self.sent = []
+        self.calls = 0
+
+    async def send(self, content):
+        self.calls += 1
+        error = self.failures.get(self.calls)
+        if error is not None:
+            raise error
+        self.sent.append(content)
+
+    def get_partial_message(self, message_id):
+        channel = self
+
+        class Partial:
+            async def reply(self, content):
+                await channel.send(content)
+        return Partial()
+
+
+def test_chunk_lines_fits_the_limit_and_counts_lines():
+    lines = [f"• event {i} " + "x" * 300 for i in range(20)]
+    chunks = _chunk_lines("header", lines)
+    assert all(len(text) <= MAX_MESSAGE_LENGTH for text, _ in chunks)
+    assert sum(count for _, count in chunks) == 20
+    assert all(text.startswith("header\n") for text, _ in chunks)
+
+
+def test_chunk_lines_truncates_overlong_lines():
+    chunks = _chunk_lines("header", ["y" * 5000])
+    assert chunks == [("header\n" + "y" * (MAX_MESSAGE_LENGTH - len("header") - 1), 1)]
+
+
+def send_batch(channel, summaries, max_retries=0):
+    async def run():
+        sender = OutboundSender(bot=None, max_retries=max_retries)
+        loop = asyncio.get_running_loop()
+        items = [_Outgoing(i, f"reply {i}", summary, loop.create_future()) for i, summary in enumerate(summaries)]
+        await sender._send_batch(channel, items, NoLimit())
+        return [item.future.result() for item in items], sender
+    return asyncio.run(run())
+
+
+def test_single_replies_are_sent_individually():
+    channel = FakeChannel()
+    outcomes, sender = send_batch(channel, [None, "one"])
+    assert outcomes == [SENT, SENT]
+    assert channel.sent == ["reply 0", "reply 1"]
+
+
+def test_replies_with_summaries_are_coalesced():
+    channel = FakeChannel()
+    outcomes, sender = send_batch(channel, ["one", "two", "three"])
+    assert outcomes == [SENT] * 3
+    assert channel.sent == ["✅ Tracked 3 events:\n• one\n• two\n• three"]
+    assert sender.stats["coalesced"] == 3
+
+
+def test_coalesced_outcomes_are_resolved_per_chunk():
+    # Six lines per chunk, the second chunk is rejected
+    summaries = ["z" * 300] * 14
+    channel = FakeChannel(failures={2: discord.Forbidden(FakeResponse(), "missing access")})
+    outcomes, _ = send_batch(channel, summaries)
+    assert outcomes[:6] == [SENT] * 6
+    assert outcomes[6:] == [UNDELIVERABLE] * 8
+    assert channel.calls == 2
+
+
+def test_failed_chunk_fails_only_its_own_and_later_items():
+    summaries = ["z" * 300] * 14
+    channel = FakeChannel(failures={2: discord.HTTPException(FakeResponse(), "boom")})
+    outcomes, sender = send_batch(channel, summaries)
+    assert outcomes == [SENT] * 6 + [FAILED] * 8
+    assert sender.stats["failed"] == 1
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from bot.reminders import ReminderScheduler, reminder_message
+
+
+class FakeReminderDB:
+    def __init__(self, stored):
+        self.stored = stored
+        self.cleared = []
+
+    def mark_reminder_sent(self, deadline_id):
+        if self.stored is None or self.stored.get("reminder_sent_at"):
+            return None
+        self.stored["reminder_sent_at"] = datetime.now(timezone.utc)
+        return dict(self.stored)
+
+    def clear_reminder_sent(self, deadline_id):
+        self.cleared.append(deadline_id)
+        self.stored.pop("reminder_sent_at", None)
+
+
+class FakeChannel:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, content):
+        self.sent.append(content)
+
+
+class FakeBot:
+    def __init__(self):
+        self.channel = FakeChannel()
+        self.guilds = []
+
+    def get_channel(self, channel_id):
+        return self.channel
+
+
+def deadline(due_at, title="Chess tournament"):
+    return {"_id": 1, "title": title, "category": "event", "due_at": due_at, "channel_id": "7"}
+
+
+def scheduler(stored):
+    return ReminderScheduler(FakeBot(), FakeReminderDB(stored), lead_minutes=60, rate=100)
+
+
+def test_reminder_is_sent_with_current_fields():
+    due_at = datetime.now(timezone.utc) + timedelta(minutes=30)
+    reminders = scheduler(deadline(due_at, title="Renamed tournament"))
+    asyncio.run(reminders._remind(deadline(due_at)))
+    assert len(reminders.bot.channel.sent) == 1
+    assert "Renamed tournament" in reminders.bot.channel.sent[0]
+
+
+def test_edited_deadline_is_requeued_instead_of_sent():
+    now = datetime.now(timezone.utc)
+    loaded = deadline(now + timedelta(minutes=30))
+    moved = now + timedelta(days=2)
+    reminders = scheduler(deadline(moved))
+
+    asyncio.run(reminders._remind(loaded))
+
+    assert reminders.bot.channel.sent == []
+    assert reminders.db_client.cleared == [1]
+    assert len(reminders) == 1
+    remind_at, _, queued = reminders._heap[0]
+    assert queued["due_at"] == moved
+    assert remind_at == moved - timedelta(minutes=60)
+
+
+def test_reminder_claimed_elsewhere_is_skipped():
+    due_at = datetime.now(timezone.utc) + timedelta(minutes=30)
+    stored = deadline(due_at)
+    stored["reminder_sent_at"] = datetime.now(timezone.utc)
+    reminders = scheduler(stored)
+    asyncio.run(reminders._remind(deadline(due_at)))
+    assert reminders.bot.channel.sent == []
+
+
+def test_all_day_reminder_message():
+    text = reminder_message({
+        "title": "Dues", "category": "deadline", "all_day": True, "date_str": "2030-01-01",
+        "due_at": datetime(2030, 1, 2, 7, 59, 59, tzinfo=timezone.utc),
+    })
+    assert text == "⏰ Reminder: the deadline **Dues** is due on **2030-01-01**"
@@ -0,0 +1,23 @@
+import pytest
+
+from bot.sharding import parse_shard_ids
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("", None),
+    ("   ", None),
+    (None, None),
+    ("3", [3]),
+    ("0-3", [0, 1, 2, 3]),
+    ("0-3,8,10-11", [0, 1, 2, 3, 8, 10, 11]),
+    (" 5 , 1-2 ,, ", [1, 2, 5]),
+    ("2,2,1-3", [1, 2, 3]),
+])
+def test_parse_shard_ids(value, expected):
+    assert parse_shard_ids(value) == expected
+
+
+@pytest.mark.parametrize("value", ["3-1", "a", "1-b", "1,,x"])
+def test_parse_shard_ids_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_shard_ids(value)
@@ -0,0 +1,86 @@
+import pytest
+
+import bot.worker as worker
+from bot.jobs import extract_job_id
+from database.mongodb_client import DatabaseUnavailableError
+
+
+class FakeJobDB:
+    """Records the calls an edit job makes"""
+
+    def __init__(self, stored_hash=None, upsert_result="64b000000000000000000001", healthy=True):
+        self.stored_hash = stored_hash
+        self.upsert_result = upsert_result
+        self.healthy = healthy
+        self.upserted = []
+        self.deleted = []
+
+    def get_content_hash(self, message_id):
+        return self.stored_hash
+
+    def set_content_hash(self, message_id, content_hash):
+        self.stored_hash = content_hash
+        return True
+
+    def upsert_deadline(self, event_data):
+        self.upserted.append(event_data)
+        return self.upsert_result
+
+    def soft_delete_messages(self, message_ids):
+        self.deleted.extend(message_ids)
+        return len(message_ids)
+
+
+def edit_payload(content_hash="new"):
+    return {
+        "content": "Chess club meeting moved to Friday",
+        "message_info": {"message_id": "42", "channel_id": "7"},
+        "mode": "llm",
+        "edit": True,
+        "content_hash": content_hash,
+    }
+
+
+@pytest.fixture
+def extract(monkeypatch):
+    result = {"value": (True, {"message_id": "42", "title": "Chess club meeting"})}
+    monkeypatch.setattr(worker, "extract_deadline_with_fallback", lambda *args: result["value"])
+    return result
+
+
+def test_extract_job_id_includes_content_hash():
+    assert extract_job_id(42) == "extract:42"
+    assert extract_job_id(42, "abc") == "extract:42:abc"
+
+
+def test_edit_job_upserts_and_stores_hash(extract):
+    db = FakeJobDB(stored_hash="old")
+    assert worker.process_extract_job(db, edit_payload()) == db.upsert_result
+    assert db.upserted and not db.deleted
+    assert db.stored_hash == "new"
+
+
+def test_edit_job_deletes_when_event_is_gone(extract):
+    extract["value"] = (False, None)
+    db = FakeJobDB(stored_hash="old")
+    assert worker.process_extract_job(db, edit_payload()) == "deleted"
+    assert db.deleted == ["42"]
+    assert db.stored_hash == "new"
+
+
+def test_edit_job_skips_applied_edit(extract):
+    db = FakeJobDB(stored_hash="new")
+    assert worker.process_extract_job(db, edit_payload()) == "unchanged"
+    assert not db.upserted and not db.deleted
+
+
+def test_failed_edit_keeps_old_hash(extract):
+    db = FakeJobDB(stored_hash="old", upsert_result=None)
+    assert worker.process_extract_job(db, edit_payload()) == "not_saved"
+    assert db.stored_hash == "old"
+
+
+def test_failed_edit_is_retried_when_database_is_down(extract):
+    db = FakeJobDB(stored_hash="old", upsert_result=None, healthy=False)
+    with pytest.raises(DatabaseUnavailableError):
+        worker.process_extract_job(db, edit_payload())
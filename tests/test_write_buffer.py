@@ -0,0 +1,125 @@
+import threading
+import time
+
+from pymongo.errors import AutoReconnect
+
+from database.write_buffer import WriteBehindBuffer
+
+
+class FakeCollection:
+    """Applies the buffer's upserts to a dict keyed by message_id"""
+
+    def __init__(self, fail_times=0, delay=0):
+        self.docs = {}
+        self.fail_times = fail_times
+        self.delay = delay
+        self.batches = []
+
+    def bulk_write(self, operations, ordered=True):
+        if self.fail_times:
+            self.fail_times -= 1
+            raise AutoReconnect("connection reset")
+        time.sleep(self.delay)
+        self.batches.append(len(operations) // 2)
+        for op in operations:
+            query, update = op._filter, op._doc
+            message_id = query["message_id"]
+            if "$setOnInsert" in update and message_id not in self.docs:
+                self.docs[message_id] = dict(update["$setOnInsert"], _id=f"oid-{message_id}")
+            elif "$set" in update and message_id in self.docs:
+                date_str = self.docs[message_id].get("date_str", "")
+                if not (len(date_str) == 10 and date_str[4] == "-"):
+                    self.docs[message_id].update(update["$set"])
+
+    def find(self, query, projection=None):
+        wanted = query["message_id"]["$in"]
+        return [{"_id": doc["_id"], "message_id": m} for m, doc in self.docs.items() if m in wanted]
+
+
+def make_buffer(collection, **kwargs):
+    kwargs.setdefault("flush_interval_ms", 10_000)
+    return WriteBehindBuffer(lambda: collection, **kwargs)
+
+
+def test_flush_writes_and_resolves_futures():
+    collection = FakeCollection()
+    buffer = make_buffer(collection)
+    futures = [buffer.submit({"message_id": str(i), "date_str": "2030-01-01"}) for i in range(3)]
+    buffer.flush()
+    assert [f.result(timeout=1) for f in futures] == ["oid-0", "oid-1", "oid-2"]
+    assert collection.batches == [3]
+    buffer.close()
+
+
+def test_full_batch_is_flushed_by_the_background_thread():
+    collection = FakeCollection()
+    buffer = make_buffer(collection, max_batch=2)
+    futures = [buffer.submit({"message_id": str(i), "date_str": "2030-01-01"}) for i in range(2)]
+    assert [f.result(timeout=2) for f in futures] == ["oid-0", "oid-1"]
+    buffer.close()
+
+
+def test_interval_flush():
+    collection = FakeCollection()
+    buffer = make_buffer(collection, flush_interval_ms=20)
+    assert buffer.submit({"message_id": "1", "date_str": "2030-01-01"}).result(timeout=2) == "oid-1"
+    buffer.close()
+
+
+def test_existing_formatted_date_is_not_overwritten():
+    collection = FakeCollection()
+    collection.docs["1"] = {"_id": "oid-1", "message_id": "1", "date_str": "2030-01-01", "title": "Old"}
+    collection.docs["2"] = {"_id": "oid-2", "message_id": "2", "date_str": "next Friday", "title": "Old"}
+    buffer = make_buffer(collection)
+    buffer.submit({"message_id": "1", "date_str": "2030-02-02", "title": "New"})
+    buffer.submit({"message_id": "2", "date_str": "2030-02-02", "title": "New"})
+    buffer.flush()
+    assert collection.docs["1"]["title"] == "Old"
+    assert collection.docs["2"]["title"] == "New"
+    buffer.close()
+
+
+def test_transient_errors_are_retried():
+    collection = FakeCollection(fail_times=2)
+    buffer = make_buffer(collection, max_retries=3)
+    future = buffer.submit({"message_id": "1", "date_str": "2030-01-01"})
+    buffer.flush()
+    assert future.result(timeout=1) == "oid-1"
+    buffer.close()
+
+
+def test_giving_up_resolves_to_none():
+    collection = FakeCollection(fail_times=10)
+    buffer = make_buffer(collection, max_retries=0)
+    future = buffer.submit({"message_id": "1", "date_str": "2030-01-01"})
+    buffer.flush()
+    assert future.result(timeout=1) is None
+    buffer.close()
+
+
+def test_flush_waits_for_a_batch_the_thread_is_writing():
+    collection = FakeCollection(delay=0.3)
+    buffer = make_buffer(collection, flush_interval_ms=1)
+    future = buffer.submit({"message_id": "1", "date_str": "2030-01-01"})
+    # Let the background thread take the batch
+    time.sleep(0.05)
+    assert not future.done()
+    buffer.flush()
+    assert future.done() and "1" in collection.docs
+    buffer.close()
+
+
+def test_on_flush_receives_written_ids():
+    collection = FakeCollection()
+    flushed = []
+    buffer = WriteBehindBuffer(lambda: collection, flush_interval_ms=10_000, on_flush=flushed.extend)
+    buffer.submit({"message_id": "1", "date_str": "2030-01-01"})
+    buffer.flush()
+    assert flushed == ["oid-1"]
+    buffer.close()
+
+
+def test_submit_after_close_is_dropped():
+    buffer = make_buffer(FakeCollection())
+    buffer.close()
+    assert buffer.submit({"message_id": "1"}).result(timeout=1) is None